@@ -1,8 +1,13 @@
 import requests
 import logging
+import threading
 import time
-from typing import List, Optional
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 from config import DATAMUSE_API, OCR_TIMEOUT, MAX_SUGGESTIONS_DISPLAY, STATUS_ONLINE, STATUS_OFFLINE, STATUS_TIMEOUT, STATUS_ERROR
+from config import SUGGESTION_CACHE_SIZE, SUGGESTION_CACHE_TTL
+from frame_gate import LRUTTLCache
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,11 @@ class DatamuseClient:
     def __init__(self):
         self.session = requests.Session()
         self.status = STATUS_ONLINE
+        # Successful lookups by (mode, letters), shared by every window; concurrent
+        # requests for the same key wait on the one already in flight.
+        self.cache = LRUTTLCache(max_entries=SUGGESTION_CACHE_SIZE, ttl=SUGGESTION_CACHE_TTL)
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
     
     def get_suggestions(self, letters: str, mode: str) -> List[str]:
         """
@@ -26,7 +36,44 @@ class DatamuseClient:
         """
         if not letters or len(letters) < 1:
             return []
-        
+
+        key = (mode, letters)
+        cached = self.cache.get(key)
+        if cached is not None:
+            tracer.instant("api.cache_hit", "api", letters=letters)
+            return list(cached)
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            owner = inflight is None
+            if owner:
+                inflight = self._inflight[key] = Future()
+        if not owner:
+            with tracer.span("api.wait_inflight", "api", letters=letters):
+                return list(inflight.result())
+        try:
+            with tracer.span("api.suggestions", "api", letters=letters, mode=mode):
+                suggestions = self._fetch_suggestions(letters, mode)
+            if suggestions:
+                self.cache.put(key, tuple(suggestions))
+            inflight.set_result(tuple(suggestions))
+            return suggestions
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            if not inflight.done():
+                inflight.set_result(())
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        hits, misses = self.cache.hits, self.cache.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.cache),
+        }
+
+    def _fetch_suggestions(self, letters: str, mode: str) -> List[str]:
+        """One Datamuse request; [] on failure (status records why)."""
         start_time = time.time()
         
         try:
@@ -91,10 +138,10 @@ class DatamuseClient:
             
             logger.info(f"API request for definition of: '{word}'")
             
-            response = self.session.get(f"{DATAMUSE_API}", params=params, timeout=OCR_TIMEOUT)
-            response.raise_for_status()
-            
-            data = response.json()
+            with tracer.span("api.definitions", "api", word=word):
+                response = self.session.get(f"{DATAMUSE_API}", params=params, timeout=OCR_TIMEOUT)
+                response.raise_for_status()
+                data = response.json()
 
             # Extract definition from response
             if isinstance(data, list) and len(data) > 0 and "defs" in data[0]:
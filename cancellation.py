@@ -0,0 +1,35 @@
+import threading
+import time
+from typing import Optional
+
+
+class CancelToken:
+    """
+    One-shot cancellation flag for a background job. The job checks it between
+    steps and sleeps on it, so a cancel also cuts the current pause short.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = ""):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to seconds; True if cancelled (possibly earlier)."""
+        return self._event.wait(seconds)
+
+
+def pause(seconds: float, cancel: Optional[CancelToken] = None) -> bool:
+    """time.sleep that wakes early when cancel is set; True if cancelled."""
+    if cancel is None:
+        time.sleep(seconds)
+        return False
+    return cancel.sleep(seconds)
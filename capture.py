@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import mss
+import numpy as np
+
+from config import CAPTURE_UNION_MAX_RATIO
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+def _box(region: Dict) -> Tuple[int, int, int, int]:
+    return int(region["left"]), int(region["top"]), int(region["width"]), int(region["height"])
+
+
+def bounding_region(regions: Iterable[Dict]) -> Dict:
+    """Smallest mss monitor dict covering every region."""
+    boxes = [_box(r) for r in regions]
+    left = min(b[0] for b in boxes)
+    top = min(b[1] for b in boxes)
+    right = max(b[0] + b[2] for b in boxes)
+    bottom = max(b[1] + b[3] for b in boxes)
+    return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+
+def grab_screen() -> Tuple[Dict, np.ndarray]:
+    """(monitor dict, H x W x 4 BGRA) of the whole virtual screen (all monitors)."""
+    with mss.mss() as sct:
+        monitor = dict(sct.monitors[0])
+        img = sct.grab(monitor)
+    return monitor, np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+
+
+class CaptureFrame:
+    """
+    One tick's screen pixels: BGRA arrays (mss layout) for each grabbed area.
+    crop() hands out NumPy views into them, so consumers share the grab without copying.
+    """
+
+    def __init__(self, areas):
+        self._areas = areas  # [(monitor dict, H x W x 4 uint8 array)]
+
+    def crop(self, region: Dict) -> Optional[np.ndarray]:
+        """H x W x 4 BGRA view of region, or None if this frame does not cover it."""
+        left, top, width, height = _box(region)
+        for area, pixels in self._areas:
+            x, y = left - area["left"], top - area["top"]
+            if x >= 0 and y >= 0 and x + width <= area["width"] and y + height <= area["height"]:
+                return pixels[y:y + height, x:x + width]
+        return None
+
+
+class CaptureSession:
+    """
+    Long-lived mss handle for one thread (the auto-mode watcher). Each grab() reads
+    the bounding box of the requested regions once; when they are so far apart that
+    the box would be mostly unused pixels, each region is read on its own instead.
+    """
+
+    def __init__(self, union_max_ratio: float = CAPTURE_UNION_MAX_RATIO):
+        self.union_max_ratio = union_max_ratio
+        self._sct = None
+        self._lock = threading.Lock()
+        self.grabs = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def __enter__(self) -> "CaptureSession":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def grab(self, *regions: Optional[Dict]) -> CaptureFrame:
+        """Capture every non-empty region for this tick."""
+        regions = [r for r in regions if r]
+        start = time.perf_counter()
+        if self._sct is None:
+            self._sct = mss.mss()
+
+        union = bounding_region(regions)
+        union_area = union["width"] * union["height"]
+        total_area = sum(r["width"] * r["height"] for r in regions)
+        if len(regions) == 1 or union_area <= total_area * self.union_max_ratio:
+            targets = [union]
+        else:
+            targets = [dict(zip(("left", "top", "width", "height"), _box(r))) for r in regions]
+
+        areas = []
+        with tracer.span("capture.grab", "capture", grabs=len(targets)):
+            for target in targets:
+                img = self._sct.grab(target)
+                pixels = np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+                areas.append((target, pixels))
+
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.grabs += 1
+            self.total_ms += elapsed
+            self.last_ms = elapsed
+            self.max_ms = max(self.max_ms, elapsed)
+        return CaptureFrame(areas)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Per-tick capture cost for the metrics file."""
+        with self._lock:
+            return {
+                "grabs": self.grabs,
+                "average_capture_time_ms": self.total_ms / self.grabs if self.grabs else 0.0,
+                "last_capture_time_ms": self.last_ms,
+                "max_capture_time_ms": self.max_ms,
+            }
+
+    def close(self):
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception as e:
+                logger.debug(f"Error closing capture session: {e}")
+            self._sct = None
@@ -33,6 +33,17 @@ THEME = {
 CONFIG_FILE = os.path.join(BASE_DIR, "ocr_config.json")
 LOG_FILE = os.path.join(BASE_DIR, "ocr_helper.log")
 METRICS_FILE = os.path.join(BASE_DIR, "ocr_metrics.json")
+TYPED_HISTORY_FILE = os.path.join(BASE_DIR, "typed_history.bin")
+TYPING_JOURNAL_FILE = os.path.join(BASE_DIR, "typing_journal.bin")
+GLYPH_TEMPLATES_FILE = os.path.join(BASE_DIR, "glyph_templates.npz")
+TURN_SIGNATURE_FILE = os.path.join(BASE_DIR, "turn_signature.npz")
+PROMPTS_FILE = os.path.join(BASE_DIR, "prompts.json")
+REGION_TEMPLATES_FILE = os.path.join(BASE_DIR, "region_templates.npz")
+WORD_OUTCOMES_FILE = os.path.join(BASE_DIR, "word_outcomes.json")
+# Chrome / Perfetto trace-event files, one per session (only written when TRACE_ENABLED).
+TRACE_DIR = os.path.join(BASE_DIR, "traces")
+# Labelled region captures (prompt/, turn/) used to learn templates and tune OCR.
+CORPUS_DIR = os.path.join(BASE_DIR, "ocr_corpus")
 TESSERACT_INSTALLER_PATH = os.path.join(BASE_DIR, "tesseract_installer.exe")
 
 # WBT Settings
@@ -40,14 +51,35 @@ OCR_INTERVAL = 0.5
 OCR_INTERVAL_MIN = 0.1
 OCR_INTERVAL_MAX = 10.0
 OCR_TIMEOUT = 1
+# Resident Tesseract engine (tesserocr): workers each keep one engine loaded.
+OCR_ENGINE_WORKERS = 2
+OCR_ENGINE_TIMEOUT = 2.0
+# Process pool for OCR (0 = run in-process). Frames reach the workers through
+# OCR_SHM_SLOTS shared-memory buffers; submissions wait when all slots are in use.
+OCR_PROCESS_WORKERS = 0
+OCR_SHM_SLOTS = 8
+# Glyph-template engine for the game font: glyphs are sampled to GLYPH_SIZE x GLYPH_SIZE;
+# readings whose weakest character correlates below GLYPH_MIN_CONFIDENCE fall back to Tesseract.
+GLYPH_SIZE = 16
+GLYPH_MIN_CONFIDENCE = 0.82
 # Default ~human casual typing; Options can tune (typical comfortable range ~0.22–0.42).
 TYPING_DELAY = 0.28
 TYPING_DELAY_MIN = 0.01
 TYPING_DELAY_MAX = 2.0
+# Keystrokes fire at planned perf_counter deadlines: sleep until the deadline minus a margin
+# learned from observed sleep overshoot (kept within these bounds), then spin the rest.
+TYPING_SPIN_MIN = 0.0005
+TYPING_SPIN_MAX = 0.02
 
 # Auto mode: turn_region OCR (letters+digits, lower) must contain both for "YOUR TURN" / yourturn.
 TURN_GATE_NEED_YOUR = "your"
 TURN_GATE_NEED_TURN = "turn"
+# Self-calibration of the turn detector needs this many consecutive OCR frames reading exactly "yourturn".
+TURN_CALIBRATE_FRAMES = 2
+# Turn-gate detector score (0..1 similarity to the calibrated YOUR TURN capture):
+# >= ACCEPT is your turn, <= REJECT is not, anything between is re-checked with OCR.
+TURN_DETECT_ACCEPT = 0.8
+TURN_DETECT_REJECT = 0.55
 
 
 def clamp_ocr_interval(value) -> float:
@@ -77,9 +109,79 @@ DATAMUSE_API = "https://api.datamuse.com/words"
 
 # Cache Settings
 CACHE_EXPIRY_MINUTES = 5
+# Prompt OCR cache (keyed by perceptual hash) and the unchanged-frame gate in front of it.
+OCR_CACHE_MAX_ENTRIES = 256
+FRAME_GATE_SIZE = (32, 12)  # (w, h) of the downsampled grayscale frame compared between polls
+FRAME_GATE_MEAN_DIFF = 2.0  # mean absolute difference (0-255) still counted as unchanged
+FRAME_GATE_MAX_DIFF = 40.0  # no single downsampled cell may change more than this
+# The watcher grabs the bounding box of the letter and turn regions in one read unless
+# that box is more than this many times their combined area (regions far apart).
+CAPTURE_UNION_MAX_RATIO = 4.0
+
+# Prompt binarisation: fixed threshold after contrast stretch, or Otsu's threshold per frame.
+OCR_THRESHOLD = 140
+OCR_ADAPTIVE_THRESHOLD = False
+
+# Prompt reading acceptance: frames whose weakest character is below OCR_MIN_CONFIDENCE are
+# re-captured; other readings are corrected to the nearest valid prompt (prompts.json) when the
+# weighted edit cost is at most OCR_MAX_CORRECTION_COST.
+OCR_MIN_CONFIDENCE = 0.45
+OCR_MAX_CORRECTION_COST = 0.8
+PROMPT_MAX_LENGTH = 3
+# Hotkey reads grab again this many times (DELAY seconds apart) when a reading is rejected.
+OCR_RECAPTURE_ATTEMPTS = 2
+OCR_RECAPTURE_DELAY = 0.05
+# Auto mode acts on a new prompt at once when it reads at VOTE_ACCEPT_CONFIDENCE or better;
+# weaker readings must repeat VOTE_MIN_AGREE times among the region's last VOTE_WINDOW reads.
+VOTE_WINDOW = 3
+VOTE_MIN_AGREE = 2
+VOTE_ACCEPT_CONFIDENCE = 0.85
+
+# Region auto-locate: template matching of the saved prompt / YOUR TURN crops on screen.
+LOCATE_MIN_SCORE = 0.7  # normalised correlation needed to move a region
+LOCATE_MIN_TEMPLATE_SIDE = 8  # coarsest pyramid level keeps templates at least this many pixels
+LOCATE_CANDIDATES = 5  # coarse-level peaks refined to full resolution
+LOCATE_NEAR_MARGIN = 48  # pixels around the old position searched first
+LOCATE_AFTER_FAILURES = 10  # consecutive unreadable prompt frames before auto mode re-locates
+LOCATE_COOLDOWN_SECONDS = 10.0
+
+# Auto-mode polling: POLL_MIN_INTERVAL right after a prompt / turn / screen change, then the
+# interval grows by POLL_BACKOFF per static frame up to the configured ocr_interval.
+POLL_MIN_INTERVAL = 0.05
+POLL_BACKOFF = 1.6
+
+# After Enter the prompt / turn regions are read every SUBMIT_VERIFY_INTERVAL for up to
+# SUBMIT_VERIFY_TIMEOUT. The word counts as rejected when the same prompt is still ours after
+# SUBMIT_REJECT_AFTER seconds (SUBMIT_VERIFY_READS reads in a row); then the next candidate is
+# typed at once, at most SUBMIT_MAX_RETYPES times per prompt.
+SUBMIT_VERIFY_INTERVAL = 0.05
+SUBMIT_VERIFY_TIMEOUT = 1.5
+SUBMIT_REJECT_AFTER = 0.4
+SUBMIT_VERIFY_READS = 2
+SUBMIT_MAX_RETYPES = 2
+
+# Span tracing from prompt to Enter (capture, OCR, turn gate, API, sort, typing). Off by default;
+# when on, the last TRACE_MAX_EVENTS spans are written to TRACE_DIR on exit.
+TRACE_ENABLED = False
+TRACE_MAX_EVENTS = 200000
+
+# Suggestions shared by every watched window: same prompt and mode within the TTL reuse one API call.
+SUGGESTION_CACHE_SIZE = 512
+SUGGESTION_CACHE_TTL = 600.0
 MAX_SUGGESTIONS_DISPLAY = 50
 MAX_TYPED_HISTORY = 1000
+# Bloom filter behind the recent-words window: ~2M words at 0.1% false positives is ~3.6 MB.
+BLOOM_CAPACITY = 2_000_000
+BLOOM_ERROR_RATE = 0.001
 UNDO_BUFFER_SIZE = 20
+# Typing journal: batch appends, flushing after this many records or seconds.
+JOURNAL_FLUSH_RECORDS = 16
+JOURNAL_FLUSH_SECONDS = 5.0
+
+# Write-behind persistence: merge bursts of saves, but never hold one longer than the max delay.
+PERSIST_DEBOUNCE_SECONDS = 0.75
+PERSIST_MAX_DELAY_SECONDS = 5.0
+METRICS_CHECKPOINT_SECONDS = 60.0
 
 # Threading
 MAX_WORKER_THREADS = 2
@@ -0,0 +1,140 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StateEvent(Enum):
+    """Kinds of state change published by StateManager."""
+    REGION_CHANGED = "region_changed"
+    WINDOWS_CHANGED = "windows_changed"
+    MODE_CHANGED = "mode_changed"
+    SUGGESTIONS_REPLACED = "suggestions_replaced"
+    AUTO_MODE_TOGGLED = "auto_mode_toggled"
+    SETTINGS_CHANGED = "settings_changed"
+    STATUS_CHANGED = "status_changed"
+
+
+# AppState field -> event published when it changes (fields not listed publish nothing).
+FIELD_EVENTS = {
+    "region": StateEvent.REGION_CHANGED,
+    "turn_region": StateEvent.REGION_CHANGED,
+    "windows": StateEvent.WINDOWS_CHANGED,
+    "current_mode_index": StateEvent.MODE_CHANGED,
+    "current_sort_mode_index": StateEvent.MODE_CHANGED,
+    "suggestions": StateEvent.SUGGESTIONS_REPLACED,
+    "auto_mode_active": StateEvent.AUTO_MODE_TOGGLED,
+    "typing_delay": StateEvent.SETTINGS_CHANGED,
+    "ocr_interval": StateEvent.SETTINGS_CHANGED,
+    "ocr_profiles": StateEvent.SETTINGS_CHANGED,
+    "total_typed_count": StateEvent.STATUS_CHANGED,
+    "api_status": StateEvent.STATUS_CHANGED,
+}
+
+
+@dataclass(frozen=True)
+class Event:
+    """A published change: its kind and the state snapshot it produced."""
+    kind: StateEvent
+    state: Any
+
+
+class Subscription:
+    """One consumer's queue of events; full queues drop their oldest event."""
+
+    def __init__(self, bus: "EventBus", kinds: Optional[Iterable[StateEvent]], maxsize: int):
+        self._bus = bus
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.queue: "queue.Queue[Optional[Event]]" = queue.Queue(maxsize=maxsize)
+
+    def wants(self, kind: StateEvent) -> bool:
+        return self.kinds is None or kind in self.kinds
+
+    def _put(self, event: Optional[Event]):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or None on timeout or after close()."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self) -> List[Event]:
+        """All queued events without blocking."""
+        events = []
+        while True:
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                return events
+            if event is not None:
+                events.append(event)
+
+    def wait(self, timeout: Optional[float] = None) -> List[Event]:
+        """Block until at least one event arrives (or timeout), then return everything queued."""
+        first = self.get(timeout)
+        if first is None:
+            return []
+        return [first] + self.drain()
+
+    def close(self):
+        """Unsubscribe and wake any blocked get()."""
+        self._bus.unsubscribe(self)
+        self._put(None)
+
+    def run_in_thread(self, callback: Callable[[Event], None], name: str) -> threading.Thread:
+        """Deliver events to callback on a dedicated daemon thread until close()."""
+        def pump():
+            while True:
+                event = self.queue.get()
+                if event is None:
+                    return
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Event subscriber '{name}' failed: {e}", exc_info=True)
+
+        thread = threading.Thread(target=pump, daemon=True, name=name)
+        thread.start()
+        return thread
+
+
+class EventBus:
+    """Fan-out of state events to per-consumer queues. publish() never blocks."""
+
+    def __init__(self):
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, kinds: Optional[Iterable[StateEvent]] = None, maxsize: int = 64) -> Subscription:
+        """Subscribe to the given kinds (all kinds when None)."""
+        sub = Subscription(self, kinds, maxsize)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def publish(self, kind: StateEvent, state: Any):
+        event = Event(kind, state)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.wants(kind):
+                sub._put(event)
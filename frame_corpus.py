@@ -0,0 +1,89 @@
+import logging
+import os
+import time
+from typing import Iterator, Optional, Tuple
+
+from PIL import Image
+
+from config import CORPUS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Corpus kinds: one sub-directory per region type.
+PROMPT = "prompt"
+TURN = "turn"
+
+UNLABELLED = "_"
+# Verified label of a frame with nothing to read (no prompt shown, not YOUR TURN).
+NEGATIVE = "-"
+# Sub-directory for captures whose label is only a machine suggestion.
+UNVERIFIED = "unverified"
+
+
+def corpus_dir(kind: str, root: Optional[str] = None, verified: bool = True) -> str:
+    directory = os.path.join(root or CORPUS_DIR, kind)
+    return directory if verified else os.path.join(directory, UNVERIFIED)
+
+
+def _capture_name(label: Optional[str]) -> str:
+    return f"{label or UNLABELLED}_{time.strftime('%Y%m%d-%H%M%S')}_{int(time.time() * 1000) % 1000:03d}.png"
+
+
+def save_capture(kind: str, image: Image.Image, label: Optional[str], root: Optional[str] = None,
+                 verified: bool = False) -> str:
+    """
+    Save a raw region capture as <label>_<timestamp>.png. Unless verified, it goes to
+    the kind's unverified directory, where the label is only a suggestion until
+    verify_capture confirms it.
+    """
+    directory = corpus_dir(kind, root, verified)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _capture_name(label))
+    image.save(path)
+    return path
+
+
+def verify_capture(kind: str, path: str, label: str, root: Optional[str] = None) -> str:
+    """Move a capture into the kind's verified directory under label ('' = NEGATIVE); returns the new path."""
+    directory = corpus_dir(kind, root)
+    os.makedirs(directory, exist_ok=True)
+    stamp = "_".join(os.path.basename(path).rsplit("_", 2)[-2:])
+    target = os.path.join(directory, f"{label.lower() or NEGATIVE}_{stamp}")
+    os.replace(path, target)
+    return target
+
+
+def label_from_filename(filename: str) -> Optional[str]:
+    """'abc_20250101-120000_123.png' -> 'abc'; '' for NEGATIVE frames, None for unlabelled ones."""
+    label = os.path.basename(filename).split("_", 1)[0]
+    label = os.path.splitext(label)[0]
+    if label == NEGATIVE:
+        return ""
+    return None if label in ("", UNLABELLED) else label.lower()
+
+
+def iter_corpus(kind: str, root: Optional[str] = None, include_unlabelled: bool = False,
+                verified: bool = True) -> Iterator[Tuple[str, Image.Image, str]]:
+    """
+    Yield (path, RGB image, label) for each capture of kind, sorted by file name.
+    Negative frames have label ''; unlabelled ones are skipped unless include_unlabelled.
+    """
+    directory = corpus_dir(kind, root, verified)
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".png"):
+            continue
+        label = label_from_filename(name)
+        if label is None:
+            if not include_unlabelled:
+                continue
+            label = ""
+        path = os.path.join(directory, name)
+        try:
+            with Image.open(path) as im:
+                image = im.convert("RGB")
+        except OSError as e:
+            logger.warning(f"Skipping unreadable capture {path}: {e}")
+            continue
+        yield path, image, label
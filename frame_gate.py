@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    FRAME_GATE_SIZE,
+    FRAME_GATE_MEAN_DIFF,
+    FRAME_GATE_MAX_DIFF,
+    OCR_CACHE_MAX_ENTRIES,
+    CACHE_EXPIRY_MINUTES,
+)
+
+
+def downsample(gray: np.ndarray, size: Tuple[int, int] = FRAME_GATE_SIZE) -> np.ndarray:
+    """Area-average a grayscale frame to size (w, h) as float32; nearest sampling for tiny frames."""
+    out_w, out_h = size
+    h, w = gray.shape
+    bh, bw = h // out_h, w // out_w
+    if bh == 0 or bw == 0:
+        rows = (np.arange(out_h) * h) // out_h
+        cols = (np.arange(out_w) * w) // out_w
+        return gray[np.ix_(rows, cols)].astype(np.float32)
+    crop = gray[:bh * out_h, :bw * out_w].astype(np.float32)
+    return crop.reshape(out_h, bh, out_w, bw).mean(axis=(1, 3))
+
+
+def perceptual_hash(small: np.ndarray) -> bytes:
+    """Difference hash: sign of each horizontal gradient of the downsampled frame, packed to bytes."""
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
+
+
+class FrameChangeGate:
+    """
+    Remembers the last downsampled frame and OCR result per region; a new frame
+    that differs only by noise (cursor blink, anti-aliasing, small animation)
+    reuses the result instead of running OCR again.
+    """
+
+    def __init__(self, mean_diff: float = FRAME_GATE_MEAN_DIFF, max_diff: float = FRAME_GATE_MAX_DIFF):
+        self.mean_diff = mean_diff
+        self.max_diff = max_diff
+        self._last: Dict[Hashable, Tuple[np.ndarray, Optional[Tuple[str, float]]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def check(self, key: Hashable, small: np.ndarray) -> Tuple[bool, Optional[Tuple[str, float]]]:
+        """(True, previous result) if small is effectively unchanged for key, else (False, None)."""
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and last[0].shape == small.shape:
+                diff = np.abs(small - last[0])
+                if diff.mean() <= self.mean_diff and diff.max() <= self.max_diff:
+                    self.hits += 1
+                    return True, last[1]
+            self.misses += 1
+            return False, None
+
+    def update(self, key: Hashable, small: np.ndarray, result: Optional[Tuple[str, float]]):
+        with self._lock:
+            self._last[key] = (small, result)
+
+    def clear(self):
+        with self._lock:
+            self._last.clear()
+
+
+class LRUTTLCache:
+    """Size-bounded LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, max_entries: int = OCR_CACHE_MAX_ENTRIES, ttl: float = CACHE_EXPIRY_MINUTES * 60):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[object, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if now - entry[1] < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            # Expired entries drift to the LRU end; sweep them from there.
+            while self._data:
+                oldest = next(iter(self._data.values()))
+                if now - oldest[1] < self.ttl:
+                    break
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def hit_rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
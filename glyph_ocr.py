@@ -0,0 +1,217 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import GLYPH_SIZE, GLYPH_TEMPLATES_FILE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GlyphReading:
+    """Text read by the glyph engine and the weakest per-character correlation."""
+    text: str
+    confidence: float
+    char_confidences: Tuple[float, ...] = ()
+
+
+def ink_mask(gray: np.ndarray) -> np.ndarray:
+    """Binarised crop -> boolean ink mask. Ink is the minority colour, so either polarity works."""
+    dark = gray < 128
+    return dark if dark.mean() <= 0.5 else ~dark
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def connected_components(mask: np.ndarray) -> List[List[Tuple[int, int, int]]]:
+    """
+    8-connected components of a boolean mask, run-length based: rows are split
+    into ink runs with NumPy and overlapping runs of adjacent rows are unioned.
+    Returns each component as a list of (row, start_col, end_col_exclusive) runs.
+    """
+    if not mask.any():
+        return []
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    runs = list(zip(rows.tolist(), starts.tolist(), ends.tolist()))
+
+    parent = list(range(len(runs)))
+    prev_lo = prev_hi = 0  # run index range of the previous row
+    cur_lo = 0
+    for i, (row, start, end) in enumerate(runs):
+        if i == 0 or row != runs[i - 1][0]:
+            if i and runs[i - 1][0] == row - 1:
+                prev_lo, prev_hi = cur_lo, i
+            else:
+                prev_lo = prev_hi = i
+            cur_lo = i
+        for j in range(prev_lo, prev_hi):
+            _, p_start, p_end = runs[j]
+            if p_start <= end and p_end >= start:  # touching, diagonals included
+                ri, rj = _find(parent, i), _find(parent, j)
+                if ri != rj:
+                    parent[ri] = rj
+
+    groups = {}
+    for i, run in enumerate(runs):
+        groups.setdefault(_find(parent, i), []).append(run)
+    return list(groups.values())
+
+
+def _bbox(runs) -> Tuple[int, int, int, int]:
+    return (min(r[0] for r in runs), max(r[0] for r in runs) + 1,
+            min(r[1] for r in runs), max(r[2] for r in runs))
+
+
+def segment_glyphs(mask: np.ndarray) -> List[np.ndarray]:
+    """
+    Split an ink mask into per-character masks, left to right. Components that
+    share most of their columns (the dot of i/j) are merged; specks are dropped.
+    """
+    comps = connected_components(mask)
+    if not comps:
+        return []
+    boxes = [_bbox(c) for c in comps]
+    line_height = max(b[1] - b[0] for b in boxes)
+
+    order = sorted(range(len(comps)), key=lambda k: boxes[k][2])
+    merged: List[List[int]] = []
+    for k in order:
+        top, bottom, left, right = boxes[k]
+        if merged:
+            last = merged[-1]
+            l_left = min(boxes[m][2] for m in last)
+            l_right = max(boxes[m][3] for m in last)
+            overlap = min(right, l_right) - max(left, l_left)
+            if overlap > 0.5 * min(right - left, l_right - l_left):
+                last.append(k)
+                continue
+        merged.append([k])
+
+    glyphs = []
+    for group in merged:
+        runs = [r for k in group for r in comps[k]]
+        top, bottom, left, right = _bbox(runs)
+        area = sum(r[2] - r[1] for r in runs)
+        if bottom - top < 0.3 * line_height or area < 4:
+            continue
+        glyph = np.zeros((bottom - top, right - left), dtype=bool)
+        for row, start, end in runs:
+            glyph[row - top, start - left:end - left] = True
+        glyphs.append(glyph)
+    return glyphs
+
+
+def glyph_vector(glyph: np.ndarray, size: int = GLYPH_SIZE) -> np.ndarray:
+    """Centre a glyph in a square (keeps aspect ratio), sample to size x size, zero-mean, unit-norm."""
+    h, w = glyph.shape
+    side = max(h, w)
+    square = np.zeros((side, side), dtype=np.float32)
+    top, left = (side - h) // 2, (side - w) // 2
+    square[top:top + h, left:left + w] = glyph
+    idx = (np.arange(size) * side // size) + side // (2 * size)
+    vec = square[np.ix_(idx, idx)].ravel()
+    vec -= vec.mean()
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+class GlyphTemplateSet:
+    """One normalised template vector per character, learned from labelled captures."""
+
+    def __init__(self, chars: Iterable[str] = (), vectors: Optional[np.ndarray] = None,
+                 size: int = GLYPH_SIZE):
+        self.size = size
+        self.chars = list(chars)
+        self.vectors = vectors if vectors is not None else np.zeros((0, size * size), dtype=np.float32)
+        self._sums = {}
+        self._counts = {}
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def add_sample(self, image: np.ndarray, label: str) -> bool:
+        """Segment a binarised capture; if the glyph count matches label, accumulate each glyph."""
+        label = label.lower()
+        glyphs = segment_glyphs(ink_mask(image))
+        if len(glyphs) != len(label):
+            return False
+        for ch, glyph in zip(label, glyphs):
+            vec = glyph_vector(glyph, self.size)
+            self._sums[ch] = self._sums.get(ch, 0) + vec
+            self._counts[ch] = self._counts.get(ch, 0) + 1
+        return True
+
+    def finalize(self):
+        """Turn accumulated samples into templates (mean vector, renormalised)."""
+        chars, rows = [], []
+        for ch in sorted(self._sums):
+            vec = self._sums[ch] / self._counts[ch]
+            vec = vec - vec.mean()
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                chars.append(ch)
+                rows.append(vec / norm)
+        self.chars = chars
+        self.vectors = np.array(rows, dtype=np.float32).reshape(len(rows), self.size * self.size)
+
+    def save(self, path: str = GLYPH_TEMPLATES_FILE):
+        np.savez_compressed(path, chars=np.array(self.chars), vectors=self.vectors,
+                            size=np.array(self.size))
+
+    @classmethod
+    def load(cls, path: str = GLYPH_TEMPLATES_FILE) -> Optional["GlyphTemplateSet"]:
+        """Load templates saved by save(); None if the file is missing or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls([str(c) for c in data["chars"]], data["vectors"].astype(np.float32),
+                           int(data["size"]))
+        except Exception as e:
+            logger.error(f"Ignoring glyph templates {path}: {e}")
+            return None
+
+
+class GlyphOCREngine:
+    """
+    Reads prompts in the game's fixed font: connected-component segmentation,
+    then normalised correlation of each glyph against the template set.
+    """
+
+    def __init__(self, templates: GlyphTemplateSet):
+        self.templates = templates
+
+    def read(self, image: np.ndarray) -> Optional[GlyphReading]:
+        """Read a binarised crop (2-D uint8). None when nothing could be segmented."""
+        if not len(self.templates):
+            return None
+        glyphs = segment_glyphs(ink_mask(image))
+        if not glyphs:
+            return None
+        features = np.stack([glyph_vector(g, self.templates.size) for g in glyphs])
+        scores = features @ self.templates.vectors.T
+        best = scores.argmax(axis=1)
+        confs = scores[np.arange(len(glyphs)), best]
+        text = "".join(self.templates.chars[i] for i in best)
+        return GlyphReading(text, float(confs.min()), tuple(float(c) for c in confs))
+
+
+def load_glyph_engine(path: str = GLYPH_TEMPLATES_FILE) -> Optional[GlyphOCREngine]:
+    """Glyph engine from the saved template set, or None if no templates have been learned."""
+    templates = GlyphTemplateSet.load(path)
+    if templates is None or not len(templates):
+        return None
+    logger.info(f"Glyph OCR templates loaded ({len(templates)} characters)")
+    return GlyphOCREngine(templates)
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from cancellation import CancelToken
+from config import TYPING_DELAY_MIN, TYPING_DELAY_MAX, TYPING_SPIN_MIN, TYPING_SPIN_MAX
+
+
+def plan_keystrokes(word: str, base_delay: float, inter_key_scale: float = 1.0) -> List[float]:
+    """
+    Offsets in seconds from the first keystroke at which each character is typed.
+    Gaps vary so rhythm is not perfectly metronomic: a triangular spread around the
+    scaled base_delay plus occasional hesitations.
+    """
+    if not word:
+        return []
+    base = max(TYPING_DELAY_MIN, base_delay * inter_key_scale)
+    # Wider spread reads less robotic than a tight band around base.
+    low = max(0.03, base * 0.52)
+    high = min(TYPING_DELAY_MAX, base * 2.45)
+    mode = min(max(base, low), high)
+
+    offsets = [0.0]
+    for _ in word[1:]:
+        gap = random.triangular(low, high, mode)
+        # Hesitation / micro-pauses
+        r = random.random()
+        if r < 0.34:
+            gap += random.uniform(0.1, 0.34)
+        elif r < 0.42:
+            gap += random.uniform(0.16, 0.45)
+        offsets.append(offsets[-1] + gap)
+    return offsets
+
+
+class KeystrokeTimer:
+    """
+    Fires keystrokes against absolute perf_counter deadlines: a coarse sleep to
+    just before the deadline, then a spin. The sleep margin tracks how late the
+    OS wakes us, so coarse timers spin longer and fine ones barely spin at all.
+    Lateness of each key versus its plan is kept for the metrics file.
+    """
+
+    def __init__(self, spin_min: float = TYPING_SPIN_MIN, spin_max: float = TYPING_SPIN_MAX,
+                 history: int = 512):
+        self.spin_min = spin_min
+        self.spin_max = spin_max
+        self.margin = spin_max
+        self._lateness_ms = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.words = 0
+        self.last_planned_ms = 0.0
+        self.last_actual_ms = 0.0
+        self.total_overrun_ms = 0.0
+
+    def wait_until(self, deadline: float, cancel: Optional[CancelToken] = None) -> bool:
+        """Block until perf_counter() >= deadline; True if cancel was set first."""
+        sleep_for = deadline - time.perf_counter() - self.margin
+        if sleep_for > 0:
+            target = time.perf_counter() + sleep_for
+            if cancel is not None:
+                if cancel.sleep(sleep_for):
+                    return True
+            else:
+                time.sleep(sleep_for)
+            overshoot = time.perf_counter() - target
+            # Margin follows the worst recent overshoot, decaying slowly when wake-ups get tighter.
+            self.margin = min(self.spin_max, max(self.spin_min, overshoot * 1.5, self.margin * 0.9))
+        while time.perf_counter() < deadline:
+            if cancel is not None and cancel.cancelled:
+                return True
+        return False
+
+    def run(self, word: str, offsets: List[float], send: Callable[[str], None],
+            cancel: Optional[CancelToken] = None) -> int:
+        """Type word with send(ch) at start + offsets; returns the number of characters sent."""
+        start = time.perf_counter()
+        lateness = []
+        sent = 0
+        for ch, offset in zip(word, offsets):
+            if self.wait_until(start + offset, cancel):
+                break
+            fired = time.perf_counter()
+            send(ch)
+            lateness.append((fired - start - offset) * 1000)
+            sent += 1
+        if not sent:
+            return 0
+        actual_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._lateness_ms.extend(lateness)
+            if sent == len(word):
+                self.words += 1
+                self.last_planned_ms = offsets[-1] * 1000
+                self.last_actual_ms = actual_ms
+                self.total_overrun_ms += actual_ms - self.last_planned_ms
+        return sent
+
+    def get_stats(self) -> Dict[str, float]:
+        """Keystroke lateness versus plan (jitter) and whole-word timing."""
+        with self._lock:
+            late = sorted(self._lateness_ms)
+            words = self.words
+            stats = {
+                "words": words,
+                "last_word_planned_ms": self.last_planned_ms,
+                "last_word_actual_ms": self.last_actual_ms,
+                "average_word_overrun_ms": self.total_overrun_ms / words if words else 0.0,
+                "sleep_margin_ms": self.margin * 1000,
+            }
+        if late:
+            stats.update({
+                "jitter_p50_ms": late[len(late) // 2],
+                "jitter_p95_ms": late[min(len(late) - 1, int(len(late) * 0.95))],
+                "jitter_max_ms": late[-1],
+            })
+        return stats
@@ -48,6 +48,11 @@ class LogQueue:
         self.queue = []
         self.max_size = max_size
         self.lock = __import__('threading').Lock()
+        self._listener = None
+
+    def set_listener(self, listener):
+        """Register a callable invoked (on the adding thread) after each add()."""
+        self._listener = listener
     
     def add(self, message: str, level: str = "INFO"):
         """
@@ -75,6 +80,8 @@ class LogQueue:
             self.queue.append((formatted_msg, color))
             if len(self.queue) > self.max_size:
                 self.queue.pop(0)
+        if self._listener:
+            self._listener()
     
     def pop_all(self) -> list:
         """Get and clear all messages."""
@@ -8,23 +8,37 @@ import shutil
 import requests
 import subprocess
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from typing import Optional
 
 # Import modules
 from config import (
-    SEARCH_MODES, SORT_MODES, MAX_WORKER_THREADS,
+    SEARCH_MODES, SORT_MODES,
     TESSERACT_INSTALLER_URL, TESSERACT_INSTALLER_PATH,
     TYPING_DELAY_MIN, TYPING_DELAY_MAX,
     OCR_INTERVAL_MIN, OCR_INTERVAL_MAX,
-    MAX_TYPED_HISTORY,
-    TURN_GATE_NEED_YOUR,
-    TURN_GATE_NEED_TURN,
+    OCR_RECAPTURE_ATTEMPTS,
+    LOCATE_AFTER_FAILURES, LOCATE_COOLDOWN_SECONDS,
+    VOTE_WINDOW, SUBMIT_MAX_RETYPES,
 )
 from logging_utils import setup_logging, LogQueue
 from state import StateManager
+from event_bus import StateEvent
 from ocr_processor import OCRProcessor
+from capture import grab_screen
+from ocr_process_pool import create_process_pool
+from preprocess import bgra_to_gray
+from region_locator import RegionLocator
+from multi_window import TypingArbiter, region_key, sync_watchers
+from prompt_voter import PromptVoter
+from poll_scheduler import AdaptivePoller, LatestFrameGrabber
 from api_client import DatamuseClient
-from suggestion_manager import SuggestionManager
+from suggestion_manager import SuggestionManager, WordOutcomes
+from cancellation import CancelToken, pause
+from keystroke_plan import KeystrokeTimer, plan_keystrokes
+from task_scheduler import LaneScheduler, Lane
+from tracing import tracer
+from submit_verifier import SubmitVerifier, ACCEPTED, REJECTED, TIMED_OUT
 from ui_manager import RegionOverlay, RegionSelector, LogDisplay, HelpWindow, DefinitionPopup
 from tray_manager import TrayIcon
 from tkinter import messagebox, simpledialog
@@ -33,36 +47,22 @@ import tkinter as tk
 logger = logging.getLogger(__name__)
 
 
-def _type_word_human_like(word: str, base_delay: float, inter_key_scale: float = 1.0) -> None:
+def _type_word_human_like(word: str, base_delay: float, timer: KeystrokeTimer, inter_key_scale: float = 1.0,
+                          cancel: Optional[CancelToken] = None) -> int:
     """
     Type a word with variable gaps between keys so rhythm is not perfectly metronomic.
     base_delay is the typical seconds between keystrokes (from settings).
     inter_key_scale nudges speed without changing the saved setting (Shift vs auto).
+    The whole timing plan is drawn up front and timer fires each key at its absolute
+    deadline, so sleep overshoot does not accumulate across the word.
+    cancel is checked before every keystroke. Returns the number of characters typed.
     """
     if not word:
-        return
+        return 0
     if base_delay <= 0:
         keyboard.write(word, delay=0)
-        return
-
-    base = max(TYPING_DELAY_MIN, base_delay * inter_key_scale)
-    # Wider spread reads less robotic than a tight band around base.
-    low = max(0.03, base * 0.52)
-    high = min(TYPING_DELAY_MAX, base * 2.45)
-    mode = min(max(base, low), high)
-
-    for i, ch in enumerate(word):
-        keyboard.write(ch)
-        if i >= len(word) - 1:
-            break
-        # Hesitation / micro-pauses (more frequent than before so rhythm varies)
-        r = random.random()
-        if r < 0.34:
-            time.sleep(random.uniform(0.1, 0.34))
-        elif r < 0.42:
-            time.sleep(random.uniform(0.16, 0.45))
-        dt = random.triangular(low, high, mode)
-        time.sleep(dt)
+        return len(word)
+    return timer.run(word, plan_keystrokes(word, base_delay, inter_key_scale), keyboard.write, cancel)
 
 
 class OCRApplication:
@@ -71,9 +71,26 @@ class OCRApplication:
     def __init__(self):
         self.state_manager = StateManager()
         self.ocr_processor = OCRProcessor()
+        self.state_manager.add_metrics_source("ocr_cache", self.ocr_processor.get_stats)
+        # Saved crops of the prompt / YOUR TURN boxes, used to find them again on screen.
+        self.region_locator = RegionLocator.load()
+        # Serialises typing across game windows (and focuses the target when several are watched).
+        self.typing_arbiter = TypingArbiter()
+        self.state_manager.add_metrics_source("typing_arbiter", self.typing_arbiter.get_stats)
+        self.keystroke_timer = KeystrokeTimer()
+        self.state_manager.add_metrics_source("typing", self.keystroke_timer.get_stats)
         self.api_client = DatamuseClient()
+        self.state_manager.add_metrics_source("suggestion_cache", self.api_client.get_cache_stats)
+        # Reads the regions right after Enter: rejected words are retyped and ranked down.
+        self.submit_verifier = SubmitVerifier(self.ocr_processor)
+        self.state_manager.add_metrics_source("submit_verify", self.submit_verifier.get_stats)
+        self.word_outcomes = WordOutcomes.load()
         self.log_queue = LogQueue()
-        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS)
+        # Worker pool with priority lanes; a newer Shift / lookup job replaces a queued stale one.
+        self.scheduler = LaneScheduler()
+        self.state_manager.add_metrics_source("scheduler", self.scheduler.get_stats)
+        # Set by a Shift press that paused auto mode; the Shift job that runs turns it back on.
+        self._shift_resume_auto = False
 
         self.region_overlay = None
         self.log_display = None
@@ -81,6 +98,9 @@ class OCRApplication:
         self.tray_icon = None
 
         self.state_manager.load_state()
+        self.state_manager.load_history()
+        self.state_manager.start_persistence()
+        self.ocr_processor.set_profiles(self.state_manager.get_state().ocr_profiles)
 
         # When True, auto_mode_watcher clears its last-seen letters (fix F1 re-enable with same prompt).
         self._auto_watcher_reset = False
@@ -105,29 +125,44 @@ class OCRApplication:
             'exit': self.graceful_exit,
         }
 
-    def _turn_gate_accepts(self, text: str) -> bool:
-        """YOUR TURN → yourturn; tolerate partial / noisy OCR."""
-        if not text:
-            return False
+    def _read_tick(self, region, turn_region, windows, frame):
+        """
+        Every read this tick needs (prompt and turn region of the main window and of each
+        extra window), submitted together through OCRProcessor.read_batch.
+        Returns (readings, gates) keyed by region_key; see _turn_ok for the gates.
+        """
+        prompts = [region, *(w.region for w in windows)]
+        turns = [r for r in (turn_region, *(w.turn_region for w in windows)) if r]
+        readings, gates = self.ocr_processor.read_batch(
+            [(dict(r), frame.crop(r)) for r in prompts],
+            [(dict(r), frame.crop(r)) for r in turns],
+        )
         return (
-            (TURN_GATE_NEED_YOUR in text and TURN_GATE_NEED_TURN in text)
-            or ("yourturn" in text)
-            or (TURN_GATE_NEED_YOUR in text and len(text) >= 4)
+            {region_key(r): reading for r, reading in zip(prompts, readings)},
+            {region_key(r): gate for r, gate in zip(turns, gates)},
         )
 
-    def _auto_mode_turn_ok(self):
+    @staticmethod
+    def _turn_ok(gates, turn_region):
         """
-        If turn_region is set, auto mode only types when OCR shows YOUR TURN.
-        Returns (ok, turn_ocr_text_or_none) so the watcher can log without double OCR.
+        If turn_region is set, auto mode only types when YOUR TURN is visible
+        (calibrated detector, OCR on ambiguous frames), read from this tick's gates.
+        Returns (ok, turn_detail_or_none) so the watcher can log without a second check.
         """
-        state = self.state_manager.get_state()
-        tr = state.turn_region
-        if not tr:
+        if not turn_region:
             return True, None
-        text = self.ocr_processor.perform_ocr_turn_gate(dict(tr))
-        if not text:
-            return False, ""
-        return self._turn_gate_accepts(text), text
+        return gates[region_key(turn_region)]()
+
+    def _prefetch_suggestions(self, letters: str, window=None):
+        """
+        Start the lookup for letters while the turn gate is still being checked.
+        The typing path later joins it through the client's in-flight request or cache.
+        window (an extra window's key; None for the main one) keeps each window's
+        prefetch separate: a newer prompt only replaces the same window's lookup.
+        """
+        mode = SEARCH_MODES[self.state_manager.get_state().current_mode_index]
+        self.scheduler.submit(Lane.SUGGESTIONS, self.api_client.get_suggestions, letters, mode,
+                              key=("prefetch", window))
 
     def log(self, message: str, level: str = "INFO"):
         """Log message to UI."""
@@ -155,6 +190,7 @@ Typing delay: {state.typing_delay}s (~avg between keys)
 OCR interval: {state.ocr_interval}s (auto mode poll)
 Auto mode only on your turn: {tg}
 Auto Mode: {'On' if state.auto_mode_active else 'Off'}
+Extra game windows: {len(state.windows)}
 Words Typed: {state.total_typed_count}
 API Status: {state.api_status}
 """
@@ -169,6 +205,9 @@ Fetch Suggestions:  SHIFT
 Fetch Definitions:  Alt+1
 Select Regions:     TAB — letters, then YOUR TURN box (Esc to skip second)
 Clear turn region:  Ctrl+F2
+Auto-locate Regions: Ctrl+F3 — find the saved boxes again after the window moved
+Add Game Window:    Ctrl+F4 — letters + YOUR TURN of another window (auto mode)
+Remove Extra Windows: Ctrl+Shift+F4
 
 Change Search Mode: Page Up
 Change Sort Mode:   Page Down
@@ -197,24 +236,34 @@ Quit Application:   Ctrl+C
                 self.state_manager.update_state(auto_mode_active=True)
             return
 
-        self.executor.submit(self._handle_shift_async_with_auto_resume, resume_auto)
+        # Quick repeated presses collapse into one job: only the newest queued press runs.
+        if resume_auto:
+            self._shift_resume_auto = True
+        self.scheduler.submit(Lane.TYPING, self._handle_shift_async_with_auto_resume, key="shift")
 
-    def _handle_shift_async_with_auto_resume(self, resume_auto: bool):
+    def _handle_shift_async_with_auto_resume(self):
         try:
             self._handle_shift_async("shift")
         finally:
-            if resume_auto:
+            if self._shift_resume_auto:
+                self._shift_resume_auto = False
                 self.state_manager.update_state(auto_mode_active=True)
 
-    def _handle_shift_async(self, typing_source: str = "shift"):
-        """Fetch letters from region, get suggestions, type first/next word and Enter (Shift or auto)."""
+    def _handle_shift_async(self, typing_source: str = "shift", letters: Optional[str] = None,
+                            cancel: Optional[CancelToken] = None):
+        """
+        Fetch letters from region, get suggestions, type first/next word and Enter (Shift or auto).
+        letters skips the OCR step when the caller has already read the prompt (auto mode);
+        cancel lets the auto-mode watcher abort typing when the turn or prompt changes.
+        """
         state = self.state_manager.get_state()
         region = state.region
         if not region:
             return
 
-        self.log("Processing WBT...")
-        letters = self.ocr_processor.perform_ocr(region)
+        if letters is None:
+            self.log("Processing WBT...")
+            letters = self.ocr_processor.perform_ocr(region, recapture=OCR_RECAPTURE_ATTEMPTS)
 
         if not letters:
             self.log("WBT returned no characters.", "WARNING")
@@ -224,20 +273,22 @@ Quit Application:   Ctrl+C
         mode = SEARCH_MODES[state.current_mode_index]
 
         if letters == state.last_ocr_text and state.suggestions:
-            self.type_next_word(typing_source)
+            self.type_next_word(typing_source, cancel)
             return
 
-        self.state_manager.update_state(last_ocr_text=letters)
+        self.state_manager.update_state(last_ocr_text=letters, last_prompt_time=time.monotonic())
         self.log(f"--- WBT: {letters} ---")
 
-        suggestions = self.api_client.get_suggestions(letters, mode)
+        with tracer.span("suggestions.lookup", "suggestions", letters=letters):
+            suggestions = self.api_client.get_suggestions(letters, mode)
         self.state_manager.update_state(api_status=self.api_client.status)
 
         if suggestions:
-            suggestions = SuggestionManager.sort_suggestions(
+            self.ocr_processor.lexicon.learn(letters, len(suggestions))
+            suggestions = self.word_outcomes.rank(SuggestionManager.sort_suggestions(
                 suggestions,
                 SORT_MODES[state.current_sort_mode_index]
-            )
+            ))
             self.state_manager.update_state(suggestions=suggestions, suggestion_index=0)
 
             self.log(f"Found {len(suggestions)} suggestions.")
@@ -248,7 +299,15 @@ Quit Application:   Ctrl+C
         else:
             self.state_manager.update_state(suggestions=[], suggestion_index=0)
 
-        self.type_next_word(typing_source)
+        self.type_next_word(typing_source, cancel)
+
+    def _auto_type_job(self, letters: str, cancel: CancelToken):
+        """Executor job typing the main window's prompt; errors are reported like the watcher's own."""
+        try:
+            self._handle_shift_async("auto", letters, cancel)
+        except Exception as e:
+            logger.error(f"Auto mode error: {e}", exc_info=True)
+            self.log(f"[AUTO ERROR]: {str(e)}", "ERROR")
 
     def handle_alt_1_press(self):
         """WBT and fetch definitions."""
@@ -258,7 +317,7 @@ Quit Application:   Ctrl+C
             self.select_region()
             return
 
-        self.executor.submit(self._handle_alt_1_async)
+        self.scheduler.submit(Lane.DEFINITIONS, self._handle_alt_1_async, key="definitions")
 
     def _handle_alt_1_async(self):
         """Async WBT handler."""
@@ -268,7 +327,7 @@ Quit Application:   Ctrl+C
             return
 
         self.log("Processing WBT...")
-        word = self.ocr_processor.perform_ocr(region)
+        word = self.ocr_processor.perform_ocr(region, recapture=OCR_RECAPTURE_ATTEMPTS)
 
         if not word:
             self.log("WBT returned no definitions.", "WARNING")
@@ -277,64 +336,166 @@ Quit Application:   Ctrl+C
         definitions = self.api_client.get_definitions(word)
         self.state_manager.update_state(api_status=self.api_client.status)
 
-        if definitions:
-            self.state_manager.update_state(definitions=definitions, definition_index=0)
-            self.log(f"Found {len(definitions)} definitions.")
-        else:
+        if not definitions:
             self.state_manager.update_state(definitions=[], definition_index=0)
             self.log("No definitions found.", "WARNING")
+            return
 
+        self.state_manager.update_state(definitions=definitions, definition_index=0)
+        self.log(f"Found {len(definitions)} definitions.")
         self.log(f"Showing definition for: '{word}'")
+        # Rendered on the Tk thread; this worker is free again straight away.
+        self.log_display.post(DefinitionPopup.show, self.log_display.root, word, definitions)
 
-        def_popup = DefinitionPopup.show(self.log_display.root, word, definitions)
-        def_popup.wait_window(def_popup)
-
-    def type_next_word(self, typing_source: str = "shift"):
+    def type_next_word(self, typing_source: str = "shift", cancel: Optional[CancelToken] = None):
         """Type next untyped suggestion."""
         state = self.state_manager.get_state()
         if not state.suggestions:
             self.log("No suggestions loaded.", "WARNING")
             return
 
-        word, next_idx = SuggestionManager.get_next_untyped_word(
-            state.suggestions,
-            state.suggestion_index,
-            state.typed_words_history
-        )
+        # A word the game rejects is followed at once by the next candidate.
+        for attempt in range(SUBMIT_MAX_RETYPES + 1):
+            word, next_idx = SuggestionManager.get_next_untyped_word(
+                state.suggestions,
+                state.suggestion_index,
+                state.typed_words_history
+            )
 
-        if not word:
-            self.log("All available suggestions have been typed.", "WARNING")
-            return
+            if not word:
+                self.log("All available suggestions have been typed.", "WARNING")
+                return
+
+            with tracer.span("type_next_word", "typing", word=word, attempt=attempt, source=typing_source):
+                submitted = self._type_and_submit(word, state.typing_delay, typing_source, state.region,
+                                                  think=attempt == 0, cancel=cancel)
+            if not submitted:
+                return
+
+            latency_ms = (time.monotonic() - state.last_prompt_time) * 1000 if state.last_prompt_time else 0.0
+            letters = state.last_ocr_text
+            # Only words the game did not reject count as used; a rejected one is just skipped.
+            if not letters or self._verify_submit(word, letters, state.region, state.turn_region) != REJECTED:
+                self.state_manager.record_typed_word(word, letters or "", latency_ms, next_idx, state.suggestions)
+                return
+            self.state_manager.skip_suggestion(next_idx, state.suggestions)
+            state = self.state_manager.get_state()
 
+    def _verify_submit(self, word: str, letters: str, region, turn_region, label: str = "") -> str:
+        """Watch the regions after Enter and feed the outcome into suggestion ranking."""
+        with tracer.span("submit.verify", "typing", word=word):
+            outcome = self.submit_verifier.verify(letters, region, turn_region)
+        if outcome != TIMED_OUT:
+            self.word_outcomes.record(word, outcome == ACCEPTED)
+        if outcome == REJECTED:
+            self.log(f"{label}'{word}' was rejected.", "WARNING")
+        return outcome
+
+    def _type_and_submit(self, word: str, delay: float, typing_source: str, region, label: str = "",
+                         think: bool = True, cancel: Optional[CancelToken] = None) -> bool:
+        """
+        Pause, then type word and Enter into the window holding region (one window at a time).
+        think=False skips the pause (retyping after a rejected word). Returns False when
+        cancel was set before Enter; the partial word is erased instead of submitted.
+        """
         # "Thinking" before hands move (same path for Shift and auto; auto slightly longer).
-        if typing_source == "auto":
-            time.sleep(random.uniform(0.52, 1.12))
-        else:
-            time.sleep(random.uniform(0.3, 0.72))
-
-        delay = state.typing_delay
-        self.log(f"Typing: '{word}'")
-        # Slower inter-key timing than raw setting (auto a bit slower than Shift).
-        scale = 1.32 if typing_source == "auto" else 1.22
-        _type_word_human_like(word, delay, inter_key_scale=scale)
-        time.sleep(random.uniform(0.26, 0.62))
-        keyboard.press_and_release('enter')
-
-        state.typed_words_history.add(word)
-        state.total_typed_count += 1
-        if len(state.typed_words_history) > MAX_TYPED_HISTORY:
-            state.typed_words_history.pop()
-
-        self.state_manager.add_typing_record(word, state.last_ocr_text or "")
-        self.state_manager.update_state(
-            typed_words_history=state.typed_words_history,
-            total_typed_count=state.total_typed_count,
-            suggestion_index=next_idx
-        )
+        if think:
+            if typing_source == "auto":
+                thinking = random.uniform(0.52, 1.12)
+            else:
+                thinking = random.uniform(0.3, 0.72)
+            with tracer.span("typing.think", "typing"):
+                if pause(thinking, cancel):
+                    return False
+
+        with self.typing_arbiter.turn(region):
+            if cancel is not None and cancel.cancelled:
+                return False
+            self.log(f"{label}Typing: '{word}'")
+            # Slower inter-key timing than raw setting (auto a bit slower than Shift).
+            scale = 1.32 if typing_source == "auto" else 1.22
+            with tracer.span("typing.keys", "typing", chars=len(word)):
+                typed = _type_word_human_like(word, delay, self.keystroke_timer,
+                                              inter_key_scale=scale, cancel=cancel)
+            with tracer.span("typing.before_enter", "typing"):
+                stopped = typed < len(word) or pause(random.uniform(0.26, 0.62), cancel)
+            if stopped:
+                for _ in range(typed):
+                    keyboard.press_and_release('backspace')
+                self.log(f"{label}Stopped typing '{word}' ({cancel.reason}).", "WARNING")
+                return False
+            keyboard.press_and_release('enter')
+            return True
+
+    def _tick_windows(self, windows, readings, gates, voter):
+        """Vote on each extra window's prompt from this tick's reads; new prompts go to the scheduler."""
+        for w in windows:
+            letters = voter.add(w.key, readings[w.key])
+            if w.busy.is_set():
+                self._check_typing_job(w.cancel, w.last_text, letters, gates, w.turn_region)
+                continue
+            if not letters or letters == w.last_text:
+                continue
+            if letters != w.prefetched:
+                w.prefetched = letters
+                self._prefetch_suggestions(letters, w.key)
+            if not self._turn_ok(gates, w.turn_region)[0]:
+                continue
+            w.last_text = letters
+            w.busy.set()
+            self.log(f"[{w.name}] Auto-detected: '{letters}'")
+            w.cancel = CancelToken()
+            w.job = self.scheduler.submit(Lane.TYPING, self._handle_window_prompt, w, letters, w.cancel)
+
+    def _check_typing_job(self, cancel: CancelToken, job_letters: str, letters: Optional[str],
+                          gates, turn_region):
+        """Cancel a running typing job once the prompt has changed or the turn is over."""
+        if cancel.cancelled:
+            return
+        if letters and letters != job_letters:
+            cancel.cancel("prompt changed")
+        elif not self._turn_ok(gates, turn_region)[0]:
+            cancel.cancel("turn ended")
+
+    def _handle_window_prompt(self, w, letters: str, cancel: CancelToken):
+        """Suggestions for an extra window's prompt (shared cache), then type the first untyped one."""
+        try:
+            state = self.state_manager.get_state()
+            w.last_prompt_time = time.monotonic()
+            suggestions = self.api_client.get_suggestions(letters, SEARCH_MODES[state.current_mode_index])
+            if suggestions:
+                self.ocr_processor.lexicon.learn(letters, len(suggestions))
+                suggestions = self.word_outcomes.rank(SuggestionManager.sort_suggestions(
+                    suggestions,
+                    SORT_MODES[state.current_sort_mode_index]
+                ))
+            w.suggestions, w.suggestion_index = suggestions, 0
+
+            label = f"[{w.name}] "
+            for attempt in range(SUBMIT_MAX_RETYPES + 1):
+                word, next_idx = SuggestionManager.get_next_untyped_word(
+                    w.suggestions, w.suggestion_index, state.typed_words_history
+                )
+                if not word:
+                    self.log(f"{label}No untyped suggestions for '{letters}'.", "WARNING")
+                    return
+                if not self._type_and_submit(word, state.typing_delay, "auto", w.region, label=label,
+                                             think=attempt == 0, cancel=cancel):
+                    return
+                w.suggestion_index = next_idx
+                latency_ms = (time.monotonic() - w.last_prompt_time) * 1000
+                if self._verify_submit(word, letters, w.region, w.turn_region, label) != REJECTED:
+                    self.state_manager.record_typed_word(word, letters, latency_ms, None)
+                    return
+        except Exception as e:
+            logger.error(f"[{w.name}] auto mode error: {e}", exc_info=True)
+        finally:
+            w.busy.clear()
 
     def select_region(self):
         """Select letter region, then a second fullscreen picker for YOUR TURN (Esc skips)."""
         parent = self.log_display.root if self.log_display and self.log_display.root else None
+        st = self.state_manager.get_state()
         try:
             if self.region_overlay:
                 self.region_overlay.show_region(None)
@@ -355,20 +516,121 @@ Quit Application:   Ctrl+C
         except RuntimeError:
             self.log("Turn region skipped — letters only.", "WARNING")
 
+        if turn_region != st.turn_region:
+            self.ocr_processor.reset_turn_detector()
         self.state_manager.update_state(region=new_region, turn_region=turn_region)
         self.log("Regions saved (letters" + (" + your turn)." if turn_region else ")."))
-        if self.region_overlay:
+        if self.region_overlay and new_region == st.region and turn_region == st.turn_region:
+            # Same regions: no REGION_CHANGED event, so restore the overlay hidden above.
             self.region_overlay.show_region(new_region, turn_region)
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
+        self.scheduler.submit(Lane.BACKGROUND, self._remember_region_templates, new_region, turn_region,
+                              key="templates")
+
+    def add_window(self):
+        """Select the letter and YOUR TURN regions of another game window for auto mode."""
+        parent = self.log_display.root if self.log_display and self.log_display.root else None
+        try:
+            region = RegionSelector.select_region()
+        except RuntimeError:
+            self.log("Window selection cancelled.", "WARNING")
+            return
+
+        messagebox.showinfo(
+            "Your turn region",
+            "Select the box around **YOUR TURN** in the same window.\n\n"
+            "Press Esc in the next screen to skip — then auto mode types there on any letter change.",
+            parent=parent,
+        )
+        turn_region = None
+        try:
+            turn_region = RegionSelector.select_region()
+        except RuntimeError:
+            self.log("Turn region skipped for this window.", "WARNING")
+
+        state = self.state_manager.get_state()
+        name = f"window {len(state.windows) + 2}"
+        window = {"name": name, "region": region, "turn_region": turn_region}
+        self.state_manager.update_state(windows=state.windows + (window,))
+        self.log(f"Added {name}: {len(state.windows) + 2} game windows watched in auto mode.")
+        self.state_manager.request_save("config")
+
+    def clear_windows(self):
+        """Stop watching the extra game windows."""
+        self.state_manager.update_state(windows=())
+        self.log("Extra game windows removed.")
+        self.state_manager.request_save("config")
+
+    def _remember_region_templates(self, region, turn_region):
+        """Save crops of freshly selected regions so auto-locate can find them later."""
+        try:
+            # Let the selector window finish closing before grabbing.
+            time.sleep(0.3)
+            for kind, r in (("prompt", region), ("turn", turn_region)):
+                if r:
+                    self.region_locator.remember(kind, bgra_to_gray(self.ocr_processor.capture(r)))
+                else:
+                    self.region_locator.forget(kind)
+            self.region_locator.save()
+        except Exception as e:
+            logger.error(f"Error saving region templates: {e}")
+
+    def handle_locate_regions(self):
+        """Hotkey: search the screen for the saved prompt / YOUR TURN boxes."""
+        if not self.region_locator.has_template("prompt"):
+            self.log("Nothing to locate yet — select the regions once with TAB.", "WARNING")
+            return
+        self.scheduler.submit(Lane.BACKGROUND, self.locate_regions, key="locate")
+
+    def locate_regions(self) -> bool:
+        """
+        Find the prompt and YOUR TURN boxes on a full-screen capture and move the
+        regions there (the overlay follows through the region-changed event).
+        Returns True if any region moved.
+        """
+        state = self.state_manager.get_state()
+        start = time.perf_counter()
+        monitor, bgra = grab_screen()
+        screen = bgra_to_gray(bgra)
+        origin_x, origin_y = monitor["left"], monitor["top"]
+
+        changes = {}
+        for kind, field in (("prompt", "region"), ("turn", "turn_region")):
+            old = getattr(state, field)
+            if not self.region_locator.has_template(kind) or (kind == "turn" and not old):
+                continue
+            near = None
+            if old:
+                near = {"left": old["left"] - origin_x, "top": old["top"] - origin_y}
+            found = self.region_locator.locate(screen, kind, near=near)
+            if found is None:
+                continue
+            rel, score = found
+            new = {
+                "left": rel["left"] + origin_x,
+                "top": rel["top"] + origin_y,
+                "width": rel["width"],
+                "height": rel["height"],
+            }
+            if new != old:
+                changes[field] = new
+                logger.info(f"Located {kind} box at {new} (score {score:.2f})")
+
+        duration = (time.perf_counter() - start) * 1000
+        if not changes:
+            self.log(f"Auto-locate: regions unchanged ({duration:.0f} ms).")
+            return False
+        self.state_manager.update_state(**changes)
+        self.state_manager.request_save("config")
+        self.log(f"Auto-locate: moved {' + '.join(changes)} ({duration:.0f} ms).")
+        return True
 
     def clear_turn_region(self):
         """Remove second region; auto mode no longer gates on YOUR TURN."""
         self.state_manager.update_state(turn_region=None)
+        self.ocr_processor.reset_turn_detector()
         self.log("Turn region cleared — auto mode no longer waits for your turn.")
-        if self.region_overlay:
-            st = self.state_manager.get_state()
-            self.region_overlay.show_region(st.region, None)
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
 
     def set_search_mode(self, mode_index: int):
         """Set search mode."""
@@ -383,7 +645,7 @@ Quit Application:   Ctrl+C
             last_ocr_text=None
         )
         self.log(f"Current Mode: {SEARCH_MODES[mode_index]}")
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
 
     def set_typing_delay(self):
         """Prompt for typing delay (seconds per character) and save to ocr_config.json."""
@@ -404,7 +666,7 @@ Quit Application:   Ctrl+C
         if val is None:
             return
         self.state_manager.update_state(typing_delay=val)
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
         self.log(f"Typing delay set to {val} s per character.")
 
     def set_ocr_interval(self):
@@ -425,7 +687,7 @@ Quit Application:   Ctrl+C
         if val is None:
             return
         self.state_manager.update_state(ocr_interval=val)
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
         self.log(f"OCR interval set to {val} s.")
 
     def set_sort_mode(self, mode_index: int):
@@ -447,23 +709,21 @@ Quit Application:   Ctrl+C
             )
 
         self.log(f"Current Sort: {SORT_MODES[mode_index]}")
-        self.state_manager.save_state()
+        self.state_manager.request_save("config")
 
     def clear_typed_history(self):
         """Clear typed history."""
-        self.state_manager.update_state(
-            typed_words_history=set(),
-            typing_records=[],
-            total_typed_count=0
-        )
+        self.state_manager.clear_history()
         self.log("Cleared history of typed words.")
-        self.state_manager.save_state()
+        self.state_manager.request_save("config", "history")
 
     def undo_last_word(self):
         """Undo last typed word."""
         word = self.state_manager.undo_last_word()
         if word:
             self.log(f"Undone: '{word}'")
+            # The undo marker is written by the persistence worker, not on the hotkey thread.
+            self.state_manager.request_save("history")
         else:
             self.log("Nothing to undo.", "WARNING")
 
@@ -481,60 +741,145 @@ Quit Application:   Ctrl+C
             self.log("Auto mode DISABLED.")
 
     def auto_mode_watcher(self):
-        """Watch for region changes in auto mode (background thread)."""
+        """
+        Watch for region changes in auto mode (background thread).
+        Sleeps on state events while auto mode is off or no region is set. While
+        active, a LatestFrameGrabber reads the letter and turn regions of every
+        watched window in one grab per tick, paced by an AdaptivePoller: fast right
+        after a prompt, turn or screen change, backing off to ocr_interval while the
+        screen is static. A new prompt is acted on once PromptVoter trusts the reading;
+        it is typed on the scheduler, and the job is cancelled if the prompt changes or
+        the turn ends first.
+        """
+        # WINDOWS_CHANGED only wakes the loop (sync_watchers picks the windows up); it leaves
+        # the main window's typing job and voter alone.
+        watched = (StateEvent.AUTO_MODE_TOGGLED, StateEvent.REGION_CHANGED, StateEvent.WINDOWS_CHANGED,
+                   StateEvent.SETTINGS_CHANGED)
+        events = self.state_manager.events.subscribe(watched)
+        poller = AdaptivePoller(lambda: self.state_manager.get_state().ocr_interval)
+        grabber = LatestFrameGrabber(poller)
+        grabber.start()
+        # State changes also cut short a wait for the next frame.
+        self.state_manager.events.subscribe(watched).run_in_thread(
+            lambda e: grabber.interrupt(), "WatcherWake"
+        )
+        self.state_manager.add_metrics_source("capture", grabber.capture.get_stats)
+        self.state_manager.add_metrics_source("poll", poller.get_stats)
+        voter = PromptVoter()
+        self.state_manager.add_metrics_source("prompt_vote", voter.get_stats)
+        windows = []
+        pending = []
         last_text = None
+        last_gate = None
+        prefetched = None
+        # Frames polled fast to confirm an untrusted reading; capped so OCR noise cannot pin the fast rate.
+        confirming = 0
+        seq = 0
+        # Typing for the current prompt runs on the scheduler so this loop can cancel it.
+        job = None
+        job_cancel = CancelToken()
         last_warn_empty = 0.0
         last_warn_gate = 0.0
+        # Consecutive unreadable prompt frames; enough of them means the window may have moved.
+        failures = 0
+        last_locate = 0.0
         while True:
             state = self.state_manager.get_state()
             poll = state.ocr_interval
-            if not state.auto_mode_active:
-                time.sleep(poll)
+            if not state.auto_mode_active or not state.region:
+                grabber.set_regions(())
+                job_cancel.cancel("auto mode off")
+                for w in windows:
+                    w.stop("auto mode off")
+                pending += events.wait()
                 continue
 
-            if not state.region:
-                time.sleep(poll)
-                continue
+            pending += events.drain()
+            if any(e.kind is StateEvent.REGION_CHANGED for e in pending):
+                job_cancel.cancel("region changed")
+                last_text = prefetched = None
+                voter.reset()
+            pending = []
 
             if self._auto_watcher_reset:
                 self._auto_watcher_reset = False
-                last_text = None
+                last_text = prefetched = None
+                voter.reset()
+                for w in windows:
+                    w.stop("watcher reset")
+                windows = []
+            windows = sync_watchers(state.windows, windows)
+            self.typing_arbiter.focus_windows = bool(windows)
+
+            region = dict(state.region)
+            extra_regions = [r for w in windows for r in w.regions()]
+            grabber.set_regions([region, state.turn_region, *extra_regions])
+            polled = grabber.wait_frame(seq, timeout=poll)
+            if polled is None:
+                continue
+            seq = polled.seq
+            frame = polled.frame
 
             try:
-                region = dict(state.region)
-                letters = self.ocr_processor.perform_ocr(region)
+                readings, gates = self._read_tick(region, state.turn_region, windows, frame)
+                self._tick_windows(windows, readings, gates, voter)
+                reading = readings[region_key(region)]
+                letters = voter.add(region_key(region), reading)
+                if job is not None and not job.done():
+                    self._check_typing_job(job_cancel, last_text, letters, gates, state.turn_region)
                 now = time.monotonic()
+                failures = failures + 1 if reading is None else 0
+                if (failures >= LOCATE_AFTER_FAILURES and now - last_locate > LOCATE_COOLDOWN_SECONDS
+                        and self.region_locator.has_template("prompt")):
+                    failures = 0
+                    last_locate = now
+                    # Full-screen grab + pyramid match: off the watcher thread. A move is
+                    # applied by locate_regions and reaches this loop as REGION_CHANGED.
+                    self.scheduler.submit(Lane.BACKGROUND, self.locate_regions, key="locate")
                 if not letters:
-                    if now - last_warn_empty > 8.0:
+                    if reading is None and now - last_warn_empty > 8.0:
                         self.log(
                             "Auto mode: letter OCR is empty — check the letter region (TAB).",
                             "WARNING",
                         )
                         last_warn_empty = now
-                    time.sleep(poll)
+                    if reading is not None and confirming < VOTE_WINDOW:
+                        # A reading the voter does not trust yet: confirm it on the next frame.
+                        confirming += 1
+                        poller.activity()
                     continue
+                confirming = 0
 
                 if letters != last_text:
-                    gate_ok, turn_ocr = self._auto_mode_turn_ok()
+                    # Suggestions load while the gate is read; typing joins the same request.
+                    if letters != prefetched:
+                        prefetched = letters
+                        tracer.instant("prompt.read", "watcher", letters=letters)
+                        self._prefetch_suggestions(letters)
+                    with tracer.span("turn_gate", "turn_gate"):
+                        gate_ok, turn_ocr = self._turn_ok(gates, state.turn_region)
+                    if gate_ok != last_gate:
+                        last_gate = gate_ok
+                        poller.activity()
                     if not gate_ok:
                         if state.turn_region and now - last_warn_gate > 8.0:
                             self.log(
-                                f"Auto mode: waiting for YOUR TURN (turn OCR: {turn_ocr!r})",
+                                f"Auto mode: waiting for YOUR TURN (turn gate: {turn_ocr!r})",
                                 "WARNING",
                             )
                             last_warn_gate = now
-                        time.sleep(poll)
                         continue
                     self.log(f"Auto-detected: '{letters}'")
+                    tracer.instant("prompt.accepted", "watcher", letters=letters)
                     last_text = letters
-                    self._handle_shift_async("auto")
+                    job_cancel = CancelToken()
+                    job = self.scheduler.submit(Lane.TYPING, self._auto_type_job, letters, job_cancel, key="auto")
+                    # Watch closely while typing: a turn or prompt change cancels the job.
+                    poller.activity()
             except Exception as e:
                 logger.error(f"Auto mode error: {e}", exc_info=True)
                 self.log(f"[AUTO ERROR]: {str(e)}", "ERROR")
                 time.sleep(2)
-                continue
-
-            time.sleep(poll)
 
     def show_help_window(self):
         """Show help window."""
@@ -572,12 +917,30 @@ Quit Application:   Ctrl+C
             self.tray_icon = TrayIcon("WBT", tray_callbacks)
             if not self.tray_icon.run_in_thread():
                 self.log("Failed to initialize tray icon", "WARNING")
+                return
+
+            self.tray_icon.set_tooltip(self._tray_tooltip(self.state_manager.get_state()))
+            self.state_manager.events.subscribe(
+                (StateEvent.MODE_CHANGED, StateEvent.AUTO_MODE_TOGGLED, StateEvent.STATUS_CHANGED)
+            ).run_in_thread(
+                lambda e: self.tray_icon.set_tooltip(self._tray_tooltip(e.state)),
+                "TrayEvents",
+            )
         except ImportError:
             self.log("Tray icon unavailable (optional dependency)", "WARNING")
         except Exception as e:
             logger.error(f"Tray initialization error: {e}", exc_info=True)
             self.log(f"Tray icon error: {str(e)}", "WARNING")
 
+    @staticmethod
+    def _tray_tooltip(state) -> str:
+        """Short status line for the tray icon tooltip."""
+        return (
+            f"WBT - Auto {'On' if state.auto_mode_active else 'Off'} | "
+            f"{SEARCH_MODES[state.current_mode_index]} / {SORT_MODES[state.current_sort_mode_index]} | "
+            f"Typed {state.total_typed_count} | {state.api_status}"
+        )
+
     def check_and_install_tesseract(self) -> bool:
         """Check for Tesseract and prompt installation."""
         import pytesseract
@@ -639,6 +1002,8 @@ Quit Application:   Ctrl+C
         if not self.check_and_install_tesseract():
             time.sleep(2)
             self.graceful_exit(1)
+        # Started once the Tesseract path is known: the workers are handed it on startup.
+        self.ocr_processor.pool = create_process_pool()
 
         self.region_overlay = RegionOverlay()
         self.log_display = LogDisplay(
@@ -648,6 +1013,10 @@ Quit Application:   Ctrl+C
             if self.region_overlay
             else None,
         )
+        self.state_manager.events.subscribe((StateEvent.REGION_CHANGED,)).run_in_thread(
+            lambda e: self.region_overlay.show_region(e.state.region, e.state.turn_region),
+            "OverlayEvents",
+        )
         time.sleep(0.5)
 
         self.log("========== WBT STARTED ==========")
@@ -671,6 +1040,9 @@ Quit Application:   Ctrl+C
         keyboard.add_hotkey('caps lock', lambda: self.log_display.toggle_visibility())
         keyboard.add_hotkey('f1', self.toggle_auto_mode)
         keyboard.add_hotkey('ctrl+f2', self.clear_turn_region)
+        keyboard.add_hotkey('ctrl+f3', self.handle_locate_regions)
+        keyboard.add_hotkey('ctrl+f4', self.add_window)
+        keyboard.add_hotkey('ctrl+shift+f4', self.clear_windows)
         keyboard.add_hotkey('.', self.show_help_window)
         keyboard.add_hotkey('ctrl+z', self.undo_last_word)
         keyboard.add_hotkey('ctrl+c', lambda: self.graceful_exit(0))
@@ -684,7 +1056,9 @@ Quit Application:   Ctrl+C
         """Gracefully exit application."""
         self.log("Shutting down...")
         self.state_manager.update_state(auto_mode_active=False)
+        self.state_manager.stop_persistence(run_pending=False)
         self.state_manager.save_state()
+        self.state_manager.save_history()
         self.state_manager.save_metrics()
 
         if self.tray_icon:
@@ -693,6 +1067,32 @@ Quit Application:   Ctrl+C
             except Exception as e:
                 logger.error(f"Error stopping tray icon: {e}")
 
+        try:
+            if self.ocr_processor.lexicon.dirty:
+                self.ocr_processor.lexicon.save()
+        except Exception as e:
+            logger.error(f"Error saving prompt lexicon: {e}")
+
+        try:
+            if self.word_outcomes.dirty:
+                self.word_outcomes.save()
+        except Exception as e:
+            logger.error(f"Error saving word outcomes: {e}")
+
+        self.scheduler.shutdown()
+
+        try:
+            tracer.save()
+        except Exception as e:
+            logger.error(f"Error writing trace: {e}")
+
+        try:
+            self.ocr_processor.engine.close()
+            if self.ocr_processor.pool is not None:
+                self.ocr_processor.pool.close()
+        except Exception as e:
+            logger.error(f"Error stopping OCR engine: {e}")
+
         try:
             keyboard.unhook_all()
         except Exception as e:
@@ -709,6 +1109,8 @@ Quit Application:   Ctrl+C
         os._exit(code)
 
 if __name__ == "__main__":
+    # OCR worker processes re-enter here in the PyInstaller build.
+    multiprocessing.freeze_support()
     try:
         setup_logging()
         app = OCRApplication()
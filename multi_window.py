@@ -0,0 +1,125 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+
+def region_key(region: Dict) -> tuple:
+    return tuple(sorted(region.items()))
+
+
+def region_center(region: Dict):
+    return region["left"] + region["width"] // 2, region["top"] + region["height"] // 2
+
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _user32 = ctypes.windll.user32
+    _user32.WindowFromPoint.restype = wintypes.HWND
+    _user32.WindowFromPoint.argtypes = [wintypes.POINT]
+    _user32.GetAncestor.restype = wintypes.HWND
+    _user32.GetAncestor.argtypes = [wintypes.HWND, ctypes.c_uint]
+    _GA_ROOT = 2
+
+    def focus_window_at(x: int, y: int) -> bool:
+        """Bring the top-level window under screen point (x, y) to the foreground."""
+        hwnd = _user32.WindowFromPoint(wintypes.POINT(x, y))
+        if not hwnd:
+            return False
+        root = _user32.GetAncestor(hwnd, _GA_ROOT) or hwnd
+        if _user32.GetForegroundWindow() == root:
+            return True
+        return bool(_user32.SetForegroundWindow(root))
+else:
+    def focus_window_at(x: int, y: int) -> bool:
+        """Window focusing is only implemented on Windows; elsewhere keys go to the focused window."""
+        return False
+
+
+class TypingArbiter:
+    """
+    There is one keyboard: words for different windows are typed one at a time,
+    and when several windows are watched the target window is focused first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.focus_windows = False
+        self.turns = 0
+        self.total_wait_ms = 0.0
+
+    @contextmanager
+    def turn(self, region: Optional[Dict]):
+        """Hold the keyboard for one word typed into the window containing region."""
+        start = time.perf_counter()
+        with self._lock:
+            self.turns += 1
+            self.total_wait_ms += (time.perf_counter() - start) * 1000
+            if self.focus_windows and region:
+                if focus_window_at(*region_center(region)):
+                    # Give the window manager a moment to route keys to it.
+                    time.sleep(0.05)
+                else:
+                    logger.debug(f"Could not focus window at {region_center(region)}")
+            yield
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "turns": self.turns,
+            "average_wait_ms": self.total_wait_ms / self.turns if self.turns else 0.0,
+        }
+
+
+class WindowWatcher:
+    """Auto-mode state for one additional game window (the main window lives in AppState)."""
+
+    def __init__(self, profile: Dict):
+        self.name: str = profile.get("name") or "window"
+        self.region: Dict = dict(profile["region"])
+        self.turn_region: Optional[Dict] = dict(profile["turn_region"]) if profile.get("turn_region") else None
+        self.key = region_key(self.region)
+        self.last_text: Optional[str] = None
+        # Prompt whose suggestions were requested ahead of the turn gate.
+        self.prefetched: Optional[str] = None
+        self.last_prompt_time = 0.0
+        self.suggestions: List[str] = []
+        self.suggestion_index = 0
+        # Set while a lookup / typing job for this window is running; cancel stops that job.
+        self.busy = threading.Event()
+        self.cancel = CancelToken()
+        self.job: Optional[Future] = None
+
+    def same_profile(self, profile: Dict) -> bool:
+        return (dict(profile["region"]) == self.region
+                and (dict(profile["turn_region"]) if profile.get("turn_region") else None) == self.turn_region)
+
+    def regions(self):
+        return [r for r in (self.region, self.turn_region) if r]
+
+    def stop(self, reason: str):
+        """Cancel this window's job: dropped before it starts, or stopped before its next key."""
+        self.cancel.cancel(reason)
+        if self.job is not None:
+            self.job.cancel()
+
+
+def sync_watchers(profiles: Iterable[Dict], current: List[WindowWatcher]) -> List[WindowWatcher]:
+    """Watchers for profiles, reusing (and keeping the state of) unchanged ones; the rest are stopped."""
+    by_name = {w.name: w for w in current}
+    out = []
+    for profile in profiles:
+        existing = by_name.get(profile.get("name") or "window")
+        out.append(existing if existing is not None and existing.same_profile(profile) else WindowWatcher(profile))
+    for w in current:
+        if not any(w is kept for kept in out):
+            w.stop("window removed")
+    return out
@@ -0,0 +1,202 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import pytesseract
+from PIL import Image
+
+from config import OCR_ENGINE_WORKERS, OCR_ENGINE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Try to import tesserocr (Tesseract C API binding), but make it optional
+try:
+    import tesserocr
+    from tesserocr import RIL, iterate_level
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+    logger.info("tesserocr not installed; OCR runs one tesseract process per call. "
+                "Install with: pip install tesserocr")
+
+
+@dataclass(frozen=True)
+class OCRReading:
+    """Recognised text with one confidence (0-1) per character; confidence is the weakest."""
+    text: str
+    confidence: float
+    char_confidences: Tuple[float, ...] = ()
+
+    @classmethod
+    def from_chars(cls, chars, confidences) -> "OCRReading":
+        confs = tuple(float(c) for c in confidences)
+        return cls("".join(chars), min(confs) if confs else 0.0, confs)
+
+
+def _tessdata_dir() -> Optional[str]:
+    """tessdata next to the tesseract executable pytesseract uses, or TESSDATA_PREFIX."""
+    env = os.environ.get("TESSDATA_PREFIX")
+    if env:
+        return env
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if cmd and os.path.isabs(cmd):
+        candidate = os.path.join(os.path.dirname(cmd), "tessdata")
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+class SubprocessOCREngine:
+    """pytesseract path: spawns tesseract and round-trips the image through temp files per call."""
+
+    name = "subprocess"
+
+    def recognize(self, image: Image.Image, psm: int = 7, whitelist: Optional[str] = None) -> str:
+        config = f"--psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return pytesseract.image_to_string(image, config=config)
+
+    def recognize_data(self, image: Image.Image, psm: int = 7, whitelist: Optional[str] = None) -> OCRReading:
+        """
+        Text with confidences from image_to_data. The CLI reports confidence per
+        word, so every character of a word gets that word's confidence.
+        """
+        config = f"--psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+        chars, confs = [], []
+        for text, conf in zip(data["text"], data["conf"]):
+            conf = float(conf)
+            if not text.strip() or conf < 0:
+                continue
+            chars.append(text.strip())
+            confs.extend([conf / 100.0] * len(text.strip()))
+        return OCRReading.from_chars(chars, confs)
+
+    def close(self):
+        pass
+
+
+class _Request:
+    __slots__ = ("image", "psm", "whitelist", "detail", "future")
+
+    def __init__(self, image: Image.Image, psm: int, whitelist: Optional[str], detail: bool = False):
+        self.image = image
+        self.psm = psm
+        self.whitelist = whitelist
+        self.detail = detail
+        self.future: Future = Future()
+
+
+class ResidentOCRPool:
+    """
+    Pool of worker threads that each load the Tesseract engine once (tesserocr)
+    and take images from an in-memory queue. tesserocr releases the GIL while
+    recognising, so workers run in parallel.
+    """
+
+    name = "resident"
+
+    def __init__(self, workers: int = OCR_ENGINE_WORKERS, lang: str = "eng",
+                 tessdata: Optional[str] = None, timeout: float = OCR_ENGINE_TIMEOUT):
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("tesserocr is not installed")
+        self.lang = lang
+        self.tessdata = tessdata if tessdata is not None else _tessdata_dir()
+        self.timeout = timeout
+        self._requests: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._ready = threading.Barrier(max(1, workers) + 1)
+        self._errors = []
+        self._threads = [
+            threading.Thread(target=self._worker, daemon=True, name=f"OCRWorker-{i}")
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+        self._ready.wait()
+        if self._errors:
+            self.close()
+            raise RuntimeError(f"Tesseract engine failed to load: {self._errors[0]}")
+
+    def _worker(self):
+        try:
+            kwargs = {"lang": self.lang}
+            if self.tessdata:
+                kwargs["path"] = self.tessdata
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+        except Exception as e:
+            self._errors.append(e)
+            self._ready.wait()
+            return
+        self._ready.wait()
+        try:
+            while True:
+                req = self._requests.get()
+                if req is None:
+                    return
+                if not req.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    api.SetPageSegMode(req.psm)
+                    api.SetVariable("tessedit_char_whitelist", req.whitelist or "")
+                    api.SetImage(req.image)
+                    if req.detail:
+                        req.future.set_result(self._read_symbols(api))
+                    else:
+                        req.future.set_result(api.GetUTF8Text())
+                except Exception as e:
+                    req.future.set_exception(e)
+        finally:
+            api.End()
+
+    @staticmethod
+    def _read_symbols(api) -> OCRReading:
+        """Per-symbol text and confidence from the result iterator."""
+        api.Recognize()
+        chars, confs = [], []
+        iterator = api.GetIterator()
+        if iterator is not None:
+            for symbol in iterate_level(iterator, RIL.SYMBOL):
+                text = symbol.GetUTF8Text(RIL.SYMBOL)
+                text = (text or "").strip()
+                if text:
+                    chars.append(text)
+                    confs.extend([symbol.Confidence(RIL.SYMBOL) / 100.0] * len(text))
+        return OCRReading.from_chars(chars, confs)
+
+    def submit(self, image: Image.Image, psm: int = 7, whitelist: Optional[str] = None,
+               detail: bool = False) -> Future:
+        """Queue an image for recognition; the Future resolves to the raw text (OCRReading if detail)."""
+        req = _Request(image, psm, whitelist, detail)
+        self._requests.put(req)
+        return req.future
+
+    def recognize(self, image: Image.Image, psm: int = 7, whitelist: Optional[str] = None) -> str:
+        return self.submit(image, psm, whitelist).result(timeout=self.timeout)
+
+    def recognize_data(self, image: Image.Image, psm: int = 7, whitelist: Optional[str] = None) -> OCRReading:
+        """Text with a confidence per recognised symbol."""
+        return self.submit(image, psm, whitelist, detail=True).result(timeout=self.timeout)
+
+    def close(self):
+        """Stop the workers and unload their engines."""
+        for _ in self._threads:
+            self._requests.put(None)
+
+
+def create_ocr_engine(prefer_resident: bool = True):
+    """Resident tesserocr pool when available, otherwise the pytesseract subprocess engine."""
+    if prefer_resident and TESSEROCR_AVAILABLE:
+        try:
+            engine = ResidentOCRPool()
+            logger.info(f"Resident OCR engine loaded ({len(engine._threads)} workers)")
+            return engine
+        except Exception as e:
+            logger.warning(f"Resident OCR engine unavailable, using tesseract subprocess: {e}")
+    return SubprocessOCREngine()
@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import OCR_PROCESS_WORKERS, OCR_SHM_SLOTS
+
+logger = logging.getLogger(__name__)
+
+# Per worker process: its own OCRProcessor (engine, glyph templates) and attached buffers by slot.
+_worker_processor = None
+_worker_buffers: Dict[int, shared_memory.SharedMemory] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Open a parent-owned buffer. Before Python 3.13 attaching registers the name
+    again with the resource tracker the worker shares with the parent, which is
+    harmless: the parent unlinks (and unregisters) it once on close.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_init(tesseract_cmd: Optional[str]):
+    global _worker_processor
+    import pytesseract
+    from ocr_processor import OCRProcessor
+
+    # The parent may have found Tesseract somewhere the import-time lookup does not check.
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    _worker_processor = OCRProcessor()
+
+
+def _worker_frame(slot: int, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    shm = _worker_buffers.get(slot)
+    if shm is None or shm.name != name:
+        # The parent grew this slot into a new buffer: let go of the old one.
+        if shm is not None:
+            shm.close()
+        shm = _worker_buffers[slot] = _attach(name)
+    return np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _worker_read_prompt(slot: int, name: str, shape: Tuple[int, ...], use_glyphs: bool, profile):
+    return _worker_processor.read_prompt(_worker_frame(slot, name, shape), use_glyphs, profile)
+
+
+def _worker_recognize_turn_gate(slot: int, name: str, shape: Tuple[int, ...], profile):
+    return _worker_processor.recognize_turn_gate(_worker_frame(slot, name, shape), profile)
+
+
+class _Slot:
+    __slots__ = ("shm", "size")
+
+    def __init__(self, size: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.size = size
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class OCRProcessPool:
+    """
+    Runs OCRProcessor preprocessing and recognition in worker processes, so OCR
+    does not hold the GIL that the Tk and keyboard-hook threads need. Frames are
+    copied once into a shared-memory slot and the worker reads them in place;
+    only the slot index, name, shape and the small result cross the process boundary.
+    """
+
+    def __init__(self, workers: int = OCR_PROCESS_WORKERS, slots: int = OCR_SHM_SLOTS):
+        import pytesseract
+
+        self.workers = max(1, workers)
+        # spawn everywhere: fork would copy the Tk / keyboard-hook threads' state.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(pytesseract.pytesseract.tesseract_cmd,),
+        )
+        self._slots = [None] * max(1, slots)
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for i in range(len(self._slots)):
+            self._free.put(i)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _stage(self, pixels: np.ndarray) -> Tuple[int, str, Tuple[int, ...]]:
+        """Copy pixels into a free slot (growing it if needed); blocks while all slots are busy."""
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        index = self._free.get()
+        slot = self._slots[index]
+        if slot is None or slot.size < pixels.nbytes:
+            if slot is not None:
+                slot.close()
+            slot = self._slots[index] = _Slot(max(pixels.nbytes, 1))
+        np.ndarray(pixels.shape, dtype=np.uint8, buffer=slot.shm.buf)[...] = pixels
+        return index, slot.shm.name, pixels.shape
+
+    def _submit(self, fn, pixels: np.ndarray, *args) -> Future:
+        if self._closed:
+            raise RuntimeError("OCR process pool is closed")
+        index, name, shape = self._stage(pixels)
+        try:
+            future = self._executor.submit(fn, index, name, shape, *args)
+        except Exception:
+            self._free.put(index)
+            raise
+        future.add_done_callback(lambda _: self._free.put(index))
+        return future
+
+    def read_prompt(self, pixels: np.ndarray, use_glyphs: bool = True, profile=None) -> Future:
+        """Future of OCRProcessor.read_prompt on pixels (gray, RGB or BGRA array)."""
+        return self._submit(_worker_read_prompt, pixels, use_glyphs, profile)
+
+    def recognize_turn_gate(self, pixels: np.ndarray, profile=None) -> Future:
+        """Future of OCRProcessor.recognize_turn_gate on pixels."""
+        return self._submit(_worker_recognize_turn_gate, pixels, profile)
+
+    def close(self):
+        """Stop the workers and release the shared-memory slots."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            if slot is not None:
+                slot.close()
+
+
+def create_process_pool(workers: int = OCR_PROCESS_WORKERS) -> Optional[OCRProcessPool]:
+    """Process pool when OCR_PROCESS_WORKERS > 0, else None (OCR stays in-process)."""
+    if workers <= 0:
+        return None
+    try:
+        pool = OCRProcessPool(workers)
+        logger.info(f"OCR process pool started ({pool.workers} workers)")
+        return pool
+    except Exception as e:
+        logger.warning(f"OCR process pool unavailable, running OCR in-process: {e}")
+        return None
@@ -1,14 +1,30 @@
 import pytesseract
 import mss
-import hashlib
+import numpy as np
 import os
 import logging
 import shutil
 import time
-from typing import Optional, Dict
-from datetime import datetime, timedelta
-from PIL import Image, ImageOps
-from config import CACHE_EXPIRY_MINUTES
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from PIL import Image
+from config import (
+    GLYPH_MIN_CONFIDENCE,
+    OCR_MIN_CONFIDENCE,
+    OCR_RECAPTURE_DELAY,
+    TURN_GATE_NEED_YOUR,
+    TURN_GATE_NEED_TURN,
+    TURN_CALIBRATE_FRAMES,
+    TURN_SIGNATURE_FILE,
+)
+from frame_gate import FrameChangeGate, LRUTTLCache, downsample, perceptual_hash, hit_rate
+from preprocess import bgra_to_gray, binarize, stretch
+from glyph_ocr import load_glyph_engine
+from ocr_engine import OCRReading, create_ocr_engine
+from ocr_profiles import PromptProfile, TurnProfile, profile_from_dict
+from prompt_lexicon import PromptLexicon
+from turn_detector import TurnGateDetector
+from tracing import tracer
 
 def find_tesseract_path():
     """Find Tesseract installation path."""
@@ -28,16 +44,29 @@ if TESSERACT_PATH:
 
 logger = logging.getLogger(__name__)
 
+LETTER_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
 try:
     _LANCZOS = Image.Resampling.LANCZOS
 except AttributeError:
     _LANCZOS = Image.LANCZOS
 
 
+def turn_gate_accepts(text: str) -> bool:
+    """YOUR TURN → yourturn; tolerate partial / noisy OCR."""
+    if not text:
+        return False
+    return (
+        (TURN_GATE_NEED_YOUR in text and TURN_GATE_NEED_TURN in text)
+        or ("yourturn" in text)
+        or (TURN_GATE_NEED_YOUR in text and len(text) >= 4)
+    )
+
+
 def _upscale_if_small(image: Image.Image, min_w: int = 140, min_h: int = 48) -> Image.Image:
     """Tesseract struggles on tiny UI crops; scale up while keeping aspect."""
     w, h = image.size
-    if w <= 0 or h <= 0:
+    if w <= 0 or h <= 0 or (min_w <= 0 and min_h <= 0):
         return image
     sx = max(1.0, min_w / w)
     sy = max(1.0, min_h / h)
@@ -51,133 +80,359 @@ def _upscale_if_small(image: Image.Image, min_w: int = 140, min_h: int = 48) ->
 class OCRProcessor:
     """Handles WBT operations with caching."""
     
-    def __init__(self):
-        self.cache: Dict[str, tuple] = {}
-    
-    def get_image_hash(self, img_data: bytes) -> str:
-        """Generate hash of image data for caching."""
-        return hashlib.md5(img_data).hexdigest()
+    def __init__(self, engine=None, glyph_engine=None, pool=None):
+        # Bounded LRU+TTL cache of prompt readings keyed by perceptual hash.
+        self.cache = LRUTTLCache()
+        # Skips OCR when a region is effectively unchanged since the last poll.
+        self.frame_gate = FrameChangeGate()
+        # Resident tesserocr pool when installed, else one tesseract process per call.
+        self.engine = engine if engine is not None else create_ocr_engine()
+        # Template matcher for the game font (None until templates are learned with ocr_tools.py;
+        # pass glyph_engine=False to disable it).
+        self.glyph_engine = glyph_engine if glyph_engine is not None else load_glyph_engine()
+        # Colour/template YOUR TURN detector; calibrates itself once OCR reads "yourturn" on
+        # TURN_CALIBRATE_FRAMES consecutive frames (streak counted here).
+        self.turn_detector = TurnGateDetector.load()
+        self._calibration_streak = 0
+        # Valid prompts that readings are corrected to (empty until built with ocr_tools.py).
+        self.lexicon = PromptLexicon.load()
+        self.rejected_readings = 0
+        self.corrected_readings = 0
+        # Tesseract / preprocessing settings per region kind (tuned with ocr_tools.py tune).
+        self.prompt_profile = PromptProfile()
+        self.turn_profile = TurnProfile()
+        # Optional OCRProcessPool: preprocessing + recognition run in worker processes.
+        self.pool = pool
+
+    def set_profiles(self, profiles: Optional[Dict]):
+        """Apply saved {"prompt": {...}, "turn": {...}} settings; missing kinds use defaults."""
+        profiles = profiles or {}
+        prompt = profile_from_dict("prompt", profiles.get("prompt"))
+        turn = profile_from_dict("turn", profiles.get("turn"))
+        if (prompt, turn) != (self.prompt_profile, self.turn_profile):
+            self.prompt_profile, self.turn_profile = prompt, turn
+            self.clear_cache()
+            logger.info(f"OCR profiles: {prompt}, {turn}")
     
-    def preprocess_image(self, image: Image.Image) -> Image.Image:
-        """Preprocess image for WBT."""
-        image = image.convert("L")
-        image = ImageOps.autocontrast(image)
-        image = image.point(lambda x: 0 if x < 140 else 255)
-        return image
+    def preprocess_image(self, image: Union[Image.Image, np.ndarray],
+                         profile: Optional[PromptProfile] = None) -> Image.Image:
+        """
+        Preprocess image for WBT: grayscale, contrast stretch and threshold in one
+        lookup-table pass. Accepts a PIL image or raw pixels (gray, RGB or mss BGRA).
+        """
+        profile = profile or self.prompt_profile
+        pixels = np.asarray(image) if isinstance(image, Image.Image) else image
+        return Image.fromarray(binarize(pixels, profile.threshold, adaptive=profile.threshold is None))
 
-    def preprocess_image_turn_gate(self, image: Image.Image) -> Image.Image:
+    def preprocess_image_turn_gate(self, image: Union[Image.Image, np.ndarray],
+                                   profile: Optional[TurnProfile] = None) -> Image.Image:
         """
         Softer pipeline for YOUR TURN style UI (colored buttons, white text).
         The letter-OCR binarization often turns these regions into solid black/white.
         """
-        image = image.convert("L")
-        try:
-            image = ImageOps.autocontrast(image, cutoff=1)
-        except TypeError:
-            image = ImageOps.autocontrast(image)
-        image = _upscale_if_small(image)
-        return image
+        profile = profile or self.turn_profile
+        pixels = np.asarray(image) if isinstance(image, Image.Image) else image
+        return _upscale_if_small(Image.fromarray(stretch(pixels, cutoff=profile.cutoff)), *profile.upscale)
     
     def clear_cache(self):
-        """Clear WBT cache."""
+        """Clear WBT cache and the unchanged-frame gate."""
         self.cache.clear()
+        self.frame_gate.clear()
         logger.info("WBT cache cleared")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Frame gate and cache hit/miss counters for the metrics file."""
+        gate, cache = self.frame_gate, self.cache
+        return {
+            "frame_gate_hits": gate.hits,
+            "frame_gate_misses": gate.misses,
+            "frame_gate_hit_rate": hit_rate(gate.hits, gate.misses),
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+            "cache_hit_rate": hit_rate(cache.hits, cache.misses),
+            "cache_entries": len(cache),
+            "rejected_readings": self.rejected_readings,
+            "corrected_readings": self.corrected_readings,
+        }
     
-    def perform_ocr(self, region: Dict) -> Optional[str]:
+    @staticmethod
+    def capture(region: Dict, frame: Optional[np.ndarray] = None) -> np.ndarray:
+        """BGRA pixels of region: the caller's crop if given, else a one-off mss grab."""
+        if frame is not None:
+            return frame
+        with mss.mss() as sct:
+            img = sct.grab(region)
+        return np.frombuffer(img.raw, dtype=np.uint8).reshape(img.height, img.width, 4)
+
+    def perform_ocr(self, region: Dict, frame: Optional[np.ndarray] = None,
+                    recapture: int = 0) -> Optional[str]:
         """
         Perform WBT on region with caching and error handling.
         
         Args:
             region: Dictionary with 'left', 'top', 'width', 'height' keys
+            frame: Already-captured BGRA pixels of region (capture session crop)
+            recapture: Extra grabs to try when a reading is rejected (only without frame)
         
         Returns:
             Extracted text (lowercase letters only) or None if failed
         """
+        result = self.read_region(region, frame, recapture)
+        return result[0] if result else None
+
+    def read_region(self, region: Dict, frame: Optional[np.ndarray] = None,
+                    recapture: int = 0) -> Optional[Tuple[str, float]]:
+        """Like perform_ocr, but returns (letters, confidence) so callers can weigh the reading."""
+        with tracer.span("ocr.read_region", "ocr"):
+            result = self._read_region_once(region, frame)
+            if frame is None:
+                for _ in range(recapture):
+                    if result:
+                        break
+                    time.sleep(OCR_RECAPTURE_DELAY)
+                    result = self._read_region_once(region)
+        return result
+
+    def _read_region_once(self, region: Dict, frame: Optional[np.ndarray] = None) -> Optional[Tuple[str, float]]:
+        return self._begin_read(region, frame)()
+
+    def read_batch(self, prompts: Sequence[Tuple[Dict, Optional[np.ndarray]]],
+                   turns: Sequence[Tuple[Dict, Optional[np.ndarray]]] = ()
+                   ) -> Tuple[List[Optional[Tuple[str, float]]], List[Callable[[], Tuple[bool, str]]]]:
+        """
+        One watcher tick's reads, as (region, frame) pairs: every prompt and turn-gate
+        recognition is handed to the pool before any result is waited on, so the
+        regions are read in parallel rather than one after another.
+        Returns the prompt readings and, per turn region, a call giving check_turn_gate's
+        (ok, detail); turn OCR is only waited on (or run in-process) when that is called.
+        """
+        with tracer.span("ocr.read_batch", "ocr", prompts=len(prompts), turns=len(turns)):
+            reads = [self._begin_read(region, frame) for region, frame in prompts]
+            gates = [lru_cache(maxsize=1)(self._begin_turn_gate(region, frame)) for region, frame in turns]
+            return [finish() for finish in reads], gates
+
+    def _begin_read(self, region: Dict, frame: Optional[np.ndarray] = None) -> Callable[[], Optional[Tuple[str, float]]]:
+        """Capture and gate region, submitting it to the pool if it needs recognising; returns the call that finishes the read."""
         start_time = time.time()
         
         try:
             # Capture region
-            with mss.mss() as sct:
-                img = sct.grab(region)
-            
-            img_hash = self.get_image_hash(img.rgb)
-            
+            gray = bgra_to_gray(self.capture(region, frame))
+            small = downsample(gray)
+            gate_key = (region["left"], region["top"], region["width"], region["height"])
+
+            # Region effectively unchanged since the last poll: reuse that result
+            unchanged, previous = self.frame_gate.check(gate_key, small)
+            if unchanged:
+                return lambda: previous
+
             # Check cache
-            if img_hash in self.cache:
-                cached_text, cached_time = self.cache[img_hash]
-                age = datetime.now() - cached_time
-                if age < timedelta(minutes=CACHE_EXPIRY_MINUTES):
-                    duration = (time.time() - start_time) * 1000
-                    return cached_text
-                else:
-                    del self.cache[img_hash]
-            
-            # Preprocess image
-            image = Image.frombytes("RGB", img.size, img.rgb)
-            image = self.preprocess_image(image)
-            
-            # Perform WBT
-            raw_text = pytesseract.image_to_string(
-                image,
-                config="--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
-            )
-            
-            # Extract letters only
-            letters = "".join(c for c in raw_text if c.isalpha()).lower()
-            
-            # Cache result
-            if letters:
-                self.cache[img_hash] = (letters, datetime.now())
-            
-            duration = (time.time() - start_time) * 1000
-            logger.debug(f"WBT completed in {duration:.2f}ms")
-            
-            return letters if letters else None
-        
+            phash = perceptual_hash(small)
+            cached = self.cache.get(phash)
+            if cached is not None:
+                self.frame_gate.update(gate_key, small, cached)
+                return lambda: cached
+            future = self.pool.read_prompt(gray, True, self.prompt_profile) if self.pool is not None else None
         except Exception as e:
-            duration = (time.time() - start_time) * 1000
             logger.error(f"WBT Error: {e}", exc_info=True)
-            return None
+            return lambda: None
 
-    def perform_ocr_turn_gate(self, region: Dict) -> Optional[str]:
+        def finish() -> Optional[Tuple[str, float]]:
+            try:
+                with tracer.span("ocr.recognize", "ocr", pool=future is not None):
+                    reading = future.result() if future is not None else self.read_prompt(gray)
+                with tracer.span("ocr.correct", "ocr", text=reading.text):
+                    result = self.accept_prompt(reading)
+                if result is None:
+                    # Low confidence or not a real prompt: leave gate and cache alone so
+                    # the next capture is read again.
+                    return None
+
+                # Cache result
+                self.cache.put(phash, result)
+                self.frame_gate.update(gate_key, small, result)
+
+                duration = (time.time() - start_time) * 1000
+                logger.debug(f"WBT completed in {duration:.2f}ms")
+                return result
+            except Exception as e:
+                logger.error(f"WBT Error: {e}", exc_info=True)
+                return None
+
+        return finish
+
+    def recognize_prompt(self, rgb: Union[Image.Image, np.ndarray], use_glyphs: bool = True) -> str:
+        """Letters (lowercase) in an already-captured prompt image: glyph templates, else Tesseract."""
+        return self.read_prompt(rgb, use_glyphs).text
+
+    def read_prompt(self, rgb: Union[Image.Image, np.ndarray], use_glyphs: bool = True,
+                    profile: Optional[PromptProfile] = None) -> OCRReading:
+        """Prompt letters (lowercase) with per-character confidences, before any correction."""
+        profile = profile or self.prompt_profile
+        with tracer.span("ocr.preprocess", "ocr"):
+            image = self.preprocess_image(rgb, profile)
+
+        with tracer.span("ocr.glyphs", "ocr"):
+            reading = self._read_glyphs(image) if use_glyphs else None
+        if reading is None:
+            # Perform WBT
+            image = _upscale_if_small(image, *profile.upscale)
+            with tracer.span("ocr.tesseract", "ocr", psm=profile.psm):
+                raw = self.engine.recognize_data(image, psm=profile.psm, whitelist=LETTER_WHITELIST)
+
+            # Extract letters only
+            kept = [(c.lower(), conf) for c, conf in zip(raw.text, raw.char_confidences) if c.isalpha()]
+            reading = OCRReading.from_chars([c for c, _ in kept], [conf for _, conf in kept])
+        return reading
+
+    def accept_prompt(self, reading: OCRReading) -> Optional[Tuple[str, float]]:
         """
-        OCR for auto-mode turn detection: letters and digits only, lowercase.
-        Uses soft preprocessing + multiple PSM attempts (colored YOUR TURN UI).
+        (letters, confidence) to act on, or None to re-capture: readings whose weakest
+        character is below OCR_MIN_CONFIDENCE are dropped, the rest are snapped to the
+        nearest valid prompt by confidence-weighted edit cost. A corrected reading's
+        confidence is lowered by its correction cost.
         """
-        start_time = time.time()
+        if not reading.text:
+            return None
+        if reading.confidence < OCR_MIN_CONFIDENCE:
+            self.rejected_readings += 1
+            logger.debug(f"WBT low confidence {reading.confidence:.2f} for {reading.text!r}; re-capturing")
+            return None
+        corrected = self.lexicon.correct(reading.text, reading.char_confidences)
+        if corrected is None:
+            self.rejected_readings += 1
+            logger.debug(f"WBT reading {reading.text!r} is not a known prompt; re-capturing")
+            return None
+        letters, cost = corrected
+        if letters != reading.text:
+            self.corrected_readings += 1
+            logger.info(f"WBT corrected {reading.text!r} -> {letters!r} (cost {cost:.2f})")
+        return letters, min(reading.confidence, 1.0 - cost)
+
+    def _read_glyphs(self, image: Image.Image):
+        """Glyph-template reading of a preprocessed prompt, or None to fall back to Tesseract."""
+        if not self.glyph_engine:
+            return None
+        reading = self.glyph_engine.read(np.asarray(image))
+        if reading is None or reading.confidence < GLYPH_MIN_CONFIDENCE:
+            if reading is not None:
+                logger.debug(f"Glyph OCR low confidence {reading.confidence:.2f} for {reading.text!r}")
+            return None
+        return reading
+
+    def recognize_turn_gate(self, rgb: Union[Image.Image, np.ndarray],
+                            profile: Optional[TurnProfile] = None) -> str:
+        """Alnum text (lowercase) in an already-captured turn-region image; '' if nothing read."""
+        profile = profile or self.turn_profile
 
         def run_ocr(im: Image.Image, psm: int) -> str:
             try:
-                raw = pytesseract.image_to_string(im, config=f"--psm {psm}")
+                raw = self.engine.recognize(im, psm=psm)
             except Exception:
                 return ""
             return "".join(c for c in raw if c.isalnum()).lower()
 
+        # 1) Soft path (best for purple/blue buttons + white text)
+        soft = self.preprocess_image_turn_gate(rgb, profile)
+        best = ""
+        for psm in profile.psm_order:
+            t = run_ocr(soft, psm)
+            if len(t) > len(best):
+                best = t
+        if best:
+            return best
+
+        # 2) Harsh binarization (same as letter OCR) as fallback
+        hard = self.preprocess_image(rgb)
+        for psm in profile.fallback_psm_order:
+            t = run_ocr(hard, psm)
+            if len(t) > len(best):
+                best = t
+        return best
+
+    def reset_turn_detector(self):
+        """Forget the turn-gate calibration (the turn region changed)."""
+        self.turn_detector.signature = None
+        self._calibration_streak = 0
+        try:
+            os.remove(TURN_SIGNATURE_FILE)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing turn gate signature: {e}")
+
+    def check_turn_gate(self, region: Dict, frame: Optional[np.ndarray] = None) -> Tuple[bool, str]:
+        """
+        Is YOUR TURN visible in region (or in frame, its already-captured BGRA pixels)?
+        Returns (ok, detail) for logging.
+        The calibrated detector decides clear-cut frames in microseconds; ambiguous
+        frames (and every frame before calibration) go to OCR, and a frame that OCR
+        reads strictly as "yourturn", after the frame before it did too, becomes the
+        calibration reference.
+        """
+        return self._begin_turn_gate(region, frame)()
+
+    def _begin_turn_gate(self, region: Dict, frame: Optional[np.ndarray] = None) -> Callable[[], Tuple[bool, str]]:
+        """Capture region and run the detector, submitting ambiguous frames to the pool; returns the call that finishes the check."""
+        start_time = time.time()
         try:
-            with mss.mss() as sct:
-                img = sct.grab(region)
-            rgb = Image.frombytes("RGB", img.size, img.rgb)
-
-            # 1) Soft path (best for purple/blue buttons + white text)
-            soft = self.preprocess_image_turn_gate(rgb)
-            best = ""
-            for psm in (6, 7, 8, 13):
-                t = run_ocr(soft, psm)
-                if len(t) > len(best):
-                    best = t
-            if best:
+            bgra = self.capture(region, frame)
+            rgb = bgra[..., 2::-1]
+
+            with tracer.span("turn_gate.detector", "turn_gate"):
+                verdict, score = self.turn_detector.classify(rgb)
+            if verdict is not None:
+                logger.debug(f"Turn gate detector: {verdict} (score {score:.3f})")
+                detail = f"detector score {score:.2f}"
+                return lambda: (verdict, detail)
+            future = self.pool.recognize_turn_gate(bgra, self.turn_profile) if self.pool is not None else None
+        except Exception as e:
+            logger.error(f"Turn gate error: {e}", exc_info=True)
+            return lambda: (False, "")
+
+        def finish() -> Tuple[bool, str]:
+            try:
+                with tracer.span("turn_gate.ocr", "turn_gate", pool=future is not None):
+                    text = future.result() if future is not None else self.recognize_turn_gate(bgra)
+                ok = turn_gate_accepts(text)
+                if not self.turn_detector.calibrated:
+                    self._calibrate_turn_detector(text, rgb)
                 duration = (time.time() - start_time) * 1000
-                logger.debug(f"Turn gate WBT (soft) in {duration:.2f}ms: {best!r}")
-                return best
-
-            # 2) Harsh binarization (same as letter OCR) as fallback
-            hard = self.preprocess_image(rgb)
-            for psm in (7, 6, 8):
-                t = run_ocr(hard, psm)
-                if len(t) > len(best):
-                    best = t
+                logger.debug(f"Turn gate WBT (score {score:.3f}) in {duration:.2f}ms: {text!r}")
+                return ok, text
+            except Exception as e:
+                logger.error(f"Turn gate error: {e}", exc_info=True)
+                return False, ""
+
+        return finish
+
+    def _calibrate_turn_detector(self, text: str, rgb: np.ndarray):
+        """
+        Calibrate from rgb once TURN_CALIBRATE_FRAMES consecutive OCR frames contain
+        "yourturn"; the looser turn_gate_accepts match is too noisy to calibrate from.
+        """
+        self._calibration_streak = self._calibration_streak + 1 if "yourturn" in text else 0
+        if self._calibration_streak < TURN_CALIBRATE_FRAMES:
+            return
+        self._calibration_streak = 0
+        self.turn_detector.calibrate(rgb)
+        try:
+            self.turn_detector.save()
+        except OSError as e:
+            logger.error(f"Error saving turn gate signature: {e}")
+        logger.info("Turn gate detector calibrated from this YOUR TURN frame")
+
+    def perform_ocr_turn_gate(self, region: Dict) -> Optional[str]:
+        """
+        OCR for auto-mode turn detection: letters and digits only, lowercase.
+        Uses soft preprocessing + multiple PSM attempts (colored YOUR TURN UI).
+        """
+        start_time = time.time()
+
+        try:
+            best = self.recognize_turn_gate(self.capture(region))
             duration = (time.time() - start_time) * 1000
-            logger.debug(f"Turn gate WBT (hard fallback) in {duration:.2f}ms: {best!r}")
+            logger.debug(f"Turn gate WBT in {duration:.2f}ms: {best!r}")
             return best if best else None
         except Exception as e:
             logger.error(f"Turn gate WBT error: {e}", exc_info=True)
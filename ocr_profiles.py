@@ -0,0 +1,41 @@
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Optional, Tuple
+
+from config import OCR_THRESHOLD, OCR_ADAPTIVE_THRESHOLD
+
+
+@dataclass(frozen=True)
+class PromptProfile:
+    """Letter-region OCR settings. threshold None means Otsu; upscale (0, 0) means none."""
+    psm: int = 7
+    threshold: Optional[int] = None if OCR_ADAPTIVE_THRESHOLD else OCR_THRESHOLD
+    upscale: Tuple[int, int] = (0, 0)
+
+
+@dataclass(frozen=True)
+class TurnProfile:
+    """YOUR TURN OCR settings: soft-path PSMs tried in order, then the binarised fallback PSMs."""
+    psm_order: Tuple[int, ...] = (6, 7, 8, 13)
+    cutoff: float = 1.0
+    upscale: Tuple[int, int] = (140, 48)
+    fallback_psm_order: Tuple[int, ...] = (7, 6, 8)
+
+
+PROFILE_TYPES = {"prompt": PromptProfile, "turn": TurnProfile}
+
+
+def profile_to_dict(profile) -> Dict:
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in asdict(profile).items()}
+
+
+def profile_from_dict(kind: str, data: Optional[Dict]):
+    """Profile of kind from a saved dict; unknown keys are ignored, missing ones keep defaults."""
+    cls = PROFILE_TYPES[kind]
+    if not data:
+        return cls()
+    values = {}
+    for f in fields(cls):
+        if f.name in data:
+            v = data[f.name]
+            values[f.name] = tuple(v) if isinstance(v, list) else v
+    return cls(**values)
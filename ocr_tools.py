@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+OCR maintenance tools for Word Bomb Tool — benchmarks and calibration that run
+outside the GUI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+def _synthetic_prompt(text: str = "ABC", size=(96, 38)) -> Image.Image:
+    """Black-on-white prompt-like crop, used when no --image is given."""
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=size[1] - 12)
+    except TypeError:
+        font = ImageFont.load_default()
+    draw.text((8, 4), text, fill=0, font=font)
+    return image
+
+
+def _load_images(paths: List[str]) -> List[Image.Image]:
+    if not paths:
+        return [_synthetic_prompt()]
+    return [Image.open(p).convert("L") for p in paths]
+
+
+def _time_calls(fn: Callable[[], object], iterations: int, warmup: int = 2) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: List[float]):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<12} n={len(samples):<5d} mean={statistics.mean(samples):8.2f} ms  "
+        f"p50={statistics.median(samples):8.2f} ms  p95={p95:8.2f} ms"
+    )
+
+
+def _configured_regions() -> Dict[str, Optional[dict]]:
+    """Letter and turn regions saved by the GUI in ocr_config.json."""
+    from config import CONFIG_FILE
+    from frame_corpus import PROMPT, TURN
+
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    return {PROMPT: config.get("region"), TURN: config.get("turn_region")}
+
+
+def cmd_record(args: argparse.Namespace) -> int:
+    import mss
+    from frame_corpus import PROMPT, TURN, save_capture
+    from ocr_engine import SubprocessOCREngine
+    from ocr_processor import OCRProcessor
+
+    regions = _configured_regions()
+    kinds = [k for k in (PROMPT, TURN) if args.kind in (k, "both") and regions[k]]
+    if not kinds:
+        print("error: no matching region saved in ocr_config.json (press TAB in the GUI)", file=sys.stderr)
+        return 2
+
+    # Suggested labels come from Tesseract (independent of any learned templates);
+    # captures stay unverified until the label step confirms or corrects them.
+    proc = OCRProcessor(engine=SubprocessOCREngine(), glyph_engine=False)
+    with mss.mss() as sct:
+        for n in range(args.count):
+            for kind in kinds:
+                img = sct.grab(regions[kind])
+                rgb = Image.frombytes("RGB", img.size, img.rgb)
+                if kind == PROMPT:
+                    label = proc.recognize_prompt(rgb, use_glyphs=False)
+                else:
+                    label = proc.recognize_turn_gate(rgb)
+                print(save_capture(kind, rgb, label))
+            if n < args.count - 1:
+                time.sleep(args.interval)
+    print("Run the 'label' subcommand to check each suggestion; only verified captures are used.")
+    return 0
+
+
+def cmd_label(args: argparse.Namespace) -> int:
+    import os
+    from frame_corpus import NEGATIVE, PROMPT, TURN, iter_corpus, verify_capture
+    from ocr_processor import turn_gate_accepts
+
+    print(f"Enter keeps the suggestion, '{NEGATIVE}' marks a frame with nothing to read "
+          "(no prompt / not YOUR TURN), '.' skips, '!' deletes; anything else is the label.")
+    verified = 0
+    for kind in (k for k in (PROMPT, TURN) if args.kind in (k, "both")):
+        for path, rgb, suggestion in iter_corpus(kind, root=args.corpus, include_unlabelled=True, verified=False):
+            if kind == TURN:
+                suggestion = "yourturn" if turn_gate_accepts(suggestion) else ""
+            if args.show:
+                rgb.show()
+            while True:
+                try:
+                    answer = input(f"{kind} {os.path.basename(path)} [{suggestion or NEGATIVE}]: ").strip().lower()
+                except EOFError:
+                    print(f"\n{verified} capture(s) verified")
+                    return 0
+                label = suggestion if not answer else "" if answer == NEGATIVE else answer
+                if answer in (".", "!") or not label or label.isalpha():
+                    break
+                print("  labels are letters only")
+            if answer == ".":
+                continue
+            if answer == "!":
+                os.remove(path)
+                continue
+            print(f"  -> {verify_capture(kind, path, label, root=args.corpus)}")
+            verified += 1
+    print(f"{verified} capture(s) verified")
+    return 0
+
+
+def cmd_learn_glyphs(args: argparse.Namespace) -> int:
+    from config import GLYPH_TEMPLATES_FILE
+    from frame_corpus import PROMPT, iter_corpus
+    from glyph_ocr import GlyphOCREngine, GlyphTemplateSet
+    from ocr_engine import SubprocessOCREngine
+    from ocr_processor import OCRProcessor
+
+    proc = OCRProcessor(engine=SubprocessOCREngine(), glyph_engine=False)
+    # Negative frames have no glyphs to learn from.
+    samples = [(np.asarray(proc.preprocess_image(rgb)), label)
+               for _, rgb, label in iter_corpus(PROMPT, root=args.corpus) if label]
+    if not samples:
+        print("error: no verified prompt captures (run 'record', then 'label')", file=sys.stderr)
+        return 2
+
+    templates = GlyphTemplateSet()
+    used = sum(templates.add_sample(image, label) for image, label in samples)
+    templates.finalize()
+    if not len(templates):
+        print("error: no capture segmented into as many glyphs as its label has letters", file=sys.stderr)
+        return 1
+
+    engine = GlyphOCREngine(templates)
+    correct, times = 0, []
+    for image, label in samples:
+        start = time.perf_counter()
+        reading = engine.read(image)
+        times.append((time.perf_counter() - start) * 1000)
+        correct += bool(reading and reading.text == label)
+
+    templates.save(args.output or GLYPH_TEMPLATES_FILE)
+    print(f"learned {len(templates)} glyphs from {used}/{len(samples)} captures: {''.join(templates.chars)}")
+    print(f"self-check accuracy {correct}/{len(samples)}; read time "
+          f"mean={statistics.mean(times):.3f} ms max={max(times):.3f} ms")
+    return 0
+
+
+def cmd_calibrate_turn(args: argparse.Namespace) -> int:
+    from frame_corpus import TURN, iter_corpus
+    from ocr_engine import SubprocessOCREngine
+    from ocr_processor import OCRProcessor, turn_gate_accepts
+    from turn_detector import TurnGateDetector
+
+    if args.image:
+        reference = Image.open(args.image).convert("RGB")
+    else:
+        import mss
+
+        region = _configured_regions()[TURN]
+        if not region:
+            print("error: no turn region saved in ocr_config.json (press TAB in the GUI)", file=sys.stderr)
+            return 2
+        with mss.mss() as sct:
+            img = sct.grab(region)
+        reference = Image.frombytes("RGB", img.size, img.rgb)
+
+    proc = OCRProcessor(engine=SubprocessOCREngine(), glyph_engine=False)
+    text = proc.recognize_turn_gate(reference)
+    if not turn_gate_accepts(text) and not args.force:
+        print(f"error: reference does not read as YOUR TURN (OCR: {text!r}); use --force to keep it",
+              file=sys.stderr)
+        return 1
+
+    detector = TurnGateDetector()
+    detector.calibrate(np.asarray(reference))
+    detector.save()
+    print(f"turn gate calibrated (reference OCR: {text!r}); "
+          f"accept >= {detector.accept}, reject <= {detector.reject}")
+
+    scores = {True: [], False: []}
+    for _, rgb, label in iter_corpus(TURN, root=args.corpus):
+        scores[turn_gate_accepts(label)].append(detector.score(np.asarray(rgb)))
+    for is_turn, values in scores.items():
+        if values:
+            print(f"  corpus {'YOUR TURN' if is_turn else 'other'} frames: n={len(values)} "
+                  f"min={min(values):.3f} mean={statistics.mean(values):.3f} max={max(values):.3f}")
+    return 0
+
+
+def cmd_tune(args: argparse.Namespace) -> int:
+    from frame_corpus import PROMPT, TURN, iter_corpus
+    from ocr_engine import create_ocr_engine
+    from ocr_processor import OCRProcessor, turn_gate_accepts
+    from ocr_tuner import choose, pareto_front, save_profile, tune
+
+    # Same engine the app would use, templates off: this tunes the Tesseract path.
+    proc = OCRProcessor(engine=create_ocr_engine(), glyph_engine=False)
+    status = 0
+    try:
+        for kind in (k for k in (PROMPT, TURN) if args.kind in (k, "both")):
+            samples = [(np.asarray(rgb), label) for _, rgb, label in iter_corpus(kind, root=args.corpus)]
+            samples = samples[:args.max_frames] if args.max_frames else samples
+            if not samples:
+                print(f"{kind}: no verified captures (run 'record', then 'label')", file=sys.stderr)
+                status = 2
+                continue
+            accepts = turn_gate_accepts if kind == TURN else bool
+            negatives = sum(1 for _, label in samples if not accepts(label))
+            if not negatives or negatives == len(samples):
+                print(f"{kind}: warning: corpus has {negatives} negative frame(s) of {len(samples)}; "
+                      "accuracy only means something with both kinds", file=sys.stderr)
+
+            def progress(done, total, result):
+                if args.verbose:
+                    print(f"  [{done}/{total}] acc={result.accuracy:.3f} "
+                          f"mean={result.mean_ms:.1f} ms  {result.profile}", file=sys.stderr)
+
+            print(f"{kind}: {len(samples)} frames")
+            front = pareto_front(tune(proc, kind, samples, progress=progress))
+            for r in front:
+                print(f"  acc={r.accuracy:.3f} mean={r.mean_ms:8.2f} ms max={r.max_ms:8.2f} ms  {r.profile}")
+            best = choose(front, args.tolerance)
+            print(f"  chosen: {best.profile}")
+            if not args.dry_run:
+                save_profile(kind, best.profile)
+        if not args.dry_run:
+            print("Saved to ocr_config.json; restart the app to use the tuned profiles.")
+    finally:
+        proc.engine.close()
+    return status
+
+
+def cmd_bench_pool(args: argparse.Namespace) -> int:
+    import os
+    from ocr_process_pool import OCRProcessPool
+    from ocr_processor import OCRProcessor
+
+    # BGRA crops, as the watcher's capture session hands them to OCRProcessor.
+    frames = []
+    for image in _load_images(args.image):
+        rgb = np.asarray(image.convert("RGB"))
+        alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+        frames.append(np.ascontiguousarray(np.concatenate([rgb[..., ::-1], alpha], axis=2)))
+    regions = [
+        {"left": i * 1000, "top": 0, "width": frames[0].shape[1], "height": frames[0].shape[0]}
+        for i in range(args.regions)
+    ]
+    ticks = max(1, args.frames // len(regions))
+
+    def throughput(proc: OCRProcessor) -> float:
+        # One read_batch per tick, the watcher's path; gate and cache are cleared so every read is OCR.
+        start = time.perf_counter()
+        for tick in range(ticks):
+            proc.frame_gate.clear()
+            proc.cache.clear()
+            proc.read_batch([(r, frames[(tick + i) % len(frames)]) for i, r in enumerate(regions)])
+        return ticks * len(regions) / (time.perf_counter() - start)
+
+    print(f"{ticks} ticks x {len(regions)} regions through read_batch, {os.cpu_count()} cores")
+    proc = OCRProcessor()
+    try:
+        print(f"{'in-process':<12} {throughput(proc):8.1f} frames/s")
+    finally:
+        proc.engine.close()
+    for workers in range(1, args.max_workers + 1):
+        pool = OCRProcessPool(workers)
+        proc = OCRProcessor(pool=pool)
+        try:
+            pool.read_prompt(frames[0]).result()  # start the workers
+            print(f"{f'{workers} process':<12} {throughput(proc):8.1f} frames/s")
+        finally:
+            proc.engine.close()
+            pool.close()
+    return 0
+
+
+def cmd_build_prompts(args: argparse.Namespace) -> int:
+    from config import PROMPTS_FILE
+    from prompt_lexicon import PromptLexicon
+
+    words = []
+    for path in args.wordlist:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            words.extend(line.split()[0] for line in f if line.strip())
+    lexicon = PromptLexicon.build(words, max_length=args.max_length, min_count=args.min_count)
+    if not len(lexicon):
+        print("error: no prompts found (word list empty or not alphabetic)", file=sys.stderr)
+        return 1
+    lexicon.save(args.output or PROMPTS_FILE)
+    by_length = {}
+    for prompt in lexicon.counts:
+        by_length[len(prompt)] = by_length.get(len(prompt), 0) + 1
+    summary = ", ".join(f"{n} of length {k}" for k, n in sorted(by_length.items()))
+    print(f"{len(lexicon)} prompts from {len(words)} words ({summary})")
+    return 0
+
+
+def cmd_bench_engine(args: argparse.Namespace) -> int:
+    from ocr_engine import SubprocessOCREngine, ResidentOCRPool, TESSEROCR_AVAILABLE
+    from ocr_processor import LETTER_WHITELIST
+
+    images = _load_images(args.image)
+    engines = [SubprocessOCREngine()]
+    if TESSEROCR_AVAILABLE:
+        engines.append(ResidentOCRPool(workers=1))
+    else:
+        print("tesserocr not installed: only the subprocess path is measured", file=sys.stderr)
+
+    print(f"{len(images)} image(s), {args.iterations} calls per engine, --psm 7 letter whitelist")
+    for engine in engines:
+        i = 0
+
+        def call():
+            nonlocal i
+            engine.recognize(images[i % len(images)], psm=7, whitelist=LETTER_WHITELIST)
+            i += 1
+
+        try:
+            _report(engine.name, _time_calls(call, args.iterations))
+        finally:
+            engine.close()
+    return 0
+
+
+def cmd_bench_preprocess(args: argparse.Namespace) -> int:
+    from PIL import ImageOps
+    from preprocess import binarize
+
+    # mss hands over BGRA; build the same layout from the inputs.
+    frames = []
+    for image in _load_images(args.image):
+        rgb = np.asarray(image.convert("RGB"))
+        alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+        frames.append(np.concatenate([rgb[..., ::-1], alpha], axis=2))
+
+    def pil_path(bgra):
+        # Previous pipeline: BGRA->RGB bytes, frombytes, L, autocontrast, per-pixel lambda.
+        image = Image.frombytes("RGB", (bgra.shape[1], bgra.shape[0]), bgra[..., 2::-1].tobytes())
+        image = ImageOps.autocontrast(image.convert("L"))
+        return image.point(lambda x: 0 if x < 140 else 255)
+
+    paths = [
+        ("pil", pil_path),
+        ("lut", lambda bgra: binarize(bgra, adaptive=False)),
+        ("lut+otsu", lambda bgra: binarize(bgra, adaptive=True)),
+    ]
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frame(s) (first {w}x{h} BGRA), {args.iterations} calls per path")
+    for label, fn in paths:
+        i = 0
+
+        def call():
+            nonlocal i
+            fn(frames[i % len(frames)])
+            i += 1
+
+        _report(label, _time_calls(call, args.iterations))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="wbt-ocr",
+        description="Word Bomb Tool OCR tools — benchmarks and calibration.",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable debug logging on stderr",
+    )
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_engine = sub.add_parser(
+        "bench-engine",
+        help="compare per-call latency: tesseract subprocess vs resident engine",
+    )
+    p_engine.add_argument(
+        "--image",
+        "-i",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="prompt capture to recognise (repeatable; default: a synthetic prompt)",
+    )
+    p_engine.add_argument("--iterations", "-n", type=int, default=50, metavar="N", help="calls per engine")
+    p_engine.set_defaults(func=cmd_bench_engine)
+
+    p_pool = sub.add_parser("bench-pool", help="prompt OCR throughput: in-process vs process pool sizes")
+    p_pool.add_argument(
+        "--image",
+        "-i",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="prompt capture to recognise (repeatable; default: a synthetic prompt)",
+    )
+    p_pool.add_argument("--frames", "-n", type=int, default=200, metavar="N", help="reads per configuration")
+    p_pool.add_argument("--regions", type=int, default=4, metavar="N", help="regions read per tick")
+    p_pool.add_argument("--max-workers", type=int, default=4, metavar="N", help="largest pool measured")
+    p_pool.set_defaults(func=cmd_bench_pool)
+
+    p_pre = sub.add_parser(
+        "bench-preprocess",
+        help="compare per-frame cost: PIL preprocessing vs the NumPy lookup-table pass",
+    )
+    p_pre.add_argument(
+        "--image",
+        "-i",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="prompt capture to preprocess (repeatable; default: a synthetic prompt)",
+    )
+    p_pre.add_argument("--iterations", "-n", type=int, default=500, metavar="N", help="calls per path")
+    p_pre.set_defaults(func=cmd_bench_preprocess)
+
+    p_record = sub.add_parser("record", help="save captures of the configured regions for labelling")
+    p_record.add_argument(
+        "--kind",
+        choices=("prompt", "turn", "both"),
+        default="both",
+        help="which region to capture (default: both)",
+    )
+    p_record.add_argument("--count", "-n", type=int, default=20, metavar="N", help="frames per region")
+    p_record.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="pause between frames (default: 1.0)",
+    )
+    p_record.set_defaults(func=cmd_record)
+
+    p_label = sub.add_parser("label", help="confirm or correct the suggested labels of recorded captures")
+    p_label.add_argument(
+        "--kind",
+        choices=("prompt", "turn", "both"),
+        default="both",
+        help="which captures to label (default: both)",
+    )
+    p_label.add_argument("--corpus", default=None, metavar="DIR", help="corpus root (default: ocr_corpus/)")
+    p_label.add_argument("--show", action="store_true", help="open each capture in the image viewer")
+    p_label.set_defaults(func=cmd_label)
+
+    p_learn = sub.add_parser("learn-glyphs", help="learn glyph templates from labelled prompt captures")
+    p_learn.add_argument("--corpus", default=None, metavar="DIR", help="corpus root (default: ocr_corpus/)")
+    p_learn.add_argument("--output", "-o", default=None, metavar="PATH", help="templates file to write")
+    p_learn.set_defaults(func=cmd_learn_glyphs)
+
+    p_turn = sub.add_parser("calibrate-turn", help="calibrate the YOUR TURN detector from a reference capture")
+    p_turn.add_argument(
+        "--image",
+        "-i",
+        default=None,
+        metavar="PATH",
+        help="reference capture (default: grab the configured turn region now)",
+    )
+    p_turn.add_argument("--force", action="store_true", help="keep the reference even if OCR disagrees")
+    p_turn.add_argument("--corpus", default=None, metavar="DIR", help="corpus root used to report scores")
+    p_turn.set_defaults(func=cmd_calibrate_turn)
+
+    p_tune = sub.add_parser("tune", help="pick the fastest accurate OCR settings from the labelled corpus")
+    p_tune.add_argument(
+        "--kind",
+        choices=("prompt", "turn", "both"),
+        default="both",
+        help="which region to tune (default: both)",
+    )
+    p_tune.add_argument("--corpus", default=None, metavar="DIR", help="corpus root (default: ocr_corpus/)")
+    p_tune.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        metavar="FRACTION",
+        help="accuracy that may be traded for speed (default: 0)",
+    )
+    p_tune.add_argument("--max-frames", type=int, default=0, metavar="N", help="use only the first N captures")
+    p_tune.add_argument("--dry-run", action="store_true", help="report the Pareto front without saving")
+    p_tune.set_defaults(func=cmd_tune)
+
+    p_prompts = sub.add_parser("build-prompts", help="build the valid-prompt list OCR readings are corrected to")
+    p_prompts.add_argument("wordlist", nargs="+", metavar="WORDS.txt", help="word list, one word per line")
+    p_prompts.add_argument(
+        "--max-length",
+        type=int,
+        default=3,
+        metavar="N",
+        help="longest prompt fragment (default: 3)",
+    )
+    p_prompts.add_argument(
+        "--min-count",
+        type=int,
+        default=1,
+        metavar="N",
+        help="minimum number of words containing a fragment (default: 1)",
+    )
+    p_prompts.add_argument("--output", "-o", default=None, metavar="PATH", help="prompts file to write")
+    p_prompts.set_defaults(func=cmd_build_prompts)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format="%(levelname)s %(name)s: %(message)s")
+    else:
+        logging.basicConfig(level=logging.WARNING)
+
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
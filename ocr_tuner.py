@@ -0,0 +1,101 @@
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import CONFIG_FILE
+from frame_corpus import PROMPT
+from ocr_profiles import PromptProfile, TurnProfile, profile_to_dict
+from persistence import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    """One profile replayed over the corpus."""
+    profile: object
+    accuracy: float
+    mean_ms: float
+    max_ms: float
+
+
+def prompt_grid() -> List[PromptProfile]:
+    return [
+        PromptProfile(psm=psm, threshold=threshold, upscale=upscale)
+        for psm, threshold, upscale in itertools.product(
+            (7, 8, 13), (None, 110, 140, 170), ((0, 0), (140, 48))
+        )
+    ]
+
+
+def turn_grid() -> List[TurnProfile]:
+    return [
+        TurnProfile(psm_order=order, cutoff=cutoff, upscale=upscale, fallback_psm_order=fallback)
+        for order, cutoff, upscale, fallback in itertools.product(
+            ((6, 7, 8, 13), (6, 7), (7,), (8,), (13,)),
+            (0.0, 1.0, 3.0),
+            ((0, 0), (140, 48)),
+            ((7, 6, 8), ()),
+        )
+    ]
+
+
+def evaluate(processor, kind: str, profile, samples: Sequence[Tuple[np.ndarray, str]]) -> TrialResult:
+    """Accuracy and per-frame latency of profile on (rgb, label) samples; label '' is a negative frame."""
+    from ocr_processor import turn_gate_accepts
+
+    correct, times = 0, []
+    for rgb, label in samples:
+        start = time.perf_counter()
+        if kind == PROMPT:
+            ok = processor.read_prompt(rgb, use_glyphs=False, profile=profile).text == label
+        else:
+            ok = turn_gate_accepts(processor.recognize_turn_gate(rgb, profile)) == turn_gate_accepts(label)
+        times.append((time.perf_counter() - start) * 1000)
+        correct += ok
+    return TrialResult(profile, correct / len(samples), float(np.mean(times)), float(np.max(times)))
+
+
+def tune(processor, kind: str, samples: Sequence[Tuple[np.ndarray, str]],
+         grid: Optional[Iterable] = None, progress=None) -> List[TrialResult]:
+    """Replay every profile in grid (default: the kind's grid) over samples."""
+    grid = list(grid if grid is not None else (prompt_grid() if kind == PROMPT else turn_grid()))
+    results = []
+    for i, profile in enumerate(grid):
+        results.append(evaluate(processor, kind, profile, samples))
+        if progress:
+            progress(i + 1, len(grid), results[-1])
+    return results
+
+
+def pareto_front(results: Iterable[TrialResult]) -> List[TrialResult]:
+    """Results no other result beats on both accuracy and latency, fastest first."""
+    front = []
+    for r in sorted(results, key=lambda r: (r.mean_ms, -r.accuracy)):
+        if not front or r.accuracy > front[-1].accuracy:
+            front.append(r)
+    return front
+
+
+def choose(front: Sequence[TrialResult], tolerance: float = 0.0) -> TrialResult:
+    """Fastest front member within tolerance of the best accuracy."""
+    best = max(r.accuracy for r in front)
+    return next(r for r in front if r.accuracy >= best - tolerance)
+
+
+def save_profile(kind: str, profile, path: str = CONFIG_FILE):
+    """Store profile under "ocr_profiles" in the app config, keeping every other setting."""
+    try:
+        with open(path, "r") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    profiles = dict(config.get("ocr_profiles") or {})
+    profiles[kind] = profile_to_dict(profile)
+    config["ocr_profiles"] = profiles
+    atomic_write_json(path, config)
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import PERSIST_DEBOUNCE_SECONDS, PERSIST_MAX_DELAY_SECONDS, METRICS_CHECKPOINT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: str, data, indent: int = 2):
+    """Write JSON to a temp file in the same directory, fsync it, then rename over path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class PersistenceWorker(threading.Thread):
+    """
+    Background write-behind saver. request(key, job) schedules job to run on
+    this thread after PERSIST_DEBOUNCE_SECONDS of quiet; repeated requests for the
+    same key merge into one run, and a burst never delays it more than
+    PERSIST_MAX_DELAY_SECONDS. checkpoint (if given) runs every checkpoint_interval.
+    """
+
+    def __init__(self, checkpoint: Optional[Callable[[], None]] = None,
+                 checkpoint_interval: float = METRICS_CHECKPOINT_SECONDS,
+                 debounce: float = PERSIST_DEBOUNCE_SECONDS,
+                 max_delay: float = PERSIST_MAX_DELAY_SECONDS):
+        super().__init__(daemon=True, name="Persistence")
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._jobs: Dict[str, Callable[[], None]] = {}
+        self._first_request: Dict[str, float] = {}
+        self._deadline: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+
+    def request(self, key: str, job: Callable[[], None]):
+        """Schedule job under key; never blocks on I/O."""
+        now = time.monotonic()
+        with self._cond:
+            self._jobs[key] = job
+            first = self._first_request.setdefault(key, now)
+            self._deadline[key] = min(now + self.debounce, first + self.max_delay)
+            self._cond.notify()
+
+    def _take_due(self, now: float) -> Dict[str, Callable[[], None]]:
+        due = {k: job for k, job in self._jobs.items() if self._deadline[k] <= now}
+        for k in due:
+            del self._jobs[k], self._first_request[k], self._deadline[k]
+        return due
+
+    @staticmethod
+    def _run_jobs(jobs: Dict[str, Callable[[], None]]):
+        for key, job in jobs.items():
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"Persistence job '{key}' failed: {e}", exc_info=True)
+
+    def run(self):
+        next_checkpoint = time.monotonic() + self.checkpoint_interval
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = time.monotonic()
+                    wake = min([next_checkpoint] + list(self._deadline.values()))
+                    if wake <= now:
+                        break
+                    self._cond.wait(wake - now)
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                due = self._take_due(now)
+            self._run_jobs(due)
+            if self.checkpoint and now >= next_checkpoint:
+                next_checkpoint = now + self.checkpoint_interval
+                self._run_jobs({"checkpoint": self.checkpoint})
+
+    def stop(self, run_pending: bool = True):
+        """Stop the worker thread; run any still-pending jobs on the caller's thread."""
+        with self._cond:
+            self._stopping = True
+            pending = dict(self._jobs)
+            self._jobs.clear()
+            self._first_request.clear()
+            self._deadline.clear()
+            self._cond.notify()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=5)
+        if run_pending:
+            self._run_jobs(pending)
@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from capture import CaptureFrame, CaptureSession
+from config import POLL_MIN_INTERVAL, POLL_BACKOFF
+from frame_gate import FrameChangeGate, downsample
+from preprocess import bgra_to_gray
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePoller:
+    """
+    Poll interval that drops to min_interval on activity and grows by backoff
+    on every idle poll, capped by max_interval() (the user's ocr_interval).
+    """
+
+    def __init__(self, max_interval: Callable[[], float], min_interval: float = POLL_MIN_INTERVAL,
+                 backoff: float = POLL_BACKOFF):
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._polls = deque(maxlen=64)
+        self._last_wall = time.monotonic()
+        self._last_cpu = time.process_time()
+        self._wall = {"active": 0.0, "idle": 0.0}
+        self._cpu = {"active": 0.0, "idle": 0.0}
+
+    def current(self) -> float:
+        return min(self.interval, self.max_interval())
+
+    def activity(self):
+        """Something changed: poll again soon (wakes a sleeping poll)."""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def idle(self):
+        """Nothing changed: back off."""
+        self.interval = min(self.interval * self.backoff, self.max_interval())
+
+    def sleep(self):
+        """Wait for the current interval or until activity()."""
+        self._account()
+        self._wake.wait(self.current())
+        self._wake.clear()
+
+    def wait_for_wake(self, timeout: Optional[float] = None):
+        """Sleep until activity() (nothing to poll)."""
+        self._account()
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def _account(self):
+        now, cpu = time.monotonic(), time.process_time()
+        # Time spent at the cap counts as idle: the screen has been static for a while.
+        bucket = "idle" if self.interval >= self.max_interval() else "active"
+        with self._lock:
+            self._polls.append(now)
+            self._wall[bucket] += now - self._last_wall
+            self._cpu[bucket] += cpu - self._last_cpu
+            self._last_wall, self._last_cpu = now, cpu
+
+    def get_stats(self) -> Dict[str, float]:
+        """Recent poll rate, interval and process CPU use while active / idle."""
+        with self._lock:
+            polls = list(self._polls)
+            wall, cpu = dict(self._wall), dict(self._cpu)
+        span = polls[-1] - polls[0] if len(polls) > 1 else 0.0
+        return {
+            "polls_per_second": (len(polls) - 1) / span if span > 0 else 0.0,
+            "current_interval_ms": self.current() * 1000,
+            "active_cpu_percent": 100.0 * cpu["active"] / wall["active"] if wall["active"] else 0.0,
+            "idle_cpu_percent": 100.0 * cpu["idle"] / wall["idle"] if wall["idle"] else 0.0,
+        }
+
+
+class PolledFrame:
+    """A capture tick: sequence number, pixels, and whether any region changed since the last tick."""
+    __slots__ = ("seq", "frame", "changed", "captured_at")
+
+    def __init__(self, seq: int, frame: CaptureFrame, changed: bool, captured_at: float):
+        self.seq = seq
+        self.frame = frame
+        self.changed = changed
+        self.captured_at = captured_at
+
+
+class LatestFrameGrabber(threading.Thread):
+    """
+    Capture thread paced by an AdaptivePoller. It keeps only the newest frame:
+    a slow consumer skips straight to the latest one instead of working through
+    a backlog. A cheap downsampled comparison decides whether the screen changed,
+    which is what drives the back-off.
+    """
+
+    def __init__(self, poller: AdaptivePoller):
+        super().__init__(daemon=True, name="FrameGrabber")
+        self.poller = poller
+        self.capture = CaptureSession()
+        self._regions: Sequence[Dict] = ()
+        self._gate = FrameChangeGate()
+        self._cond = threading.Condition()
+        self._latest: Optional[PolledFrame] = None
+        self._seq = 0
+        self._interrupted = False
+
+    def set_regions(self, regions: Sequence[Dict]):
+        """Regions to capture each tick (empty: pause)."""
+        regions = tuple(dict(r) for r in regions if r)
+        with self._cond:
+            if regions == self._regions:
+                return
+            self._regions = regions
+            self._gate.clear()
+        self.poller.activity()
+
+    def interrupt(self):
+        """Make a blocked wait_frame() return None (state changed)."""
+        with self._cond:
+            self._interrupted = True
+            self._cond.notify_all()
+
+    def wait_frame(self, after_seq: int, timeout: Optional[float] = None) -> Optional[PolledFrame]:
+        """Newest frame after after_seq, or None on timeout / interrupt."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._interrupted or (self._latest is not None and self._latest.seq > after_seq),
+                timeout,
+            )
+            if self._interrupted:
+                self._interrupted = False
+                return None
+            if self._latest is not None and self._latest.seq > after_seq:
+                return self._latest
+            return None
+
+    def _changed(self, frame: CaptureFrame, regions) -> bool:
+        changed = False
+        for region in regions:
+            crop = frame.crop(region)
+            if crop is None:
+                continue
+            small = downsample(bgra_to_gray(crop))
+            key = (region["left"], region["top"], region["width"], region["height"])
+            hit, _ = self._gate.check(key, small)
+            if not hit:
+                self._gate.update(key, small, None)
+                # A uniform crop means the game window is gone (minimised / covered by a blank screen).
+                changed = changed or float(np.ptp(small)) > 1.0
+        return changed
+
+    def run(self):
+        while True:
+            with self._cond:
+                regions = self._regions
+            if not regions:
+                self.poller.wait_for_wake()
+                continue
+            changed = False
+            try:
+                frame = self.capture.grab(*regions)
+                changed = self._changed(frame, regions)
+                with self._cond:
+                    self._seq += 1
+                    self._latest = PolledFrame(self._seq, frame, changed, time.monotonic())
+                    self._cond.notify_all()
+            except Exception as e:
+                logger.debug(f"Capture failed: {e}")
+                # Reopen the screen handle in case it is what failed
+                self.capture.close()
+            if changed:
+                self.poller.activity()
+            else:
+                self.poller.idle()
+            self.poller.sleep()
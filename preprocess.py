@@ -0,0 +1,94 @@
+import sys
+from typing import Optional
+
+import numpy as np
+
+from config import OCR_THRESHOLD, OCR_ADAPTIVE_THRESHOLD
+
+_IDENTITY = np.arange(256, dtype=np.uint8)
+
+
+def bgra_to_gray(bgra: np.ndarray) -> np.ndarray:
+    """H x W x 4 BGRA (mss layout) -> H x W uint8 luma, same fixed-point weights as Pillow's "L"."""
+    if sys.byteorder == "little" and bgra.strides[-1] == 1:
+        # Each pixel read as one uint32 (B in the low byte), no per-channel copies.
+        px = bgra.view(np.uint32)[..., 0]
+        luma = (px & 0xFF) * 7471 + ((px >> 8) & 0xFF) * 38470 + ((px >> 16) & 0xFF) * 19595
+        return ((luma + 0x8000) >> 16).astype(np.uint8)
+    b = bgra[..., 0].astype(np.uint32)
+    g = bgra[..., 1].astype(np.uint32)
+    r = bgra[..., 2].astype(np.uint32)
+    return ((r * 19595 + g * 38470 + b * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+
+def to_gray(pixels: np.ndarray) -> np.ndarray:
+    """uint8 luma from H x W (already gray), H x W x 3 (RGB, PIL order) or H x W x 4 (BGRA, mss order)."""
+    if pixels.ndim == 2:
+        return pixels
+    if pixels.shape[2] == 4:
+        return bgra_to_gray(pixels)
+    r = pixels[..., 0].astype(np.uint32)
+    g = pixels[..., 1].astype(np.uint32)
+    b = pixels[..., 2].astype(np.uint32)
+    return ((r * 19595 + g * 38470 + b * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+
+def histogram(gray: np.ndarray) -> np.ndarray:
+    return np.bincount(gray.ravel(), minlength=256)
+
+
+def contrast_lut(hist: np.ndarray, cutoff: float = 0.0) -> np.ndarray:
+    """
+    Lookup table equivalent to ImageOps.autocontrast: stretch the darkest..lightest
+    level (after dropping cutoff percent of pixels at each end) to 0..255.
+    """
+    if cutoff:
+        cut = hist.sum() * cutoff / 100.0
+        low = np.cumsum(hist)
+        high = np.cumsum(hist[::-1])[::-1]
+        hist = np.where((low > cut) & (high > cut), hist, 0)
+    levels = np.flatnonzero(hist)
+    if len(levels) == 0 or levels[-1] <= levels[0]:
+        return _IDENTITY
+    lo, hi = int(levels[0]), int(levels[-1])
+    scale = 255.0 / (hi - lo)
+    # Pillow's expression (ix * scale + offset): (ix - lo) * scale rounds differently
+    # and truncates to the neighbouring level on some histograms.
+    offset = -lo * scale
+    return np.clip(np.arange(256) * scale + offset, 0, 255).astype(np.uint8)
+
+
+def otsu_threshold(hist: np.ndarray) -> int:
+    """Threshold maximising between-class variance of a 256-bin histogram."""
+    hist = hist.astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return OCR_THRESHOLD
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * weight - mean * total) ** 2 / (weight * (total - weight))
+    between = np.nan_to_num(between[:-1])
+    return int(between.argmax()) + 1
+
+
+def binarize(pixels: np.ndarray, threshold: Optional[int] = OCR_THRESHOLD,
+             adaptive: bool = OCR_ADAPTIVE_THRESHOLD) -> np.ndarray:
+    """
+    Grayscale, contrast stretch and threshold in one lookup: the stretch and the
+    threshold are folded into a single 256-entry table applied once per pixel.
+    adaptive picks Otsu's threshold on the stretched histogram instead of threshold.
+    """
+    gray = to_gray(pixels)
+    hist = histogram(gray)
+    stretch = contrast_lut(hist)
+    if adaptive or threshold is None:
+        threshold = otsu_threshold(np.bincount(stretch, weights=hist, minlength=256))
+    lut = np.where(stretch < threshold, 0, 255).astype(np.uint8)
+    return lut[gray]
+
+
+def stretch(pixels: np.ndarray, cutoff: float = 1.0) -> np.ndarray:
+    """Grayscale plus contrast stretch, no threshold (soft path for coloured UI)."""
+    gray = to_gray(pixels)
+    return contrast_lut(histogram(gray), cutoff)[gray]
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from config import PROMPTS_FILE, PROMPT_MAX_LENGTH, OCR_MAX_CORRECTION_COST
+from persistence import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# Letters Tesseract (and thin-stroke glyph matching) commonly mistake for each other.
+_CONFUSABLE = [
+    ("l", "i"), ("i", "j"), ("l", "t"), ("f", "t"), ("i", "t"),
+    ("o", "c"), ("o", "e"), ("c", "e"), ("a", "o"), ("u", "v"),
+    ("v", "y"), ("n", "h"), ("n", "r"), ("b", "h"), ("g", "q"),
+]
+CONFUSABLE_COST = 0.4
+SUBSTITUTION_COST = {}
+for _a, _b in _CONFUSABLE:
+    SUBSTITUTION_COST[(_a, _b)] = SUBSTITUTION_COST[(_b, _a)] = CONFUSABLE_COST
+
+# Multi-letter confusions: read -> intended.
+SPLIT_MERGE = [("rn", "m"), ("m", "rn"), ("vv", "w"), ("w", "vv"), ("cl", "d"), ("d", "cl"), ("ii", "u")]
+
+# Thin letters are the ones OCR drops; missing anything else is unlikely enough to reject.
+INSERT_COST = {c: (0.6 if c in "ijlft" else 1.0) for c in ALPHABET}
+
+
+def _weight(confidence: float) -> float:
+    """Editing a character costs less the less sure OCR was of it."""
+    return 0.5 + 0.5 * min(1.0, max(0.0, confidence))
+
+
+def one_edit_candidates(text: str, confidences: Sequence[float]) -> Dict[str, float]:
+    """Every string one weighted edit (substitution, deletion, insertion, split/merge) from text."""
+    weights = [_weight(c) for c in confidences]
+    out: Dict[str, float] = {}
+
+    def offer(candidate: str, cost: float):
+        if candidate and cost < out.get(candidate, float("inf")):
+            out[candidate] = cost
+
+    for i, ch in enumerate(text):
+        for d in ALPHABET:
+            if d != ch:
+                offer(text[:i] + d + text[i + 1:], SUBSTITUTION_COST.get((ch, d), 1.0) * weights[i])
+        offer(text[:i] + text[i + 1:], weights[i])
+    for i in range(len(text) + 1):
+        for d in ALPHABET:
+            offer(text[:i] + d + text[i:], INSERT_COST[d])
+    for src, dst in SPLIT_MERGE:
+        start = text.find(src)
+        while start != -1:
+            w = sum(weights[start:start + len(src)]) / len(src)
+            offer(text[:start] + dst + text[start + len(src):], CONFUSABLE_COST * w)
+            start = text.find(src, start + 1)
+    return out
+
+
+class PromptLexicon:
+    """
+    Prompts that actually occur — letter fragments with a non-zero number of
+    answers — used to snap OCR readings to the nearest valid prompt.
+    Built offline from a word list (ocr_tools.py build-prompts) and extended at
+    runtime with prompts the suggestion API returned words for.
+    """
+
+    def __init__(self, counts: Optional[Dict[str, int]] = None, max_length: int = PROMPT_MAX_LENGTH):
+        self.counts: Dict[str, int] = dict(counts or {})
+        self.max_length = max_length
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, prompt: str) -> bool:
+        return prompt in self.counts
+
+    @classmethod
+    def build(cls, words: Iterable[str], max_length: int = PROMPT_MAX_LENGTH,
+              min_count: int = 1) -> "PromptLexicon":
+        """Count, for every fragment of up to max_length letters, how many words contain it."""
+        counts: Dict[str, int] = {}
+        for word in words:
+            word = word.strip().lower()
+            if not word.isalpha():
+                continue
+            fragments = {word[i:i + n] for n in range(1, max_length + 1) for i in range(len(word) - n + 1)}
+            for fragment in fragments:
+                counts[fragment] = counts.get(fragment, 0) + 1
+        return cls({f: c for f, c in counts.items() if c >= min_count}, max_length)
+
+    def learn(self, prompt: str, answers: int) -> bool:
+        """Record that prompt has answers (only extends a built lexicon)."""
+        if not self.counts or answers <= 0 or not prompt.isalpha() or len(prompt) > self.max_length:
+            return False
+        with self._lock:
+            if self.counts.get(prompt, 0) >= answers:
+                return False
+            self.counts[prompt] = answers
+            self.dirty = True
+        return True
+
+    def correct(self, text: str, confidences: Sequence[float] = (),
+                max_cost: float = OCR_MAX_CORRECTION_COST) -> Optional[Tuple[str, float]]:
+        """
+        (prompt, cost) for the valid prompt nearest to text by confidence-weighted
+        edit cost, ties going to the prompt with more answers; None if nothing is
+        within max_cost. An empty lexicon accepts text unchanged.
+        """
+        if not self.counts or text in self.counts:
+            return text, 0.0
+        if len(text) > self.max_length + 1:
+            return None
+        confidences = list(confidences) or [1.0] * len(text)
+        best = None
+        for candidate, cost in one_edit_candidates(text, confidences).items():
+            if cost > max_cost or candidate not in self.counts:
+                continue
+            key = (cost, -self.counts[candidate])
+            if best is None or key < best[0]:
+                best = (key, candidate)
+        return (best[1], best[0][0]) if best else None
+
+    def save(self, path: str = PROMPTS_FILE):
+        with self._lock:
+            counts = dict(self.counts)
+            self.dirty = False
+        atomic_write_json(path, {"max_length": self.max_length, "prompts": counts}, indent=0)
+
+    @classmethod
+    def load(cls, path: str = PROMPTS_FILE) -> "PromptLexicon":
+        """Saved lexicon, or an empty one (no correction) if none has been built."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            lexicon = cls({str(k): int(v) for k, v in data["prompts"].items()},
+                          int(data.get("max_length", PROMPT_MAX_LENGTH)))
+            logger.info(f"Prompt lexicon loaded ({len(lexicon)} prompts)")
+            return lexicon
+        except Exception as e:
+            logger.error(f"Ignoring prompt lexicon {path}: {e}")
+            return cls()
@@ -0,0 +1,57 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+from config import VOTE_WINDOW, VOTE_MIN_AGREE, VOTE_ACCEPT_CONFIDENCE
+
+
+class PromptVoter:
+    """
+    Per-region vote over the last few prompt readings. A confident reading is
+    accepted immediately; an ambiguous one only once the same letters have been
+    read min_agree times in the window, so mid-transition frames are ignored.
+    """
+
+    def __init__(self, window: int = VOTE_WINDOW, min_agree: int = VOTE_MIN_AGREE,
+                 accept_confidence: float = VOTE_ACCEPT_CONFIDENCE):
+        self.window = max(1, window)
+        self.min_agree = max(1, min_agree)
+        self.accept_confidence = accept_confidence
+        self._reads: Dict[Hashable, Deque[Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.accepted_confident = 0
+        self.accepted_by_vote = 0
+        self.held = 0
+
+    def add(self, key: Hashable, reading: Optional[Tuple[str, float]]) -> Optional[str]:
+        """Record one reading (None for a rejected frame); returns the letters once they are trusted."""
+        with self._lock:
+            reads = self._reads.setdefault(key, deque(maxlen=self.window))
+            if reading is None:
+                reads.append(None)
+                return None
+            letters, confidence = reading
+            reads.append(letters)
+            if confidence >= self.accept_confidence:
+                self.accepted_confident += 1
+                return letters
+            if sum(1 for r in reads if r == letters) >= self.min_agree:
+                self.accepted_by_vote += 1
+                return letters
+            self.held += 1
+            return None
+
+    def reset(self, key: Optional[Hashable] = None):
+        """Forget readings for key (every region if None)."""
+        with self._lock:
+            if key is None:
+                self._reads.clear()
+            else:
+                self._reads.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "accepted_confident": self.accepted_confident,
+            "accepted_by_vote": self.accepted_by_vote,
+            "held_for_agreement": self.held,
+        }
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    REGION_TEMPLATES_FILE,
+    LOCATE_MIN_SCORE,
+    LOCATE_MIN_TEMPLATE_SIDE,
+    LOCATE_CANDIDATES,
+    LOCATE_NEAR_MARGIN,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _pool2(gray: np.ndarray) -> np.ndarray:
+    """Halve resolution by 2x2 averaging (odd edge row/column dropped)."""
+    h, w = gray.shape[0] // 2 * 2, gray.shape[1] // 2 * 2
+    g = gray[:h, :w]
+    return (g[0::2, 0::2] + g[1::2, 0::2] + g[0::2, 1::2] + g[1::2, 1::2]) * 0.25
+
+
+def pyramid(gray: np.ndarray, levels: int) -> List[np.ndarray]:
+    """[full, 1/2, 1/4, ...] float32 images, levels + 1 entries."""
+    out = [gray.astype(np.float32)]
+    for _ in range(levels):
+        out.append(_pool2(out[-1]))
+    return out
+
+
+def match_template(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """
+    Normalised cross-correlation of template at every valid position of image
+    ((H - h + 1) x (W - w + 1), values in [-1, 1]). The numerator is an FFT
+    correlation with the zero-mean template; window energies come from integral images.
+    """
+    h, w = template.shape
+    H, W = image.shape
+    if H < h or W < w:
+        return np.zeros((0, 0), dtype=np.float32)
+    t = template.astype(np.float64)
+    t = t - t.mean()
+    t_norm = np.sqrt((t * t).sum())
+    img = image.astype(np.float64)
+
+    shape = (H + h - 1, W + w - 1)
+    spectrum = np.fft.rfft2(img, shape) * np.fft.rfft2(t[::-1, ::-1], shape)
+    numerator = np.fft.irfft2(spectrum, shape)[h - 1:H, w - 1:W]
+
+    def window_sums(a):
+        s = np.zeros((H + 1, W + 1))
+        s[1:, 1:] = a.cumsum(0).cumsum(1)
+        return s[h:, w:] - s[:-h, w:] - s[h:, :-w] + s[:-h, :-w]
+
+    n = h * w
+    s1 = window_sums(img)
+    s2 = window_sums(img * img)
+    energy = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = numerator / (energy * t_norm)
+    return np.nan_to_num(scores).astype(np.float32)
+
+
+def _top_peaks(scores: np.ndarray, count: int, spacing: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Up to count (row, col) maxima at least spacing apart."""
+    scores = scores.copy()
+    peaks = []
+    for _ in range(count):
+        if scores.size == 0:
+            break
+        r, c = np.unravel_index(int(scores.argmax()), scores.shape)
+        if not np.isfinite(scores[r, c]) or scores[r, c] <= 0:
+            break
+        peaks.append((int(r), int(c)))
+        scores[max(0, r - spacing[0]):r + spacing[0] + 1, max(0, c - spacing[1]):c + spacing[1] + 1] = -np.inf
+    return peaks
+
+
+def _refine(image: np.ndarray, template: np.ndarray, row: int, col: int, radius: int) -> Tuple[int, int, float]:
+    """Best match within radius pixels of (row, col)."""
+    h, w = template.shape
+    top, left = max(0, row - radius), max(0, col - radius)
+    window = image[top:row + radius + h, left:col + radius + w]
+    scores = match_template(window, template)
+    if scores.size == 0:
+        return row, col, -1.0
+    r, c = np.unravel_index(int(scores.argmax()), scores.shape)
+    return top + int(r), left + int(c), float(scores[r, c])
+
+
+class RegionLocator:
+    """
+    Finds the prompt and YOUR TURN boxes on screen by template matching against
+    crops saved when the regions were last known to be right. Search is coarse
+    to fine: a handful of candidates from a downscaled screen, each refined level
+    by level to full resolution.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, np.ndarray]] = None, min_score: float = LOCATE_MIN_SCORE):
+        self.templates: Dict[str, np.ndarray] = dict(templates or {})
+        self.min_score = min_score
+        self._lock = threading.Lock()
+
+    def has_template(self, kind: str) -> bool:
+        return kind in self.templates
+
+    def remember(self, kind: str, gray: np.ndarray):
+        """Use this grayscale crop as kind's template."""
+        with self._lock:
+            self.templates[kind] = np.array(gray, dtype=np.uint8)
+
+    def forget(self, kind: str):
+        with self._lock:
+            self.templates.pop(kind, None)
+
+    def locate(self, screen: np.ndarray, kind: str,
+               near: Optional[Dict] = None) -> Optional[Tuple[Dict, float]]:
+        """
+        (region relative to screen, score) of kind's template in the grayscale screen,
+        or None if nothing scores min_score. With near (a region relative to screen),
+        the area around it is tried first at full resolution before the pyramid search.
+        """
+        template = self.templates.get(kind)
+        if template is None:
+            return None
+        h, w = template.shape
+
+        if near is not None:
+            row, col, score = _refine(screen, template, int(near["top"]), int(near["left"]), LOCATE_NEAR_MARGIN)
+            if score >= self.min_score:
+                return {"left": col, "top": row, "width": w, "height": h}, score
+
+        levels = 0
+        while min(h, w) >> (levels + 1) >= LOCATE_MIN_TEMPLATE_SIDE:
+            levels += 1
+        screens = pyramid(screen, levels)
+        templates = pyramid(template, levels)
+
+        coarse = match_template(screens[-1], templates[-1])
+        th, tw = templates[-1].shape
+        best = None
+        for row, col in _top_peaks(coarse, LOCATE_CANDIDATES, (th // 2, tw // 2)):
+            score = float(coarse[row, col])
+            for level in range(levels - 1, -1, -1):
+                row, col, score = _refine(screens[level], templates[level], row * 2, col * 2, 2)
+            if best is None or score > best[2]:
+                best = (row, col, score)
+        if best is None or best[2] < self.min_score:
+            return None
+        return {"left": best[1], "top": best[0], "width": w, "height": h}, best[2]
+
+    def save(self, path: str = REGION_TEMPLATES_FILE):
+        with self._lock:
+            np.savez_compressed(path, **self.templates)
+
+    @classmethod
+    def load(cls, path: str = REGION_TEMPLATES_FILE) -> "RegionLocator":
+        """Locator with the saved templates, or none (nothing can be located yet)."""
+        locator = cls()
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    locator.templates = {k: data[k] for k in data.files}
+                logger.info(f"Region templates loaded ({', '.join(sorted(locator.templates))})")
+            except Exception as e:
+                logger.error(f"Ignoring region templates {path}: {e}")
+        return locator
@@ -2,27 +2,26 @@ import json
 import threading
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Set
-from dataclasses import dataclass, field
+from typing import Callable, Optional, Dict, Tuple
+from dataclasses import dataclass, field, fields, replace
 from config import (
     CONFIG_FILE,
     METRICS_FILE,
+    TYPED_HISTORY_FILE,
+    TYPING_JOURNAL_FILE,
     TYPING_DELAY,
     OCR_INTERVAL,
     clamp_typing_delay,
     clamp_ocr_interval,
 )
+from event_bus import EventBus, FIELD_EVENTS, StateEvent
+from persistence import PersistenceWorker, atomic_write_json
+from typed_history import TypedHistory
+from typing_journal import TypingJournal
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TypingRecord:
-    """Record of typed word with timestamp."""
-    word: str
-    timestamp: datetime
-    search_term: str
-
-@dataclass
+@dataclass(frozen=True)
 class AppMetrics:
     """Application telemetry and metrics."""
     total_ocr_attempts: int = 0
@@ -35,117 +34,228 @@ class AppMetrics:
     average_api_time_ms: float = 0.0
     session_start_time: datetime = field(default_factory=datetime.now)
 
-@dataclass
+@dataclass(frozen=True)
 class AppState:
-    """Central application state."""
+    """
+    Immutable snapshot of application state. StateManager never mutates one;
+    it builds a new snapshot and swaps it in.
+    typed_words_history is a shared, internally locked structure.
+    """
     region: Optional[Dict] = None
     # Optional second region: OCR must show YOUR TURN (both "your" and "turn" in alnum text) for auto mode.
     turn_region: Optional[Dict] = None
-    suggestions: List[str] = field(default_factory=list)
-    definitions: List[str] = field(default_factory=list)
+    suggestions: Tuple[str, ...] = ()
+    definitions: Tuple[str, ...] = ()
     last_ocr_text: Optional[str] = None
+    # time.monotonic() when last_ocr_text was first read; journal records prompt-to-Enter latency from it.
+    last_prompt_time: float = 0.0
     auto_mode_active: bool = False
     current_mode_index: int = 2
     current_sort_mode_index: int = 2
     suggestion_index: int = 0
     definition_index: int = 0
-    typed_words_history: Set[str] = field(default_factory=set)
-    typing_records: List[TypingRecord] = field(default_factory=list)
+    typed_words_history: TypedHistory = field(default_factory=TypedHistory)
     total_typed_count: int = 0
     typing_delay: float = TYPING_DELAY
     ocr_interval: float = OCR_INTERVAL
     api_status: str = "[OK] Online"
+    # Tuned OCR settings per region kind ("prompt", "turn") written by ocr_tools.py tune.
+    ocr_profiles: Optional[Dict] = None
+    # Additional game windows watched in auto mode: {"name", "region", "turn_region"} each.
+    windows: Tuple[Dict, ...] = ()
     metrics: AppMetrics = field(default_factory=AppMetrics)
 
+_STATE_FIELDS = frozenset(f.name for f in fields(AppState))
+_TUPLE_FIELDS = ("suggestions", "definitions", "windows")
+
 class StateManager:
-    """Thread-safe state management."""
+    """
+    Copy-on-write state management: writers build a new AppState under the
+    lock and swap it in; readers take the current snapshot without locking.
+    Changes are published as StateEvents on self.events.
+    """
 
     def __init__(self):
         self.state = AppState()
         self._lock = threading.RLock()
+        self.journal = TypingJournal(TYPING_JOURNAL_FILE)
+        self.events = EventBus()
+        self._persistence: Optional[PersistenceWorker] = None
+        self._metrics_sources: Dict[str, Callable[[], dict]] = {}
+        # Typed history changed since it was last saved (checked by the checkpoint).
+        self._history_dirty = False
 
     def get_state(self) -> AppState:
-        """Get copy of current state."""
-        with self._lock:
-            return self.state
+        """Get the current immutable snapshot (lock-free: the reference swap is atomic)."""
+        return self.state
+
+    def _swap(self, **changes) -> AppState:
+        """Install a new snapshot with changes applied and publish its events. Caller holds the lock."""
+        old = self.state
+        self.state = replace(old, **changes)
+        kinds = {FIELD_EVENTS[k] for k, v in changes.items() if k in FIELD_EVENTS and getattr(old, k) != v}
+        for kind in StateEvent:
+            if kind in kinds:
+                self.events.publish(kind, self.state)
+        return self.state
 
     def update_state(self, **kwargs):
         """Update state attributes safely."""
+        changes = {}
+        for key, value in kwargs.items():
+            if key not in _STATE_FIELDS:
+                logger.warning(f"Unknown state attribute: {key}")
+                continue
+            if key in _TUPLE_FIELDS and value is not None:
+                value = tuple(value)
+            changes[key] = value
+        if not changes:
+            return
+        with self._lock:
+            self._swap(**changes)
+
+    def record_typed_word(self, word: str, search_term: str, latency_ms: float, next_index: Optional[int],
+                          suggestions: Optional[Tuple[str, ...]] = None):
+        """
+        Add a typed word to history and the journal, bump the count and advance the
+        suggestion index (left alone when next_index is None: words typed in other windows).
+        suggestions is the list next_index points into; if another prompt's suggestions
+        have been installed meanwhile, the index is not moved.
+        """
         with self._lock:
-            for key, value in kwargs.items():
-                if hasattr(self.state, key):
-                    setattr(self.state, key, value)
-                else:
-                    logger.warning(f"Unknown state attribute: {key}")
-
-    def add_typing_record(self, word: str, search_term: str):
-        """Add a typing record."""
+            self.state.typed_words_history.add(word)
+            self.journal.append(word, search_term, latency_ms)
+            self._history_dirty = True
+            changes = {"total_typed_count": self.state.total_typed_count + 1}
+            if next_index is not None and self.state.suggestions is suggestions:
+                changes["suggestion_index"] = next_index
+            self._swap(**changes)
+        # Written by the persistence worker, never under the state lock.
+        if self.journal.flush_due():
+            self.request_save("journal")
+
+    def skip_suggestion(self, next_index: int, suggestions: Optional[Tuple[str, ...]]):
+        """Move past a suggestion without recording it (the game rejected it); same guard as record_typed_word."""
+        with self._lock:
+            if self.state.suggestions is suggestions:
+                self._swap(suggestion_index=next_index)
+
+    def clear_history(self):
+        """Forget typed words, empty the undo buffer (the journal keeps a clear marker) and reset the count."""
         with self._lock:
-            record = TypingRecord(
-                word=word,
-                timestamp=datetime.now(),
-                search_term=search_term
-            )
-            self.state.typing_records.append(record)
+            self.state.typed_words_history.clear()
+            self.journal.clear()
+            self._history_dirty = True
+            self._swap(total_typed_count=0)
 
     def undo_last_word(self) -> Optional[str]:
         """Undo last typed word and return it."""
         with self._lock:
-            if not self.state.typing_records:
+            record = self.journal.pop_last()
+            if record is None:
                 return None
 
-            record = self.state.typing_records.pop()
             self.state.typed_words_history.discard(record.word)
-            self.state.total_typed_count = max(0, self.state.total_typed_count - 1)
+            self._history_dirty = True
+            self._swap(total_typed_count=max(0, self.state.total_typed_count - 1))
             return record.word
 
     def record_ocr_attempt(self, success: bool, duration_ms: float):
         """Record WBT attempt metrics."""
         with self._lock:
-            self.state.metrics.total_ocr_attempts += 1
-            if success:
-                self.state.metrics.successful_ocr_count += 1
-            else:
-                self.state.metrics.failed_ocr_count += 1
-
-            # Update average
-            if self.state.metrics.total_ocr_attempts > 0:
-                total = self.state.metrics.average_ocr_time_ms * (self.state.metrics.total_ocr_attempts - 1)
-                self.state.metrics.average_ocr_time_ms = (total + duration_ms) / self.state.metrics.total_ocr_attempts
+            m = self.state.metrics
+            attempts = m.total_ocr_attempts + 1
+            self._swap(metrics=replace(
+                m,
+                total_ocr_attempts=attempts,
+                successful_ocr_count=m.successful_ocr_count + (1 if success else 0),
+                failed_ocr_count=m.failed_ocr_count + (0 if success else 1),
+                average_ocr_time_ms=(m.average_ocr_time_ms * (attempts - 1) + duration_ms) / attempts,
+            ))
 
     def record_api_call(self, success: bool, duration_ms: float):
         """Record API call metrics."""
         with self._lock:
-            self.state.metrics.api_requests += 1
-            if success:
-                self.state.metrics.successful_api_calls += 1
+            m = self.state.metrics
+            requests = m.api_requests + 1
+            self._swap(metrics=replace(
+                m,
+                api_requests=requests,
+                successful_api_calls=m.successful_api_calls + (1 if success else 0),
+                failed_api_calls=m.failed_api_calls + (0 if success else 1),
+                average_api_time_ms=(m.average_api_time_ms * (requests - 1) + duration_ms) / requests,
+            ))
+
+    def start_persistence(self):
+        """Start the write-behind worker: debounced saves plus periodic metrics/journal/history checkpoints."""
+        if self._persistence is None:
+            self._persistence = PersistenceWorker(checkpoint=self._checkpoint)
+            self._persistence.start()
+
+    def stop_persistence(self, run_pending: bool = True):
+        """Stop the write-behind worker; pending saves run now unless run_pending is False."""
+        if self._persistence is not None:
+            self._persistence.stop(run_pending=run_pending)
+            self._persistence = None
+
+    def request_save(self, *what: str):
+        """
+        Schedule a save of "config", "history" and/or "journal" on the persistence worker.
+        Falls back to saving synchronously when the worker is not running.
+        """
+        jobs = {"config": self.save_state, "history": self.save_history, "journal": self.journal.flush}
+        for key in what:
+            if self._persistence is not None:
+                self._persistence.request(key, jobs[key])
             else:
-                self.state.metrics.failed_api_calls += 1
+                jobs[key]()
 
-            # Update average
-            if self.state.metrics.api_requests > 0:
-                total = self.state.metrics.average_api_time_ms * (self.state.metrics.api_requests - 1)
-                self.state.metrics.average_api_time_ms = (total + duration_ms) / self.state.metrics.api_requests
+    def _checkpoint(self):
+        # The journal and the history that gates suggestions are saved together, so a
+        # crash cannot leave words in the journal that the Bloom filter has forgotten.
+        if self._history_dirty:
+            self.save_history()
+        else:
+            self.journal.flush()
+        self.save_metrics()
 
     def save_state(self):
         """Save state to config file."""
         try:
-            with self._lock:
-                config = {
-                    "region": self.state.region,
-                    "turn_region": self.state.turn_region,
-                    "current_mode_index": self.state.current_mode_index,
-                    "current_sort_mode_index": self.state.current_sort_mode_index,
-                    "total_typed_count": self.state.total_typed_count,
-                    "typing_delay": self.state.typing_delay,
-                    "ocr_interval": self.state.ocr_interval,
-                }
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=2)
+            state = self.state
+            config = {
+                "region": state.region,
+                "turn_region": state.turn_region,
+                "current_mode_index": state.current_mode_index,
+                "current_sort_mode_index": state.current_sort_mode_index,
+                "total_typed_count": state.total_typed_count,
+                "typing_delay": state.typing_delay,
+                "ocr_interval": state.ocr_interval,
+            }
+            # ocr_profiles belong to `ocr_tools.py tune`, which may rewrite them while the
+            # app runs: keep what is on disk rather than the copy loaded at startup.
+            profiles = self._saved_profiles()
+            if profiles is None:
+                profiles = state.ocr_profiles
+            if profiles:
+                config["ocr_profiles"] = profiles
+            if state.windows:
+                config["windows"] = list(state.windows)
+            atomic_write_json(CONFIG_FILE, config)
             logger.info("Configuration saved")
         except Exception as e:
             logger.error(f"Error saving config: {e}")
 
+    @staticmethod
+    def _saved_profiles() -> Optional[Dict]:
+        """ocr_profiles currently in the config file, or None if there are none."""
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                profiles = json.load(f).get("ocr_profiles")
+        except (OSError, ValueError, AttributeError):
+            return None
+        return profiles if isinstance(profiles, dict) else None
+
     def load_state(self):
         """Load persisted settings from ocr_config.json (region, modes, counts, typing_delay, ocr_interval)."""
         try:
@@ -160,51 +270,70 @@ class StateManager:
 
     def _apply_config_file(self, config: dict) -> None:
         """Apply values from a loaded JSON dict; missing keys keep current defaults."""
+        changes = {}
+        if "region" in config:
+            changes["region"] = config["region"]
+        if "turn_region" in config:
+            changes["turn_region"] = config["turn_region"]
+        for key in ("current_mode_index", "current_sort_mode_index", "total_typed_count"):
+            if key in config:
+                try:
+                    changes[key] = int(config[key])
+                except (TypeError, ValueError):
+                    pass
+        if "typing_delay" in config:
+            changes["typing_delay"] = clamp_typing_delay(config["typing_delay"])
+        if "ocr_interval" in config:
+            changes["ocr_interval"] = clamp_ocr_interval(config["ocr_interval"])
+        if isinstance(config.get("ocr_profiles"), dict):
+            changes["ocr_profiles"] = config["ocr_profiles"]
+        if isinstance(config.get("windows"), list):
+            changes["windows"] = tuple(w for w in config["windows"] if isinstance(w, dict) and w.get("region"))
         with self._lock:
-            if "region" in config:
-                self.state.region = config["region"]
-            if "turn_region" in config:
-                self.state.turn_region = config["turn_region"]
-            try:
-                self.state.current_mode_index = int(
-                    config.get("current_mode_index", self.state.current_mode_index)
-                )
-            except (TypeError, ValueError):
-                pass
-            try:
-                self.state.current_sort_mode_index = int(
-                    config.get("current_sort_mode_index", self.state.current_sort_mode_index)
-                )
-            except (TypeError, ValueError):
-                pass
-            try:
-                self.state.total_typed_count = int(
-                    config.get("total_typed_count", self.state.total_typed_count)
-                )
-            except (TypeError, ValueError):
-                pass
-            if "typing_delay" in config:
-                self.state.typing_delay = clamp_typing_delay(config["typing_delay"])
-            if "ocr_interval" in config:
-                self.state.ocr_interval = clamp_ocr_interval(config["ocr_interval"])
+            self._swap(**changes)
+
+    def save_history(self):
+        """Save typed-word history (recent window + Bloom filter) and flush the typing journal."""
+        self._history_dirty = False
+        try:
+            self.journal.flush()
+            self.state.typed_words_history.save(TYPED_HISTORY_FILE)
+            logger.info("Typed history saved")
+        except Exception as e:
+            logger.error(f"Error saving typed history: {e}")
+
+    def load_history(self):
+        """Load typed-word history and the journal's undo buffer from a previous session, if any."""
+        try:
+            if self.state.typed_words_history.load(TYPED_HISTORY_FILE):
+                logger.info("Typed history loaded from file")
+            if self.journal.load():
+                logger.info(f"Typing journal loaded ({len(self.journal.recent())} undoable words)")
+        except Exception as e:
+            logger.error(f"Error loading typed history: {e}")
+
+    def add_metrics_source(self, name: str, source: Callable[[], dict]):
+        """Include source()'s counters under name in the saved metrics."""
+        self._metrics_sources[name] = source
 
     def save_metrics(self):
         """Save metrics to file."""
         try:
-            with self._lock:
-                metrics_dict = {
-                    "total_ocr_attempts": self.state.metrics.total_ocr_attempts,
-                    "successful_ocr_count": self.state.metrics.successful_ocr_count,
-                    "failed_ocr_count": self.state.metrics.failed_ocr_count,
-                    "api_requests": self.state.metrics.api_requests,
-                    "successful_api_calls": self.state.metrics.successful_api_calls,
-                    "failed_api_calls": self.state.metrics.failed_api_calls,
-                    "average_ocr_time_ms": self.state.metrics.average_ocr_time_ms,
-                    "average_api_time_ms": self.state.metrics.average_api_time_ms,
-                    "session_start_time": self.state.metrics.session_start_time.isoformat(),
-                }
-            with open(METRICS_FILE, 'w') as f:
-                json.dump(metrics_dict, f, indent=2)
-            logger.info("Metrics saved")
+            metrics = self.state.metrics
+            metrics_dict = {
+                "total_ocr_attempts": metrics.total_ocr_attempts,
+                "successful_ocr_count": metrics.successful_ocr_count,
+                "failed_ocr_count": metrics.failed_ocr_count,
+                "api_requests": metrics.api_requests,
+                "successful_api_calls": metrics.successful_api_calls,
+                "failed_api_calls": metrics.failed_api_calls,
+                "average_ocr_time_ms": metrics.average_ocr_time_ms,
+                "average_api_time_ms": metrics.average_api_time_ms,
+                "session_start_time": metrics.session_start_time.isoformat(),
+            }
+            for name, source in list(self._metrics_sources.items()):
+                metrics_dict[name] = source()
+            atomic_write_json(METRICS_FILE, metrics_dict)
+            logger.debug("Metrics saved")
         except Exception as e:
             logger.error(f"Error saving metrics: {e}")
@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from capture import CaptureSession
+from config import (
+    SUBMIT_VERIFY_INTERVAL,
+    SUBMIT_VERIFY_TIMEOUT,
+    SUBMIT_REJECT_AFTER,
+    SUBMIT_VERIFY_READS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of a submitted word.
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+TIMED_OUT = "timed_out"
+
+
+class SubmitVerifier:
+    """
+    Tight-polls the prompt and turn regions right after a word is submitted.
+    The turn passing on or the prompt changing means the game took the word;
+    the same prompt still on screen (and still our turn) once the game has had
+    time to react means it was rejected.
+    """
+
+    def __init__(self, ocr_processor, interval: float = SUBMIT_VERIFY_INTERVAL,
+                 timeout: float = SUBMIT_VERIFY_TIMEOUT, reject_after: float = SUBMIT_REJECT_AFTER,
+                 reads: int = SUBMIT_VERIFY_READS):
+        self.ocr_processor = ocr_processor
+        self.interval = interval
+        self.timeout = timeout
+        self.reject_after = reject_after
+        self.reads = reads
+        self.counts = {ACCEPTED: 0, REJECTED: 0, TIMED_OUT: 0}
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def verify(self, letters: str, region: Dict, turn_region: Optional[Dict] = None) -> str:
+        """Watch the regions until the outcome is clear; returns ACCEPTED, REJECTED or TIMED_OUT."""
+        region = dict(region)
+        turn_region = dict(turn_region) if turn_region else None
+        start = time.monotonic()
+        moved = stayed = 0
+        outcome = TIMED_OUT
+        # mss handles are per thread, and this runs on the watcher or an executor thread.
+        with CaptureSession() as capture:
+            while time.monotonic() - start < self.timeout:
+                frame = capture.grab(region, turn_region)
+                our_turn = True
+                if turn_region:
+                    our_turn, _ = self.ocr_processor.check_turn_gate(turn_region, frame.crop(turn_region))
+                reading = self.ocr_processor.read_region(region, frame.crop(region))
+                if not our_turn or (reading is not None and reading[0] != letters):
+                    moved, stayed = moved + 1, 0
+                elif reading is not None and time.monotonic() - start >= self.reject_after:
+                    moved, stayed = 0, stayed + 1
+                if moved >= self.reads:
+                    outcome = ACCEPTED
+                    break
+                if stayed >= self.reads:
+                    outcome = REJECTED
+                    break
+                time.sleep(self.interval)
+
+        elapsed = (time.monotonic() - start) * 1000
+        with self._lock:
+            self.counts[outcome] += 1
+            self.total_ms += elapsed
+        logger.debug(f"Submission of '{letters}' prompt {outcome} after {elapsed:.0f} ms")
+        return outcome
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = sum(self.counts.values())
+            return {
+                **self.counts,
+                "average_verify_time_ms": self.total_ms / total if total else 0.0,
+            }
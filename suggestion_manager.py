@@ -1,7 +1,12 @@
+import json
+import os
 import random
 import logging
-from typing import List
-from config import SORT_MODES
+import threading
+from typing import Container, Dict, List
+from config import SORT_MODES, WORD_OUTCOMES_FILE
+from persistence import atomic_write_json
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -23,30 +28,31 @@ class SuggestionManager:
         if not suggestions:
             return []
         
-        if sort_mode == "Shortest":
-            return sorted(suggestions, key=len)
-        elif sort_mode == "Longest":
-            return sorted(suggestions, key=len, reverse=True)
-        elif sort_mode == "Frequency":
-            # Sort by complexity (longer words, unusual patterns first)
-            return sorted(suggestions, key=lambda w: -sum(1 for c in w if c.isupper()))
-        elif sort_mode == "Random":
-            shuffled = suggestions.copy()
-            random.shuffle(shuffled)
-            return shuffled
-        else:
-            return suggestions
+        with tracer.span("suggestions.sort", "suggestions", mode=sort_mode, count=len(suggestions)):
+            if sort_mode == "Shortest":
+                return sorted(suggestions, key=len)
+            elif sort_mode == "Longest":
+                return sorted(suggestions, key=len, reverse=True)
+            elif sort_mode == "Frequency":
+                # Sort by complexity (longer words, unusual patterns first)
+                return sorted(suggestions, key=lambda w: -sum(1 for c in w if c.isupper()))
+            elif sort_mode == "Random":
+                shuffled = list(suggestions)
+                random.shuffle(shuffled)
+                return shuffled
+            else:
+                return suggestions
     
     @staticmethod
     def get_next_untyped_word(suggestions: List[str], start_index: int, 
-                              typed_history: set) -> tuple:
+                              typed_history: Container[str]) -> tuple:
         """
         Find next untyped word in suggestions list.
         
         Args:
             suggestions: List of suggestions
             start_index: Starting index to search from
-            typed_history: Set of already-typed words
+            typed_history: Already-typed words (TypedHistory: recent window + Bloom filter)
         
         Returns:
             Tuple of (word, index) or (None, start_index) if all typed
@@ -64,4 +70,50 @@ class SuggestionManager:
             if word not in typed_history:
                 return word, current_idx + 1
         
-        return None, start_index
\ No newline at end of file
+        return None, start_index
+
+
+class WordOutcomes:
+    """Accepted / rejected counts per submitted word, fed back into suggestion order."""
+
+    def __init__(self, counts: Dict[str, List[int]] = None):
+        self.counts: Dict[str, List[int]] = counts or {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def record(self, word: str, accepted: bool):
+        with self._lock:
+            entry = self.counts.setdefault(word.lower(), [0, 0])
+            entry[0 if accepted else 1] += 1
+            self.dirty = True
+
+    def acceptance(self, word: str) -> float:
+        """Smoothed acceptance rate; 0.5 for words never submitted."""
+        accepted, rejected = self.counts.get(word.lower(), (0, 0))
+        return (accepted + 1) / (accepted + rejected + 2)
+
+    def rank(self, suggestions: List[str]) -> List[str]:
+        """Move words the game rejected more often than it accepted to the end; otherwise keep the sort order."""
+        if not self.counts:
+            return suggestions
+        with self._lock, tracer.span("suggestions.rank", "suggestions", count=len(suggestions)):
+            return sorted(suggestions, key=lambda w: self.acceptance(w) < 0.5)
+
+    def save(self, path: str = WORD_OUTCOMES_FILE):
+        with self._lock:
+            counts = {w: list(c) for w, c in self.counts.items()}
+            self.dirty = False
+        atomic_write_json(path, counts, indent=0)
+
+    @classmethod
+    def load(cls, path: str = WORD_OUTCOMES_FILE) -> "WordOutcomes":
+        """Saved outcomes, or an empty set (no reordering)."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls({str(w): [int(c[0]), int(c[1])] for w, c in data.items()})
+        except Exception as e:
+            logger.error(f"Ignoring word outcomes {path}: {e}")
+            return cls()
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from config import MAX_WORKER_THREADS
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    """Job priority, most urgent first."""
+    TYPING = 0
+    SUGGESTIONS = 1
+    DEFINITIONS = 2
+    BACKGROUND = 3
+
+
+class _Job:
+    __slots__ = ("lane", "key", "fn", "args", "kwargs", "future", "queued_at")
+
+    def __init__(self, lane: Lane, key: Optional[Hashable], fn: Callable, args, kwargs):
+        self.lane = lane
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+class LaneScheduler:
+    """
+    Small worker pool with priority lanes. Workers always take the most urgent
+    queued job the reservations allow: one worker is kept for the TYPING lane so
+    a slow lookup cannot hold up typing, and TYPING jobs (which wait on the
+    keyboard, lookups and submit checks) never hold every worker, so lookups keep
+    running while words are typed. Jobs submitted with a key replace a queued (not yet running)
+    job with the same lane and key: the stale one is cancelled, the newest wins.
+    """
+
+    def __init__(self, workers: int = MAX_WORKER_THREADS, name: str = "Worker"):
+        self.workers = max(1, workers)
+        self._queues: Dict[Lane, Deque[_Job]] = {lane: deque() for lane in Lane}
+        self._keyed: Dict[Tuple[Lane, Hashable], _Job] = {}
+        self._cond = threading.Condition()
+        self._running_other = 0
+        self._running_typing = 0
+        self._closed = False
+        self._stats = {lane: {"submitted": 0, "superseded": 0, "completed": 0, "failed": 0,
+                              "total_wait_ms": 0.0, "max_wait_ms": 0.0} for lane in Lane}
+        self._threads: List[threading.Thread] = []
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, daemon=True, name=f"{name}-{i}")
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, lane: Lane, fn: Callable, *args, key: Optional[Hashable] = None, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on lane; returns its Future (cancelled if superseded)."""
+        job = _Job(lane, key, fn, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("LaneScheduler is shut down")
+            if key is not None:
+                stale = self._keyed.pop((lane, key), None)
+                if stale is not None:
+                    self._queues[lane].remove(stale)
+                    stale.future.cancel()
+                    self._stats[lane]["superseded"] += 1
+                self._keyed[(lane, key)] = job
+            self._queues[lane].append(job)
+            self._stats[lane]["submitted"] += 1
+            self._cond.notify()
+        return job.future
+
+    def _next_job(self) -> Optional[_Job]:
+        # Each side leaves at least one worker to the other: TYPING and the remaining lanes.
+        typing_ok = self.workers == 1 or self._running_typing < self.workers - 1
+        other_ok = self.workers == 1 or self._running_other < self.workers - 1
+        for lane in Lane:
+            queue = self._queues[lane]
+            if queue and (typing_ok if lane is Lane.TYPING else other_ok):
+                job = queue.popleft()
+                if job.key is not None and self._keyed.get((lane, job.key)) is job:
+                    del self._keyed[(lane, job.key)]
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                if job.lane is Lane.TYPING:
+                    self._running_typing += 1
+                else:
+                    self._running_other += 1
+                wait_ms = (time.monotonic() - job.queued_at) * 1000
+                stats = self._stats[job.lane]
+                stats["total_wait_ms"] += wait_ms
+                stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+
+            failed = False
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn(*job.args, **job.kwargs))
+                except BaseException as e:
+                    failed = True
+                    logger.error(f"{job.lane.name.lower()} task failed: {e}", exc_info=True)
+                    job.future.set_exception(e)
+
+            with self._cond:
+                if job.lane is Lane.TYPING:
+                    self._running_typing -= 1
+                else:
+                    self._running_other -= 1
+                # A reserved-worker slot may have opened up for the other side.
+                self._cond.notify_all()
+                self._stats[job.lane]["failed" if failed else "completed"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-lane queue depth, throughput, supersessions and queue wait."""
+        with self._cond:
+            out = {}
+            for lane in Lane:
+                stats = dict(self._stats[lane])
+                started = stats["completed"] + stats["failed"]
+                total_wait = stats.pop("total_wait_ms")
+                stats["queued"] = len(self._queues[lane])
+                stats["average_wait_ms"] = total_wait / started if started else 0.0
+                out[lane.name.lower()] = stats
+            return out
+
+    def shutdown(self, wait: bool = False):
+        """Cancel queued jobs and stop the workers once their current job is done."""
+        with self._cond:
+            self._closed = True
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft().future.cancel()
+            self._keyed.clear()
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageOps
+
+from preprocess import bgra_to_gray, binarize, otsu_threshold, stretch, to_gray
+
+
+def frames(count=300, seed=0):
+    """Random RGB frames: noise, few-level UI-like crops and narrow-contrast captures."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(count):
+        h, w = (int(n) for n in rng.integers(1, 48, 2))
+        kind = i % 3
+        if kind == 0:
+            rgb = rng.integers(0, 256, (h, w, 3))
+        elif kind == 1:
+            palette = rng.integers(0, 256, (int(rng.integers(1, 6)), 3))
+            rgb = palette[rng.integers(0, len(palette), (h, w))]
+        else:
+            rgb = np.clip(rng.normal(128, 18, (h, w, 3)), 0, 255)
+        out.append(rgb.astype(np.uint8))
+    return out
+
+
+def to_bgra(rgb):
+    alpha = np.full(rgb.shape[:2] + (1,), 255, dtype=np.uint8)
+    return np.ascontiguousarray(np.concatenate([rgb[..., ::-1], alpha], axis=2))
+
+
+def pil_gray(rgb):
+    return Image.fromarray(rgb, "RGB").convert("L")
+
+
+@pytest.mark.parametrize("rgb", frames(60))
+def test_gray_matches_pillow(rgb):
+    expected = np.asarray(pil_gray(rgb))
+    assert np.array_equal(to_gray(rgb), expected)
+    assert np.array_equal(bgra_to_gray(to_bgra(rgb)), expected)
+
+
+def test_gray_of_a_non_contiguous_view():
+    rgb = frames(1, seed=3)[0]
+    bgra = np.repeat(to_bgra(rgb), 2, axis=1)[:, ::2]
+    assert np.array_equal(bgra_to_gray(bgra), np.asarray(pil_gray(rgb)))
+
+
+def test_stretch_matches_autocontrast_with_cutoff():
+    for rgb in frames():
+        expected = np.asarray(ImageOps.autocontrast(pil_gray(rgb), cutoff=1))
+        assert np.array_equal(stretch(rgb), expected)
+
+
+def test_binarize_matches_the_pil_pipeline():
+    # The PIL path binarize replaced: L, autocontrast, then a fixed threshold.
+    for rgb in frames():
+        image = ImageOps.autocontrast(pil_gray(rgb))
+        expected = np.asarray(image.point(lambda x: 0 if x < 140 else 255))
+        assert np.array_equal(binarize(to_bgra(rgb), threshold=140, adaptive=False), expected)
+
+
+def test_otsu_splits_a_bimodal_histogram():
+    hist = np.zeros(256)
+    hist[40] = 500
+    hist[200] = 300
+    assert 40 < otsu_threshold(hist) <= 200
+    binary = binarize(np.array([[40, 200]], dtype=np.uint8), adaptive=True)
+    assert binary.tolist() == [[0, 255]]
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from task_scheduler import Lane, LaneScheduler
+
+
+@pytest.fixture
+def scheduler():
+    s = LaneScheduler(workers=2, name="TestWorker")
+    yield s
+    s.shutdown(wait=True)
+
+
+def block_typing(scheduler):
+    """Occupy the workers TYPING may use; returns the event that releases them."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    scheduler.submit(Lane.TYPING, hold)
+    assert started.wait(5)
+    return release
+
+
+def test_keyed_job_replaces_the_queued_one(scheduler):
+    release = block_typing(scheduler)
+    calls = []
+    first = scheduler.submit(Lane.TYPING, calls.append, "first", key="shift")
+    second = scheduler.submit(Lane.TYPING, calls.append, "second", key="shift")
+    assert first.cancelled()
+    release.set()
+    second.result(timeout=5)
+    assert calls == ["second"]
+    assert scheduler.get_stats()["typing"]["superseded"] == 1
+
+
+def test_different_keys_do_not_coalesce(scheduler):
+    release = block_typing(scheduler)
+    a = scheduler.submit(Lane.TYPING, lambda: "a", key=("prefetch", 1))
+    b = scheduler.submit(Lane.TYPING, lambda: "b", key=("prefetch", 2))
+    release.set()
+    assert (a.result(timeout=5), b.result(timeout=5)) == ("a", "b")
+
+
+def test_cancelled_job_never_runs(scheduler):
+    release = block_typing(scheduler)
+    calls = []
+    job = scheduler.submit(Lane.TYPING, calls.append, "cancelled")
+    assert job.cancel()
+    after = scheduler.submit(Lane.TYPING, calls.append, "after")
+    release.set()
+    after.result(timeout=5)
+    assert calls == ["after"]
+
+
+def test_other_lanes_run_while_typing_is_busy(scheduler):
+    release = block_typing(scheduler)
+    queued_typing = scheduler.submit(Lane.TYPING, lambda: "typing")
+    lookup = scheduler.submit(Lane.SUGGESTIONS, lambda: "lookup")
+    assert lookup.result(timeout=5) == "lookup"
+    assert not queued_typing.done()
+    release.set()
+    assert queued_typing.result(timeout=5) == "typing"
+
+
+def test_typing_runs_while_other_lanes_are_busy(scheduler):
+    release = threading.Event()
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    scheduler.submit(Lane.BACKGROUND, hold)
+    assert started.wait(5)
+    queued_background = scheduler.submit(Lane.BACKGROUND, lambda: "background")
+    typing = scheduler.submit(Lane.TYPING, lambda: "typing")
+    assert typing.result(timeout=5) == "typing"
+    assert not queued_background.done()
+    release.set()
+    assert queued_background.result(timeout=5) == "background"
+
+
+def test_failed_job_sets_the_exception(scheduler):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        scheduler.submit(Lane.BACKGROUND, fail).result(timeout=5)
+    assert scheduler.get_stats()["background"]["failed"] == 1
+
+
+def test_shutdown_cancels_queued_jobs():
+    scheduler = LaneScheduler(workers=2, name="TestWorker")
+    release = block_typing(scheduler)
+    queued = scheduler.submit(Lane.TYPING, lambda: None)
+    scheduler.shutdown()
+    assert queued.cancelled()
+    release.set()
+    scheduler.shutdown(wait=True)
+    with pytest.raises(RuntimeError):
+        scheduler.submit(Lane.TYPING, lambda: None)
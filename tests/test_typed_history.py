@@ -0,0 +1,91 @@
+import pytest
+
+from typed_history import BloomFilter, TypedHistory
+
+
+def small_history(max_recent=3):
+    return TypedHistory(max_recent=max_recent, bloom=BloomFilter(capacity=1000, error_rate=0.01))
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(capacity=500, error_rate=0.01)
+    words = [f"word{i}" for i in range(500)]
+    for word in words:
+        bloom.add(word)
+    assert all(word in bloom for word in words)
+
+
+def test_oldest_recent_word_is_evicted_to_the_bloom_filter():
+    history = small_history(max_recent=2)
+    for word in ("a", "b", "c"):
+        history.add(word)
+    assert history.recent_words() == ["b", "c"]
+    assert "a" in history
+    assert "a" in history.bloom
+
+
+def test_re_adding_a_word_moves_it_to_the_end():
+    history = small_history()
+    for word in ("a", "b", "a"):
+        history.add(word)
+    assert history.recent_words() == ["b", "a"]
+
+
+def test_discard_only_removes_recent_words():
+    history = small_history(max_recent=1)
+    history.add("gone")
+    history.add("kept")
+    assert history.discard("kept")
+    assert "kept" not in history
+    assert not history.discard("gone")
+    assert "gone" in history
+
+
+def test_clear_forgets_recent_and_archived_words():
+    history = small_history(max_recent=1)
+    history.add("a")
+    history.add("b")
+    history.clear()
+    assert "a" not in history and "b" not in history
+    assert len(history) == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = small_history(max_recent=2)
+    for word in ("archived", "recent1", "recent2"):
+        history.add(word)
+    history.save(path)
+
+    restored = small_history(max_recent=2)
+    assert restored.load(path)
+    assert restored.recent_words() == ["recent1", "recent2"]
+    assert "archived" in restored
+    assert restored.bloom.count == history.bloom.count
+
+
+def test_load_into_a_smaller_window_archives_the_overflow(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = small_history(max_recent=3)
+    for word in ("a", "b", "c"):
+        history.add(word)
+    history.save(path)
+
+    restored = small_history(max_recent=1)
+    assert restored.load(path)
+    assert restored.recent_words() == ["c"]
+    assert "a" in restored and "b" in restored
+
+
+def test_load_missing_file(tmp_path):
+    assert not small_history().load(str(tmp_path / "missing.bin"))
+
+
+@pytest.mark.parametrize("data", [b"", b"NOPE" + bytes(40)])
+def test_load_rejects_unreadable_files(tmp_path, data):
+    path = tmp_path / "history.bin"
+    path.write_bytes(data)
+    history = small_history()
+    history.add("kept")
+    assert not history.load(str(path))
+    assert history.recent_words() == ["kept"]
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+import typing_journal
+from typing_journal import KIND_TYPED, TypingJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "journal.bin")
+
+
+def reload(path, ring_size=20):
+    journal = TypingJournal(path, ring_size=ring_size)
+    assert journal.load()
+    return [r.word for r in journal.recent()]
+
+
+def test_round_trip(path):
+    journal = TypingJournal(path)
+    journal.append("apple", "ap", 120.5)
+    journal.append("grape", "ra", 80.0)
+    journal.flush()
+
+    restored = TypingJournal(path)
+    assert restored.load()
+    records = restored.recent()
+    assert [r.word for r in records] == ["apple", "grape"]
+    assert records[0].kind == KIND_TYPED
+    assert records[0].search_term == "ap"
+    assert records[0].latency_ms == pytest.approx(120.5)
+
+
+def test_append_only_buffers_until_flush(path):
+    journal = TypingJournal(path)
+    journal.append("apple", "ap")
+    assert not os.path.exists(path)
+    journal.flush()
+    assert os.path.getsize(path) > 0
+
+
+def test_flush_due_after_record_threshold(path, monkeypatch):
+    monkeypatch.setattr(typing_journal, "JOURNAL_FLUSH_RECORDS", 3)
+    journal = TypingJournal(path)
+    assert not journal.flush_due()
+    for word in ("a", "b"):
+        journal.append(word, "")
+    assert not journal.flush_due()
+    journal.append("c", "")
+    assert journal.flush_due()
+    journal.flush()
+    assert not journal.flush_due()
+
+
+def test_undo_is_replayed_on_load(path):
+    journal = TypingJournal(path)
+    for word in ("one", "two", "three"):
+        journal.append(word, "")
+    assert journal.pop_last().word == "three"
+    journal.append("four", "")
+    journal.flush()
+
+    assert reload(path) == ["one", "two", "four"]
+
+
+def test_clear_is_replayed_on_load(path):
+    journal = TypingJournal(path)
+    journal.append("old", "")
+    journal.clear()
+    journal.append("new", "")
+    journal.flush()
+
+    assert reload(path) == ["new"]
+
+
+def test_markers_are_written_by_flush_only(path):
+    journal = TypingJournal(path)
+    journal.append("word", "")
+    journal.flush()
+    size = os.path.getsize(path)
+    journal.pop_last()
+    journal.clear()
+    assert os.path.getsize(path) == size
+    journal.flush()
+    assert os.path.getsize(path) > size
+    assert reload(path) == []
+
+
+def test_load_keeps_the_newest_ring_size_records(path):
+    journal = TypingJournal(path, ring_size=3)
+    for i in range(10):
+        journal.append(f"w{i}", "")
+    journal.flush()
+
+    assert reload(path, ring_size=3) == ["w7", "w8", "w9"]
+
+
+def test_oversized_record_is_clipped(path):
+    journal = TypingJournal(path)
+    journal.append("é" * 70000, "x" * 70000)
+    journal.append("after", "")
+    journal.flush()
+
+    restored = TypingJournal(path)
+    assert restored.load()
+    big, after = restored.recent()
+    assert 0 < len(big.word.encode("utf-8")) < 0xFFFF
+    assert set(big.word) == {"é"}
+    assert after.word == "after"
+
+
+def test_load_without_journal(path):
+    assert not TypingJournal(path).load()
@@ -0,0 +1,108 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config import TRACE_ENABLED, TRACE_DIR, TRACE_MAX_EVENTS
+from persistence import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """Shared no-op context returned while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._complete(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace events ("X" complete events, microseconds) in a
+    bounded buffer; save() writes them as JSON loadable in chrome://tracing or
+    ui.perfetto.dev. Disabled, span() hands back one shared no-op context.
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, max_events: int = TRACE_MAX_EVENTS):
+        self.enabled = enabled
+        self._events = deque(maxlen=max_events)
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._session = time.strftime("%Y%m%d-%H%M%S")
+
+    def span(self, name: str, cat: str = "app", **args):
+        """with tracer.span("ocr.read", region=...): time the block (no-op when disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name: str, cat: str = "app", **args):
+        """A point-in-time marker, e.g. the moment a new prompt was read."""
+        if not self.enabled:
+            return
+        tid = self._thread_id()
+        self._events.append({
+            "name": name, "cat": cat, "ph": "i", "s": "t", "pid": self._pid, "tid": tid,
+            "ts": (time.perf_counter_ns() - self._origin) / 1000, "args": args,
+        })
+
+    def _thread_id(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def _complete(self, name: str, cat: str, start: int, end: int, args: Dict):
+        # deque.append is atomic, so worker threads record without a lock.
+        self._events.append({
+            "name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": self._thread_id(),
+            "ts": (start - self._origin) / 1000, "dur": (end - start) / 1000, "args": args,
+        })
+
+    def save(self, directory: str = TRACE_DIR) -> Optional[str]:
+        """Write this session's events to <directory>/trace_<session>.json; None if nothing was traced."""
+        if not self._events:
+            return None
+        events = list(self._events)
+        meta = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                for tid, name in list(self._threads.items())]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"trace_{self._session}.json")
+        atomic_write_json(path, {"traceEvents": meta + events, "displayTimeUnit": "ms"}, indent=0)
+        logger.info(f"Trace written to {path} ({len(events)} events)")
+        return path
+
+
+# Process-wide tracer used by the instrumented modules.
+tracer = Tracer()
@@ -0,0 +1,107 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from config import TURN_SIGNATURE_FILE, TURN_DETECT_ACCEPT, TURN_DETECT_REJECT
+
+logger = logging.getLogger(__name__)
+
+# Signature geometry: template sampled to TEMPLATE_W x TEMPLATE_H, colours quantised
+# to HIST_LEVELS per channel (HIST_LEVELS ** 3 bins).
+TEMPLATE_W = 32
+TEMPLATE_H = 12
+HIST_LEVELS = 4
+_HIST_SHIFT = 8 - int(np.log2(HIST_LEVELS))
+
+
+def _sample(rgb: np.ndarray) -> np.ndarray:
+    """Nearest-neighbour downsample to TEMPLATE_H x TEMPLATE_W (indexing, no resize)."""
+    h, w = rgb.shape[:2]
+    rows = (np.arange(TEMPLATE_H) * h) // TEMPLATE_H
+    cols = (np.arange(TEMPLATE_W) * w) // TEMPLATE_W
+    return rgb[np.ix_(rows, cols)]
+
+
+def _histogram(small: np.ndarray) -> np.ndarray:
+    q = small[..., :3].astype(np.uint16) >> _HIST_SHIFT
+    bins = (q[..., 0] * HIST_LEVELS + q[..., 1]) * HIST_LEVELS + q[..., 2]
+    hist = np.bincount(bins.ravel(), minlength=HIST_LEVELS ** 3).astype(np.float32)
+    return hist / hist.sum()
+
+
+def _template(small: np.ndarray) -> np.ndarray:
+    gray = small[..., :3].astype(np.float32).mean(axis=2).ravel()
+    gray -= gray.mean()
+    norm = np.linalg.norm(gray)
+    return gray / norm if norm > 0 else gray
+
+
+@dataclass(frozen=True)
+class TurnSignature:
+    """Reference colour histogram and grayscale template of the YOUR TURN region."""
+    histogram: np.ndarray
+    template: np.ndarray
+
+    @classmethod
+    def from_image(cls, rgb: np.ndarray) -> "TurnSignature":
+        small = _sample(rgb)
+        return cls(_histogram(small), _template(small))
+
+
+class TurnGateDetector:
+    """
+    Decides "is YOUR TURN visible" by comparing the turn region against a
+    calibrated signature: histogram intersection of downsampled colours plus
+    normalised correlation of a small grayscale template, averaged into one score.
+    """
+
+    def __init__(self, signature: Optional[TurnSignature] = None,
+                 accept: float = TURN_DETECT_ACCEPT, reject: float = TURN_DETECT_REJECT):
+        self.signature = signature
+        self.accept = accept
+        self.reject = reject
+
+    @property
+    def calibrated(self) -> bool:
+        return self.signature is not None
+
+    def calibrate(self, rgb: np.ndarray):
+        """Use this frame (H x W x 3/4, RGB order) as the YOUR TURN reference."""
+        self.signature = TurnSignature.from_image(rgb)
+
+    def score(self, rgb: np.ndarray) -> float:
+        """Similarity to the reference in [0, 1]."""
+        small = _sample(rgb)
+        hist = float(np.minimum(_histogram(small), self.signature.histogram).sum())
+        ncc = float(_template(small) @ self.signature.template)
+        return 0.5 * hist + 0.5 * max(0.0, ncc)
+
+    def classify(self, rgb: np.ndarray):
+        """(verdict, score): True/False when clear-cut, None when ambiguous (ask OCR)."""
+        if self.signature is None:
+            return None, 0.0
+        s = self.score(rgb)
+        if s >= self.accept:
+            return True, s
+        if s <= self.reject:
+            return False, s
+        return None, s
+
+    def save(self, path: str = TURN_SIGNATURE_FILE):
+        np.savez_compressed(path, histogram=self.signature.histogram, template=self.signature.template)
+
+    @classmethod
+    def load(cls, path: str = TURN_SIGNATURE_FILE) -> "TurnGateDetector":
+        """Detector with the saved signature, or an uncalibrated one."""
+        detector = cls()
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    detector.signature = TurnSignature(data["histogram"], data["template"])
+                logger.info("Turn gate signature loaded")
+            except Exception as e:
+                logger.error(f"Ignoring turn gate signature {path}: {e}")
+        return detector
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional
+
+from config import MAX_TYPED_HISTORY, BLOOM_CAPACITY, BLOOM_ERROR_RATE
+
+logger = logging.getLogger(__name__)
+
+_FILE_MAGIC = b"WBTH"
+_FILE_VERSION = 1
+# magic, version, bit count, hash count, items added, recent-word byte length
+_HEADER = struct.Struct("<4sHQIQQ")
+
+
+class BloomFilter:
+    """Compact probabilistic set: no false negatives, tunable false-positive rate."""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE,
+                 num_bits: Optional[int] = None, num_hashes: Optional[int] = None):
+        capacity = max(1, int(capacity))
+        error_rate = min(0.5, max(1e-9, float(error_rate)))
+        if num_bits is None:
+            num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if num_hashes is None:
+            num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        self.num_bits = max(8, int(num_bits))
+        self.num_hashes = int(num_hashes)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, word: str) -> Iterator[int]:
+        # Double hashing (Kirsch–Mitzenmacher): one digest gives all k positions.
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, word: str):
+        """Add a word to the filter."""
+        for pos in self._positions(word):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, word: str) -> bool:
+        for pos in self._positions(word):
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def clear(self):
+        """Reset all bits."""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class TypedHistory:
+    """
+    Typed-word history: an insertion-ordered window of recent words (O(1) add,
+    evict-oldest and remove for undo) in front of a Bloom filter that remembers
+    every word evicted from the window, across sessions.
+
+    Words still in the window can be removed; once evicted to the Bloom filter
+    they are permanent until clear().
+    """
+
+    def __init__(self, max_recent: int = MAX_TYPED_HISTORY,
+                 bloom: Optional[BloomFilter] = None):
+        self.max_recent = max(1, int(max_recent))
+        self.bloom = bloom if bloom is not None else BloomFilter()
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, word: str):
+        """Record a typed word, evicting the oldest recent word into the Bloom filter."""
+        with self._lock:
+            if word in self._recent:
+                self._recent.move_to_end(word)
+                return
+            self._recent[word] = None
+            while len(self._recent) > self.max_recent:
+                evicted, _ = self._recent.popitem(last=False)
+                self.bloom.add(evicted)
+
+    def discard(self, word: str) -> bool:
+        """Remove a word from the recent window (undo). Returns True if it was there."""
+        with self._lock:
+            if word not in self._recent:
+                return False
+            del self._recent[word]
+            return True
+
+    def clear(self):
+        """Forget every typed word, recent and archived."""
+        with self._lock:
+            self._recent.clear()
+            self.bloom.clear()
+
+    def recent_words(self) -> List[str]:
+        """Recent words, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def __contains__(self, word: str) -> bool:
+        with self._lock:
+            return word in self._recent or word in self.bloom
+
+    def __len__(self) -> int:
+        """Number of words in the recent window."""
+        with self._lock:
+            return len(self._recent)
+
+    def save(self, path: str):
+        """Write the Bloom bits and recent window to a binary file (atomic replace)."""
+        with self._lock:
+            recent = "\n".join(self._recent).encode("utf-8")
+            header = _HEADER.pack(_FILE_MAGIC, _FILE_VERSION, self.bloom.num_bits,
+                                  self.bloom.num_hashes, self.bloom.count, len(recent))
+            bits = bytes(self.bloom.bits)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(bits)
+            f.write(recent)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Load a file written by save(); returns False if missing or unreadable."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+
+        try:
+            magic, version, num_bits, num_hashes, count, recent_len = _HEADER.unpack_from(data)
+            if magic != _FILE_MAGIC or version != _FILE_VERSION:
+                raise ValueError("unrecognised header")
+            bits_start = _HEADER.size
+            bits_end = bits_start + (num_bits + 7) // 8
+            if bits_end + recent_len > len(data):
+                raise ValueError("truncated file")
+            bloom = BloomFilter(num_bits=num_bits, num_hashes=num_hashes)
+            bloom.bits = bytearray(data[bits_start:bits_end])
+            bloom.count = count
+            recent = data[bits_end:bits_end + recent_len].decode("utf-8")
+        except (struct.error, ValueError, UnicodeDecodeError) as e:
+            logger.error(f"Ignoring typed history file {path}: {e}")
+            return False
+
+        with self._lock:
+            self.bloom = bloom
+            self._recent = OrderedDict((w, None) for w in recent.split("\n") if w)
+            while len(self._recent) > self.max_recent:
+                evicted, _ = self._recent.popitem(last=False)
+                self.bloom.add(evicted)
+        return True
@@ -0,0 +1,190 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+from config import UNDO_BUFFER_SIZE, JOURNAL_FLUSH_RECORDS, JOURNAL_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_FILE_MAGIC = b"WBTJ\x01\x00\x00\x00"
+
+KIND_TYPED = 1
+KIND_UNDO = 2
+KIND_CLEAR = 3
+
+# kind, unix timestamp, prompt-to-Enter latency (ms), word byte length, search term byte length
+_RECORD_HEAD = struct.Struct("<BdfHH")
+# Total record length repeated at the end so the file can be walked backwards from EOF.
+_RECORD_TAIL = struct.Struct("<H")
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    """One entry of the typing journal."""
+    kind: int
+    word: str
+    timestamp: float
+    search_term: str = ""
+    latency_ms: float = 0.0
+
+
+# Largest word + search term that keeps the total record length within the u16 tail.
+_MAX_PAYLOAD = 0xFFFF - _RECORD_HEAD.size - _RECORD_TAIL.size
+
+
+def _clip(text: str, limit: int) -> bytes:
+    """UTF-8 of text, cut to at most limit bytes on a character boundary."""
+    data = text.encode("utf-8")
+    if len(data) <= limit:
+        return data
+    return data[:limit].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _encode(record: JournalRecord) -> bytes:
+    word = _clip(record.word, _MAX_PAYLOAD)
+    term = _clip(record.search_term, _MAX_PAYLOAD - len(word))
+    head = _RECORD_HEAD.pack(record.kind, record.timestamp, record.latency_ms, len(word), len(term))
+    size = len(head) + len(word) + len(term) + _RECORD_TAIL.size
+    return head + word + term + _RECORD_TAIL.pack(size)
+
+
+def _decode(buf, offset: int) -> JournalRecord:
+    kind, ts, latency, word_len, term_len = _RECORD_HEAD.unpack_from(buf, offset)
+    start = offset + _RECORD_HEAD.size
+    word = bytes(buf[start:start + word_len]).decode("utf-8", errors="replace")
+    start += word_len
+    term = bytes(buf[start:start + term_len]).decode("utf-8", errors="replace")
+    return JournalRecord(kind=kind, word=word, timestamp=ts, search_term=term, latency_ms=latency)
+
+
+class TypingJournal:
+    """
+    Append-only binary journal of typing records with a fixed-size ring of the
+    most recent live records in memory (the undo buffer).
+
+    Records are only buffered (callers hold the state lock on hotkey and typing
+    threads); flush() writes them, and flush_due() says when a batch is worth
+    writing: JOURNAL_FLUSH_RECORDS records or JOURNAL_FLUSH_SECONDS, whichever
+    comes first. Undo and clear are appended as marker records, so the ring can be
+    rebuilt from the end of the file after a restart without reading the whole journal.
+    """
+
+    def __init__(self, path: str, ring_size: int = UNDO_BUFFER_SIZE):
+        self.path = path
+        self.ring: "deque[JournalRecord]" = deque(maxlen=max(1, int(ring_size)))
+        self._pending: List[bytes] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, word: str, search_term: str, latency_ms: float = 0.0) -> JournalRecord:
+        """Record a typed word."""
+        record = JournalRecord(KIND_TYPED, word, time.time(), search_term, float(latency_ms))
+        with self._lock:
+            self.ring.append(record)
+            self._buffer(record)
+        return record
+
+    def pop_last(self) -> Optional[JournalRecord]:
+        """Undo the most recent typed record still in the ring; None if the ring is empty."""
+        with self._lock:
+            if not self.ring:
+                return None
+            record = self.ring.pop()
+            self._buffer(JournalRecord(KIND_UNDO, record.word, time.time()))
+        return record
+
+    def clear(self):
+        """Forget recent records; earlier history stays in the file behind a clear marker."""
+        with self._lock:
+            self.ring.clear()
+            self._buffer(JournalRecord(KIND_CLEAR, "", time.time()))
+
+    def recent(self) -> List[JournalRecord]:
+        """Live records in the ring, oldest first."""
+        with self._lock:
+            return list(self.ring)
+
+    def _buffer(self, record: JournalRecord):
+        """Batch a record without writing; flush() writes it later."""
+        self._pending.append(_encode(record))
+
+    def flush_due(self) -> bool:
+        """True when batched records have reached JOURNAL_FLUSH_RECORDS or waited JOURNAL_FLUSH_SECONDS."""
+        with self._lock:
+            return bool(self._pending) and (
+                len(self._pending) >= JOURNAL_FLUSH_RECORDS
+                or time.monotonic() - self._last_flush >= JOURNAL_FLUSH_SECONDS
+            )
+
+    def flush(self):
+        """Write batched records to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        try:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "ab") as f:
+                if new_file:
+                    f.write(_FILE_MAGIC)
+                f.write(data)
+            self._pending.clear()
+        except OSError as e:
+            logger.error(f"Error writing typing journal: {e}")
+
+    def _map(self) -> Optional[mmap.mmap]:
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size <= len(_FILE_MAGIC):
+                    return None
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if mm[:len(_FILE_MAGIC)] != _FILE_MAGIC:
+            mm.close()
+            logger.error(f"Ignoring typing journal {self.path}: unrecognised header")
+            return None
+        return mm
+
+    def load(self) -> bool:
+        """Rebuild the ring from the tail of the journal; returns False if there is none."""
+        self.flush()
+        mm = self._map()
+        if mm is None:
+            return False
+        live: List[JournalRecord] = []
+        skip = 0
+        try:
+            end = len(mm)
+            while end > len(_FILE_MAGIC) and len(live) < self.ring.maxlen:
+                (size,) = _RECORD_TAIL.unpack_from(mm, end - _RECORD_TAIL.size)
+                start = end - size
+                if size < _RECORD_HEAD.size + _RECORD_TAIL.size or start < len(_FILE_MAGIC):
+                    logger.error("Typing journal is corrupt; undo buffer restored partially")
+                    break
+                record = _decode(mm, start)
+                end = start
+                if record.kind == KIND_CLEAR:
+                    break
+                if record.kind == KIND_UNDO:
+                    skip += 1
+                elif skip:
+                    skip -= 1
+                else:
+                    live.append(record)
+        finally:
+            mm.close()
+        with self._lock:
+            self.ring.clear()
+            self.ring.extend(reversed(live))
+        return True
@@ -1,5 +1,7 @@
 # ui_manager.py - UI components and overlays
 
+import logging
+import queue
 import threading
 from typing import Callable, Optional
 
@@ -7,6 +9,8 @@ import tkinter as tk
 from tkinter import ttk
 from config import THEME, SEARCH_MODES, SORT_MODES
 
+logger = logging.getLogger(__name__)
+
 class RegionOverlay(threading.Thread):
     """Displays selected WBT region overlay (letters) and optional turn-gate region (green)."""
     
@@ -180,6 +184,10 @@ class LogDisplay(threading.Thread):
         self.root = None
         self.text_widget = None
         self.visible = True
+        self._drain_scheduled = threading.Event()
+        # Work handed to the Tk thread by other threads (see post()).
+        self._commands = queue.SimpleQueue()
+        self._commands_scheduled = threading.Event()
         self.start()
 
     def run(self):
@@ -259,11 +267,45 @@ class LogDisplay(threading.Thread):
         self.root.bind("<FocusIn>", self.handle_focus_in)
         self.root.bind("<FocusOut>", self.handle_focus_out)
         self.root.protocol("WM_DELETE_WINDOW", self.callbacks['exit'])
+        self.log_queue.set_listener(self._on_log_added)
         self.check_queue()
+        self._run_commands()
         self.root.mainloop()
 
+    def _on_log_added(self):
+        """LogQueue listener: schedule one drain on the Tk thread per burst of messages."""
+        if self.root and not self._drain_scheduled.is_set():
+            self._drain_scheduled.set()
+            try:
+                self.root.after(0, self.check_queue)
+            except (RuntimeError, tk.TclError):
+                self._drain_scheduled.clear()
+
+    def post(self, command: Callable, *args):
+        """Run command(*args) on the Tk thread; safe to call from any thread, returns at once."""
+        self._commands.put((command, args))
+        if self.root and not self._commands_scheduled.is_set():
+            self._commands_scheduled.set()
+            try:
+                self.root.after(0, self._run_commands)
+            except (RuntimeError, tk.TclError):
+                self._commands_scheduled.clear()
+
+    def _run_commands(self):
+        self._commands_scheduled.clear()
+        while True:
+            try:
+                command, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                command(*args)
+            except Exception as e:
+                logger.error(f"UI command failed: {e}", exc_info=True)
+
     def check_queue(self):
-        """Update log display from queue."""
+        """Update log display from queue (runs when LogQueue reports new messages)."""
+        self._drain_scheduled.clear()
         messages = self.log_queue.pop_all()
         for message, color in messages:
             self.text_widget.insert(tk.END, message + "\n")
@@ -271,9 +313,6 @@ class LogDisplay(threading.Thread):
             self.text_widget.tag_add(color, f"{self.text_widget.index('end')}-1c linestart",
                                     f"{self.text_widget.index('end')}-1c lineend")
             self.text_widget.see(tk.END)
-        
-        if self.root:
-            self.root.after(100, self.check_queue)
 
     def toggle_visibility(self):
         """Toggle window visibility."""
@@ -337,49 +376,92 @@ class HelpWindow:
         return help_win
 
 class DefinitionPopup:
-    """Popup to display word definitions."""
+    """
+    Non-modal window with one tab per looked-up word (newest selected). Must be
+    called on the Tk thread; worker threads go through LogDisplay.post.
+    """
     def_win = None
+    notebook = None
+    tabs = {}
+    MAX_WORDS = 8
 
     @staticmethod
     def show(parent_root, word: str, definitions: list):
-        """Create and display definition window."""
-
-        if DefinitionPopup.def_win and DefinitionPopup.def_win.winfo_exists():
-            DefinitionPopup.def_win.destroy()
-            DefinitionPopup.def_win = None
-
+        """Add (or refresh) the tab for word, creating the window on first use."""
         if not definitions:
             return None
 
-        DefinitionPopup.def_win = tk.Toplevel(parent_root)
-        DefinitionPopup.def_win.title(f"Definition of '{word}'")
-        DefinitionPopup.def_win.attributes("-topmost", True)
-        DefinitionPopup.def_win.attributes("-alpha", THEME["unfocused_alpha"])
-        DefinitionPopup.def_win.state('zoomed')
-        DefinitionPopup.def_win.grab_set()
-        DefinitionPopup.def_win.config(bg=THEME["bg"])
+        if not (DefinitionPopup.def_win and DefinitionPopup.def_win.winfo_exists()):
+            DefinitionPopup._create(parent_root)
+
+        tabs = DefinitionPopup.tabs
+        if word in tabs:
+            DefinitionPopup._drop(word)
+        while len(tabs) >= DefinitionPopup.MAX_WORDS:
+            DefinitionPopup._drop(next(iter(tabs)))
 
-        text_widget = tk.Text(DefinitionPopup.def_win, font=(THEME["font_family"], THEME["definition_font_size"]),
+        text_widget = tk.Text(DefinitionPopup.notebook, font=(THEME["font_family"], THEME["definition_font_size"]),
                              relief=tk.FLAT, bd=1, background=THEME["log_bg"], foreground=THEME["log_fg"],
                              wrap=tk.WORD, padx=10, pady=10)
-        text_widget.pack(fill=tk.BOTH, expand=True)
-
-        if definitions:
-            for i, definition in enumerate(definitions):
-                text_widget.insert(tk.END, f"{i+1}. {definition.strip()}\n\n")
-        else:
-            text_widget.insert(tk.END, "No definitions found.")
-
+        for i, definition in enumerate(definitions):
+            text_widget.insert(tk.END, f"{i+1}. {definition.strip()}\n\n")
         text_widget.config(state=tk.DISABLED)
         text_widget.bind("<Button-1>", DefinitionPopup.set_opaque)
 
-        close_button = ttk.Button(DefinitionPopup.def_win, text="Close", command=DefinitionPopup.def_win.destroy)
+        DefinitionPopup.notebook.add(text_widget, text=word)
+        DefinitionPopup.notebook.select(text_widget)
+        tabs[word] = text_widget
+        DefinitionPopup.def_win.title(f"Definition of '{word}'")
+        DefinitionPopup.def_win.deiconify()
+        DefinitionPopup.def_win.lift()
+        return DefinitionPopup.def_win
+
+    @staticmethod
+    def _create(parent_root):
+        win = tk.Toplevel(parent_root)
+        win.attributes("-topmost", True)
+        win.attributes("-alpha", THEME["unfocused_alpha"])
+        win.state('zoomed')
+        win.config(bg=THEME["bg"])
+
+        DefinitionPopup.def_win = win
+        DefinitionPopup.tabs = {}
+        DefinitionPopup.notebook = ttk.Notebook(win)
+        DefinitionPopup.notebook.pack(fill=tk.BOTH, expand=True)
+
+        close_button = ttk.Button(win, text="Close", command=DefinitionPopup.close_tab)
         close_button.pack(pady=10)
-        DefinitionPopup.def_win.bind("<Escape>", lambda e: DefinitionPopup.def_win.destroy())
+        win.bind("<Escape>", lambda e: DefinitionPopup.close())
+        win.protocol("WM_DELETE_WINDOW", DefinitionPopup.close)
 
-        parent_root.wait_window(DefinitionPopup.def_win)
+    @staticmethod
+    def _drop(word: str):
+        widget = DefinitionPopup.tabs.pop(word)
+        DefinitionPopup.notebook.forget(widget)
+        widget.destroy()
 
-        return DefinitionPopup.def_win
+    @staticmethod
+    def close_tab():
+        """Close the selected word; the window goes with the last one."""
+        notebook = DefinitionPopup.notebook
+        current = notebook.select()
+        for word, widget in list(DefinitionPopup.tabs.items()):
+            if str(widget) == current:
+                DefinitionPopup._drop(word)
+                break
+        if not DefinitionPopup.tabs:
+            DefinitionPopup.close()
+        else:
+            selected = notebook.nametowidget(notebook.select())
+            DefinitionPopup.def_win.title(f"Definition of '{notebook.tab(selected, 'text')}'")
+
+    @staticmethod
+    def close():
+        if DefinitionPopup.def_win and DefinitionPopup.def_win.winfo_exists():
+            DefinitionPopup.def_win.destroy()
+        DefinitionPopup.def_win = None
+        DefinitionPopup.notebook = None
+        DefinitionPopup.tabs = {}
 
     @staticmethod
     def set_opaque(event=None):